@@ -0,0 +1,114 @@
+"""AI replies: concurrent prefetch, rate limiting and retries against local backends."""
+import asyncio
+import time
+
+import pytest
+
+from vedic_core.ai import (TOPICS, AIResponder, FakeBackend, RateLimiter, StubBackend, prefetch_report_sync,
+                           response_key, transient_errors)
+from vedic_core.cache import TieredCache
+
+
+class FailingBackend:
+    """Raises `error` on the first `failures` calls, then answers."""
+    model_name = "failing"
+
+    def __init__(self, error, failures=10 ** 9):
+        self.error, self.failures, self.calls = error, failures, 0
+
+    async def acomplete(self, prompt):
+        self.calls += 1
+        if self.calls <= self.failures: raise self.error
+        return "ok"
+
+
+class BrokenStream(StubBackend):
+    """Streams two chunks, then drops the connection."""
+
+    def stream(self, prompt):
+        self.calls += 1
+        yield "partial "
+        yield "reply"
+        raise ConnectionError("stream dropped")
+
+
+def test_ask_streams_then_serves_from_cache():
+    backend = StubBackend(reply="x" * 50, chunk_size=20)
+    responder = AIResponder(backend, TieredCache())
+    key = responder.key("fp", "Career", "English", "ctx")
+    assert list(responder.ask("prompt", key)) == ["x" * 20, "x" * 20, "x" * 10]
+    assert list(responder.ask("prompt", key)) == ["x" * 50] and backend.calls == 1
+    assert responder.complete("prompt") == "x" * 50 and backend.calls == 2   # no key: never cached
+
+
+def test_incomplete_replies_are_not_cached():
+    responder = AIResponder(BrokenStream(), TieredCache())
+    key = responder.key("fp", "Career", "English", "ctx")
+    with pytest.raises(ConnectionError):
+        list(responder.ask("prompt", key))
+    stopped = responder.ask("prompt", key)
+    next(stopped)
+    stopped.close()                       # the user navigated away mid-stream
+    assert responder.cache.get(key) is None
+
+
+def test_response_key_covers_every_input():
+    base = dict(fingerprint="fp", topic="Career", lang="English", model_name="m", system_context="ctx")
+    keys = {response_key(**{**base, field: value}) for field, value in
+            [("topic", "Career"), ("topic", "Health"), ("lang", "Hindi"), ("model_name", "m2"),
+             ("fingerprint", "fp2"), ("system_context", "ctx, next day")]}
+    assert len(keys) == 6 and response_key(**base) in keys
+
+
+def test_prefetch_fills_cache_then_serves_it():
+    responder = AIResponder(FakeBackend(latency=0.001, jitter=0), TieredCache())
+    texts, stats = prefetch_report_sync(responder, "ctx", "fp", "English", rate=1000)
+    assert set(texts) == set(TOPICS) and stats["requested"] == len(TOPICS)
+    texts2, stats2 = prefetch_report_sync(responder, "ctx", "fp", "English", rate=1000)
+    assert texts2 == texts and stats2["cached"] == len(TOPICS) and stats2["requested"] == 0
+
+
+def test_concurrency_is_bounded():
+    backend = FakeBackend(latency=0.01, jitter=0)
+    prefetch_report_sync(AIResponder(backend), "ctx", "fp", "English", concurrency=2, rate=1000)
+    assert backend.peak_in_flight == 2
+
+
+def test_limiter_is_shared_across_event_loops():
+    limiter = RateLimiter(1000, burst=2)
+    for i in range(2):
+        _, stats = prefetch_report_sync(AIResponder(FakeBackend(latency=0, jitter=0)), f"ctx{i}", "fp", "English",
+                                        limiter=limiter)
+        assert stats["failed"] == 0
+
+
+def test_limiter_rate():
+    limiter = RateLimiter(50, burst=1)
+
+    async def take(n):
+        for _ in range(n): await limiter.acquire()
+
+    t0 = time.perf_counter()
+    asyncio.run(take(11))
+    assert time.perf_counter() - t0 == pytest.approx(0.2, abs=0.08)
+
+
+def test_transient_errors_are_retried():
+    backend = FailingBackend(ConnectionError("drop"), failures=2)
+    texts, stats = prefetch_report_sync(AIResponder(backend), "ctx", "fp", "English", topics=["Career"],
+                                        attempts=4, base_delay=0.001, rate=1000)
+    assert texts == {"Career": "ok"} and stats["retries"] == 2 and backend.calls == 3
+
+
+@pytest.mark.parametrize("error", [ValueError("invalid argument"), PermissionError("bad key"), TypeError("bug")])
+def test_permanent_errors_are_not_retried(error):
+    backend = FailingBackend(error)
+    texts, stats = prefetch_report_sync(AIResponder(backend), "ctx", "fp", "English", topics=["Career"],
+                                        attempts=4, base_delay=0.001, rate=1000)
+    assert texts["Career"] is error and stats == {"requested": 1, "cached": 0, "retries": 0, "failed": 1}
+    assert backend.calls == 1
+
+
+def test_transient_error_classes():
+    assert issubclass(asyncio.TimeoutError, transient_errors())
+    assert not issubclass(ValueError, transient_errors())
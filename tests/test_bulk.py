@@ -0,0 +1,77 @@
+"""Bulk chart generation: ordered output, error rows and checkpoint resume."""
+import base64
+import csv
+import json
+
+import pytest
+
+from vedic_core import bulk
+from vedic_core.model import Chart
+
+ROWS = [{"id": str(i), "name": f"P{i}", "date": f"19{60 + i}-05-17", "time": "14:30",
+         "lat": "28.6139", "lon": "77.2090", "tz": "Asia/Kolkata"} for i in range(7)]
+ROWS[3] = {**ROWS[3], "date": "not a date"}
+
+
+class Stop(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def offline(tmp_path, monkeypatch):
+    # Workers inherit the environment: keep them off any locally built indexes.
+    monkeypatch.setenv("VEDIC_GAZETTEER", str(tmp_path / "none.idx"))
+    monkeypatch.setenv("VEDIC_TZ_INDEX", str(tmp_path / "none.npz"))
+
+
+def write_csv(path, rows, rename=None):
+    rename = rename or {}
+    fields = [rename.get(k, k) for k in ROWS[0]]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fields)
+        w.writeheader()
+        for r in rows: w.writerow({rename.get(k, k): v for k, v in r.items()})
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f: return [json.loads(line) for line in f]
+
+
+def test_records_in_order_with_error_rows(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.jsonl"
+    write_csv(src, ROWS)
+    stats = bulk.run(str(src), str(out), chunk_size=2, workers=2)
+    assert stats["records"] == 7 and stats["errors"] == 1
+    records = read_jsonl(out)
+    assert [r["id"] for r in records] == [r["id"] for r in ROWS]
+    assert "error" in records[3] and "chart" not in records[3]
+    chart = Chart.from_bytes(base64.b64decode(records[0]["chart"]))
+    assert chart.jd == pytest.approx(records[0]["jd"]) and records[0]["tz"] == "Asia/Kolkata"
+
+
+def test_resume_after_interruption_matches_a_clean_run(tmp_path):
+    src = tmp_path / "in.csv"
+    write_csv(src, ROWS)
+    clean = tmp_path / "clean.jsonl"
+    bulk.run(str(src), str(clean), chunk_size=2, workers=1)
+
+    out = tmp_path / "out.jsonl"
+    def stop_after_two_chunks(ckpt, rate):
+        if ckpt["chunks"] == 2: raise Stop
+    with pytest.raises(Stop):
+        bulk.run(str(src), str(out), chunk_size=2, workers=1, progress=stop_after_two_chunks)
+    with open(out, "ab") as f: f.write(b'{"id": "half a rec')   # torn tail from a crash
+    stats = bulk.run(str(src), str(out), chunk_size=2, workers=1)
+    assert stats["records"] == 3
+    assert read_jsonl(out) == read_jsonl(clean)
+
+
+def test_resume_refuses_changed_arguments(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.jsonl"
+    write_csv(src, ROWS, rename={"date": "dob"})
+    bulk.run(str(src), str(out), chunk_size=2, workers=1, columns={"date": "dob"})
+    with pytest.raises(SystemExit, match="different arguments"):
+        bulk.run(str(src), str(out), chunk_size=2, workers=1, columns={"date": "birth_date"})
+    with pytest.raises(SystemExit, match="different arguments"):
+        bulk.run(str(src), str(out), chunk_size=3, workers=1, columns={"date": "dob"})
+    assert bulk.run(str(src), str(out), chunk_size=2, workers=1, columns={"date": "dob"})["records"] == 0
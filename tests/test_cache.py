@@ -0,0 +1,103 @@
+"""TieredCache: memory LRU, disk tier, byte budget and background eviction."""
+import os
+import pickle
+import threading
+import time
+
+import pytest
+
+from vedic_core.cache import TieredCache, canonical_key, chart_key
+
+
+def key(i):
+    return canonical_key("test", i=i)
+
+
+def wait_for_eviction(cache, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while cache._evicting and time.monotonic() < deadline: time.sleep(0.01)
+    assert not cache._evicting
+
+
+def disk_usage(directory):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+
+
+def test_memory_lru_and_copies():
+    cache = TieredCache(max_entries=2)
+    value = {"a": [1, 2]}
+    cache.set(key(1), value)
+    value["a"].append(3)
+    got = cache.get(key(1))
+    assert got == {"a": [1, 2]} and got is not cache.get(key(1))
+    cache.set(key(2), 2)
+    cache.get(key(1))
+    cache.set(key(3), 3)   # evicts key(2), the least recently used
+    assert cache.get(key(2)) is None and cache.get(key(1)) is not None
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and stats["misses"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = TieredCache(max_entries=1, directory=str(tmp_path))
+    cache.set(key(1), "one")
+    cache.set(key(2), "two")
+    assert cache.get(key(1)) == "one" and cache.stats()["hits_disk"] == 1
+    fresh = TieredCache(directory=str(tmp_path))
+    assert fresh.get(key(2)) == "two"
+    assert fresh.stats()["disk_bytes"] == disk_usage(tmp_path)
+
+
+def test_disk_eviction_keeps_budget_and_recent_entries(tmp_path):
+    blob = os.urandom(10_000)
+    size = len(pickle.dumps(blob, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = TieredCache(max_entries=1, directory=str(tmp_path), max_bytes=20 * size)
+    for i in range(30):
+        cache.set(key(i), blob)
+        os.utime(cache._path(key(i)), (i, i))   # deterministic access order
+        wait_for_eviction(cache)
+    assert disk_usage(tmp_path) == cache.stats()["disk_bytes"] <= 20 * size
+    assert cache.get(key(29)) == blob
+    assert not os.path.exists(cache._path(key(0)))
+
+
+def test_concurrent_writers_keep_the_counter_exact(tmp_path):
+    cache = TieredCache(max_entries=4, directory=str(tmp_path), max_bytes=200_000)
+
+    def writer(w):
+        for i in range(50): cache.set(key((w, i)), os.urandom(5_000))
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+    for th in threads: th.start()
+    for th in threads: th.join()
+    wait_for_eviction(cache)
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path)
+    # Writes that land mid-eviction do not start another pass; the next one does.
+    cache.set(key("last"), os.urandom(5_000))
+    wait_for_eviction(cache)
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path) <= 200_000
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = TieredCache(directory=str(tmp_path))
+
+    def full(*args): raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "replace", full)
+    with pytest.raises(OSError):
+        cache.set(key(1), "x")
+    assert [f for _, _, files in os.walk(tmp_path) for f in files] == []
+    assert cache.stats()["disk_bytes"] == 0
+
+
+def test_clear_disk(tmp_path):
+    cache = TieredCache(directory=str(tmp_path))
+    for i in range(3): cache.set(key(i), i)
+    cache.clear(disk=True)
+    assert cache.get(key(0)) is None and cache.stats()["disk_bytes"] == 0 == disk_usage(tmp_path)
+
+
+def test_keys_are_canonical():
+    assert canonical_key("x", a=1.0000001, b=[1, 2]) == canonical_key("x", b=(1, 2), a=1.0)
+    assert chart_key(2451545.0, 22.5, 88.3, "2000-01-01T12:00") != chart_key(2451545.0, 22.5, 88.3,
+                                                                              "2000-01-01T12:00", house_system="W")
@@ -0,0 +1,68 @@
+"""Chat history: bounded in-memory window, paging to SQLite and the rolling summary."""
+import pytest
+
+from vedic_core.chat import ChatHistory, ChatStore, rolling_summary
+
+
+def conversation(history, turns):
+    for i in range(turns):
+        history.append("user", f"Question {i}? More detail.")
+        history.append("assistant", f"Answer {i}. Long explanation follows.")
+
+
+def test_memory_is_bounded_by_count():
+    history = ChatHistory(ChatStore(None), max_messages=6)
+    conversation(history, 20)
+    assert len(history) == 40 and len(history.recent) == 6
+    assert [m["seq"] for m in history.recent] == list(range(34, 40))
+
+
+def test_memory_is_bounded_by_size_but_keeps_the_last_exchange():
+    history = ChatHistory(ChatStore(None), max_messages=100, max_chars=1000)
+    for i in range(10): history.append("user", "x" * 300)
+    assert sum(len(m["content"]) for m in history.recent) <= 1000
+    history.append("user", "q")
+    history.append("assistant", "y" * 5000)
+    assert [m["content"][:1] for m in history.recent] == ["q", "y"]
+
+
+def test_window_pages_older_turns_back_in():
+    history = ChatHistory(ChatStore(None), max_messages=4)
+    conversation(history, 10)
+    assert [m["seq"] for m in history.window(3)] == [17, 18, 19]
+    assert [m["seq"] for m in history.window(10)] == list(range(10, 20))
+    assert [m["seq"] for m in history.window(100)] == list(range(20))
+    assert history.window(0) == []
+
+
+def test_sessions_are_isolated_and_clear_deletes():
+    store = ChatStore(None)
+    a, b = ChatHistory(store, max_messages=2), ChatHistory(store, max_messages=2)
+    conversation(a, 3)
+    conversation(b, 3)
+    a.clear()
+    assert len(a) == 0 and a.window(10) == [] and store.page(a.session_id, 100, 100) == []
+    assert len(b.window(10)) == 6
+
+
+def test_prompt_context_summarizes_paged_out_turns():
+    history = ChatHistory(ChatStore(None), max_messages=4)
+    conversation(history, 4)
+    context = history.prompt_context(last=2)
+    summary, recent = context.split("\n\n")
+    assert "User: Question 0?" in summary and "TaraVaani: Answer 1." in summary
+    assert "More detail" not in summary and "Question 2" not in summary
+    assert recent == "user: Question 3? More detail.\nassistant: Answer 3. Long explanation follows."
+
+
+def test_rolling_summary_drops_oldest_lines():
+    messages = [{"role": "user", "content": f"Line {i}. Rest."} for i in range(100)]
+    summary = rolling_summary("", messages, limit=200)
+    assert len(summary) <= 200 and summary.endswith("User: Line 99.") and "Line 0." not in summary
+
+
+def test_store_persists_across_connections(tmp_path):
+    path = str(tmp_path / "chat.sqlite")
+    history = ChatHistory(ChatStore(path), session_id="s", max_messages=2)
+    conversation(history, 3)
+    assert [m["seq"] for m in ChatStore(path).page("s", 4, 10)] == [0, 1, 2, 3]
@@ -0,0 +1,79 @@
+"""Vimshottari dasha tree against the list-based functions it replaced, and its edges."""
+import datetime
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from vedic_core.dasha import (DashaTree, calculate_vimshottari_structure, current_dasha_chains, datetime_to_jd,
+                              get_sub_periods, jd_to_datetime)
+from vedic_core.service import sidereal
+
+BIRTHS = [swe.julday(1990, 5, 17, 9.0), swe.julday(1947, 8, 14, 18.5), swe.julday(2003, 1, 1, 0.25)]
+
+
+def tree(jd):
+    return DashaTree.from_jd(jd)
+
+
+def days(a, b):
+    return abs((a - b).total_seconds()) / 86400
+
+
+@pytest.mark.parametrize("jd", BIRTHS)
+def test_mahadashas_match_legacy(jd):
+    legacy = calculate_vimshottari_structure(jd, jd_to_datetime(jd))
+    mahadashas = [p for p in tree(jd).children() if p.end_jd > jd]
+    assert [p.lord for p in mahadashas] == [d["Lord"] for d in legacy]
+    for p, d in zip(mahadashas, legacy):
+        assert days(p.end, d["End"]) < 1e-3
+    assert mahadashas[0].start_jd <= jd   # the balance dasha began before birth
+
+
+@pytest.mark.parametrize("jd", BIRTHS)
+def test_sub_periods_of_full_mahadashas_match_legacy(jd):
+    t = tree(jd)
+    for md in t.children()[1:]:   # the first is the balance dasha, which legacy restarts at birth
+        legacy = get_sub_periods(md.lord, md.start, (md.end_jd - md.start_jd) / 365.25)
+        ads = t.children(md)
+        assert [p.lord for p in ads] == [d["Lord"] for d in legacy]
+        for p, d in zip(ads, legacy):
+            assert days(p.end, d["End"]) < 1e-3
+        pd_legacy = get_sub_periods(ads[3].lord, ads[3].start, legacy[3]["Duration"])
+        pds = t.children(ads[3])
+        assert [p.lord for p in pds] == [d["Lord"] for d in pd_legacy]
+        assert [p.end_jd for p in pds] == pytest.approx([datetime_to_jd(d["End"]) for d in pd_legacy], abs=1e-3)
+
+
+@pytest.mark.parametrize("jd", BIRTHS)
+def test_at_follows_the_tree(jd):
+    t = tree(jd)
+    for when in np.linspace(jd, t.end_jd - 1e-6, 40):
+        chain = t.at(when, 5)
+        assert [p.level for p in chain] == [1, 2, 3, 4, 5]
+        for parent, child in zip(chain, chain[1:]):
+            assert child in t.children(parent)
+        assert all(p.start_jd <= when < p.end_jd for p in chain)
+
+
+def test_at_rejects_moments_outside_the_cycle():
+    t = tree(BIRTHS[0])
+    assert t.at(t.birth_jd, 1)[0].start_jd <= t.birth_jd
+    assert t.at(t.end_jd - 1e-3, 1)[0] == t.children()[-1]
+    for jd in (t.birth_jd - 1e-3, t.end_jd, t.end_jd + 365):
+        assert not t.covers(jd)
+        with pytest.raises(ValueError):
+            t.at(jd)
+
+
+def test_current_dasha_chains_matches_tree():
+    with sidereal(swe.SIDM_LAHIRI):
+        moons = [swe.calc_ut(jd, swe.MOON, swe.FLG_SIDEREAL)[0][0] for jd in BIRTHS]
+    at = swe.julday(2025, 6, 1, 0.0)
+    lords, starts, ends = current_dasha_chains(BIRTHS, moons, at, depth=3)
+    for i, (jd, moon) in enumerate(zip(BIRTHS, moons)):
+        chain = DashaTree(jd, moon).at(at, 3)
+        assert [p.start_jd for p in chain] == pytest.approx(list(starts[i]))
+        assert [p.end_jd for p in chain] == pytest.approx(list(ends[i]))
+    before, _, _ = current_dasha_chains(BIRTHS, moons, BIRTHS[0] - 1, depth=2)
+    assert before[0].tolist() == [-1, -1]
@@ -0,0 +1,59 @@
+"""Chebyshev ephemeris store against swisseph."""
+import numpy as np
+import pytest
+import swisseph as swe
+
+from vedic_core.ephemeris import GRAHAS, ChebyshevEphemeris, build, open_default_ephemeris, verify
+from vedic_core.transits import swiss_eph
+
+JD0 = 2451545.0   # J2000
+
+
+def assert_accurate(report):
+    for body, (lon_arcsec, at_jd, speed) in report.items():
+        limit = 0.1 if body in ("Rahu", "Ketu") else 0.01   # the true node wobbles within a segment
+        assert lon_arcsec < limit, (body, lon_arcsec, at_jd)
+        assert speed < 1e-3, (body, speed)
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    return ChebyshevEphemeris(build(str(tmp_path_factory.mktemp("eph") / "eph.bin"), JD0, JD0 + 800))
+
+
+def test_matches_swisseph(store):
+    assert_accurate(verify(store, samples=500))
+
+
+def test_scalar_and_array_lookups_agree(store):
+    jds = np.linspace(JD0, JD0 + 800, 257)
+    for body in GRAHAS:
+        lons, speeds = store.lon_speed_array(body, jds)
+        for jd, lon, speed in zip(jds[::16], lons[::16], speeds[::16]):
+            assert store(body, float(jd)) == pytest.approx((lon, speed), abs=1e-9)
+    rahu, ketu = store.lon_speed_array("Rahu", jds)[0], store.lon_speed_array("Ketu", jds)[0]
+    assert np.allclose((rahu + 180) % 360, ketu)
+
+
+def test_near_sun_segments_defer_to_swisseph(store):
+    swiss = swiss_eph(swe.SIDM_LAHIRI)
+    assert 0 < store.near_sun_fraction("Mercury") < 0.5 and store.near_sun_fraction("Moon") == 0
+    flagged = np.flatnonzero(store._flags["Mercury"])
+    jd = JD0 + store._seg["Mercury"] * (flagged[0] + 0.5)
+    assert store("Mercury", jd) == swiss("Mercury", jd)
+
+
+def test_range_and_ayanamsa_are_checked(store, monkeypatch):
+    with pytest.raises(ValueError):
+        store("Sun", JD0 - 1)
+    with pytest.raises(ValueError):
+        store.lon_speed_array("Sun", [JD0, JD0 + 801])
+    monkeypatch.setenv("VEDIC_EPHEMERIS", store.path)
+    assert open_default_ephemeris(swe.SIDM_LAHIRI) is not None
+    assert open_default_ephemeris(swe.SIDM_RAMAN) is None
+
+
+def test_installed_store_matches_swisseph():
+    installed = open_default_ephemeris()
+    if installed is None: pytest.skip("no ephemeris store built (python -m vedic_core.ephemeris build)")
+    assert_accurate(verify(installed, samples=300))
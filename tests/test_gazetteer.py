@@ -0,0 +1,111 @@
+"""Offline gazetteer lookups and the resolver's geocoder fallback."""
+import pytest
+
+from vedic_core.gazetteer import Gazetteer, PlaceResolver, build_index
+
+# id, name, asciiname, alternates, lat, lon, class, code, cc, cc2, admin1, ..., population (14), ..., timezone (17)
+CITIES = [
+    (1, "Paris", "Paris", "Lutece,Paree", 48.85, 2.35, "FR", "11", 2138551, "Europe/Paris"),
+    (2, "Paris", "Paris", "", 33.66, -95.55, "US", "TX", 24171, "America/Chicago"),
+    (3, "Kolkata", "Kolkata", "Calcutta", 22.57, 88.36, "IN", "28", 4631392, "Asia/Kolkata"),
+    (4, "São Paulo", "Sao Paulo", "", -23.55, -46.63, "BR", "27", 10021295, "America/Sao_Paulo"),
+    (5, "Springfield", "Springfield", "", 39.80, -89.64, "US", "IL", 116250, "America/Chicago"),
+    (6, "Springfield", "Springfield", "", 37.22, -93.30, "US", "MO", 159498, "America/Chicago"),
+]
+COUNTRIES = [("FR", "France"), ("US", "United States"), ("IN", "India"), ("BR", "Brazil")]
+ADMIN1 = [("FR.11", "Ile-de-France"), ("US.TX", "Texas"), ("IN.28", "West Bengal"), ("BR.27", "Sao Paulo"),
+          ("US.IL", "Illinois"), ("US.MO", "Missouri")]
+
+
+def write_geonames(tmp_path):
+    cities = tmp_path / "cities.txt"
+    cities.write_text("".join(
+        "\t".join([str(i), name, ascii_name, alt, str(lat), str(lon), "P", "PPL", cc, "", admin1, "", "", "",
+                   str(pop), "0", "0", tz, "2024-01-01"]) + "\n"
+        for i, name, ascii_name, alt, lat, lon, cc, admin1, pop, tz in CITIES), encoding="utf-8")
+    countries = tmp_path / "countryInfo.txt"
+    countries.write_text("#ISO\tISO3\tnum\tfips\tCountry\n" +
+                         "".join(f"{cc}\tXXX\t0\t{cc}\t{name}\n" for cc, name in COUNTRIES), encoding="utf-8")
+    admin1 = tmp_path / "admin1.txt"
+    admin1.write_text("".join(f"{code}\t{name}\t{name}\t0\n" for code, name in ADMIN1), encoding="utf-8")
+    return cities, countries, admin1
+
+
+@pytest.fixture
+def gaz(tmp_path):
+    cities, countries, admin1 = write_geonames(tmp_path)
+    path = str(tmp_path / "g.idx")
+    assert build_index(str(cities), path, str(countries), admin1_path=str(admin1)) == len(CITIES)
+    g = Gazetteer(path)
+    yield g
+    g.close()
+
+
+def test_exact_lookup_prefers_population(gaz):
+    place = gaz.lookup("paris")
+    assert place.name == "Paris, Ile-de-France, France" and place.timezone == "Europe/Paris"
+    assert place.lat == pytest.approx(48.85) and place.source == "gazetteer"
+
+
+@pytest.mark.parametrize("query, name", [
+    ("Paris, France", "Paris, Ile-de-France, France"),
+    ("Paris, United States", "Paris, Texas, United States"),
+    ("Paris, Texas", "Paris, Texas, United States"),
+    ("Paris, Texas, United States", "Paris, Texas, United States"),
+    ("Springfield, Missouri, United States", "Springfield, Missouri, United States"),
+    ("Springfield, Illinois, United States", "Springfield, Illinois, United States"),
+    ("Calcutta, West Bengal, India", "Kolkata, West Bengal, India"),
+    ("SAO PAULO, brazil", "São Paulo, Sao Paulo, Brazil"),
+])
+def test_qualified_lookup(gaz, query, name):
+    assert gaz.lookup(query).name == name
+
+
+@pytest.mark.parametrize("query", ["Paris, India", "Paris, Illinois, United States", "Springfield, Texas, France",
+                                   "Kolkatta", "Kolk", "Nowhere"])
+def test_lookup_rejects_near_misses(gaz, query):
+    assert gaz.lookup(query) is None
+
+
+def test_suggestions_cover_prefixes_and_misspellings(gaz):
+    assert [p.name for p in gaz.suggestions("Kolk")] == ["Kolkata, West Bengal, India"]
+    assert [p.name for p in gaz.suggestions("Kolkatta, India")] == ["Kolkata, West Bengal, India"]
+    assert [p.name for p in gaz.search("spring")] == ["Springfield, Missouri, United States",
+                                                      "Springfield, Illinois, United States"]
+
+
+def test_index_without_state_names(tmp_path):
+    cities, countries, _ = write_geonames(tmp_path)
+    path = str(tmp_path / "plain.idx")
+    build_index(str(cities), path, str(countries))
+    g = Gazetteer(path)
+    assert g.lookup("Paris, Texas, United States").name == "Paris, United States"
+    assert g.lookup("Paris, India") is None
+    g.close()
+
+
+class FakeGeocoder:
+    def __init__(self, error=None):
+        self.error, self.calls = error, 0
+
+    def geocode(self, query):
+        self.calls += 1
+        if self.error: raise self.error
+        return [{"formatted": "Pune, Maharashtra, India", "geometry": {"lat": 18.52, "lng": 73.86},
+                 "annotations": {"timezone": {"name": "Asia/Kolkata"}}}]
+
+
+def test_resolver_falls_back_and_caches(gaz, tmp_path):
+    geocoder = FakeGeocoder()
+    resolver = PlaceResolver(gaz, geocoder, cache_path=str(tmp_path / "geo.sqlite"))
+    assert resolver.resolve("Kolkata, India").source == "gazetteer"
+    assert geocoder.calls == 0
+    assert resolver.resolve("Pune").source == "opencage"
+    again = resolver.resolve("  pune ")
+    assert again.source == "cache" and again.name == "Pune, Maharashtra, India" and geocoder.calls == 1
+
+
+def test_resolver_survives_geocoder_errors(gaz):
+    resolver = PlaceResolver(gaz, FakeGeocoder(ConnectionError("quota")), cache_path=None)
+    assert resolver.resolve("Pune") is None and resolver.geocoder_errors == 1
+    assert resolver.resolve("Paris").name == "Paris, Ile-de-France, France"
@@ -0,0 +1,62 @@
+"""KP lord tables against the per-longitude loop they replaced."""
+import random
+
+import numpy as np
+
+from vedic_core.kp import KP_LORDS, KP_SUB_STARTS, get_kp_lords, kp_lords_array, kp_table
+
+ZODIAC_LORDS = ["Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
+                "Saturn", "Jupiter"]
+YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+
+
+def loop_lords(deg):
+    """The original sign, star and sub lord computation, minute by minute through the star."""
+    nak_span = 13 + 20 / 60
+    nak = int(deg / nak_span)
+    min_in_nak = (deg - nak * nak_span) * 60
+    sub, acc = nak % 9, 0
+    for _ in range(9):
+        period = YEARS[sub] / 120 * 800
+        if min_in_nak < acc + period: break
+        acc += period
+        sub = (sub + 1) % 9
+    return ZODIAC_LORDS[int(deg / 30) % 12], KP_LORDS[nak % 9], KP_LORDS[sub]
+
+
+def sample_degrees(n=5000, seed=0):
+    """Random longitudes plus the midpoint of every sub, kept clear of the boundaries
+    where float rounding in the loop may differ from the exact table."""
+    rng = random.Random(seed)
+    ends = KP_SUB_STARTS[1:] + [360.0]
+    degs = [(a + b) / 2 for a, b in zip(KP_SUB_STARTS, ends)]
+    degs += [rng.uniform(0, 360) for _ in range(n)]
+    return [d for d in degs if min(abs(d - s) for s in KP_SUB_STARTS + [360.0]) > 1e-7]
+
+
+def test_sub_table_size():
+    starts, rows = kp_table("sub")
+    assert len(starts) == len(rows) == 249
+    assert starts == sorted(starts) and starts[0] == 0
+
+
+def test_get_kp_lords_matches_loop():
+    for deg in sample_degrees():
+        assert get_kp_lords(deg) == loop_lords(deg), deg
+
+
+def test_kp_lords_array_matches_scalar():
+    degs = sample_degrees(seed=1)
+    rows = kp_lords_array(np.array(degs))
+    assert rows.shape == (len(degs), 3)
+    for deg, row in zip(degs, rows):
+        assert tuple(KP_LORDS[i] for i in row) == get_kp_lords(deg)
+
+
+def test_sub_sub_refines_sub():
+    degs = sample_degrees(1000, seed=2)
+    rows = kp_lords_array(np.array(degs), sub_sub=True)
+    for deg, row in zip(degs, rows):
+        lords = get_kp_lords(deg, sub_sub=True)
+        assert lords[:3] == get_kp_lords(deg)
+        assert tuple(KP_LORDS[i] for i in row) == lords
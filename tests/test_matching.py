@@ -0,0 +1,80 @@
+"""Ashtakoota tables against hand-scored pairs, and the vectorized matcher against them."""
+import numpy as np
+import pytest
+
+from vedic_core.matching import KOOTAS, MAX_POINTS, Candidates, ashtakoota, koota_breakdown, score_many, top_matches
+from vedic_core.model import NAKSHATRAS, ZODIAC
+
+
+class Moon:
+    """Just the two Moon placements ashtakoota reads from a Chart."""
+
+    def __init__(self, nakshatra, sign):
+        self._nak, self._sign = NAKSHATRAS.index(nakshatra), ZODIAC.index(sign)
+
+    def nakshatra(self, body): return self._nak
+
+    def sign(self, body): return self._sign
+
+
+@pytest.mark.parametrize("boy, girl, expected", [
+    # Same Moon sign and lord; Horse/Elephant yoni; Deva boy, Manushya girl; Adi/Madhya nadi.
+    (("Ashwini", "Aries"), ("Bharani", "Aries"),
+     {"Varna": 1, "Vashya": 2, "Tara": 3, "Yoni": 2, "Graha Maitri": 5, "Gana": 6, "Bhakoot": 7, "Nadi": 8}),
+    # Same nakshatra: full marks except Nadi dosha.
+    (("Ashwini", "Aries"), ("Ashwini", "Aries"),
+     {"Varna": 1, "Vashya": 2, "Tara": 3, "Yoni": 4, "Graha Maitri": 5, "Gana": 6, "Bhakoot": 7, "Nadi": 0}),
+    # Virgo boy, Aries girl: 6th from her sign (Bhakoot dosha); Kshatriya girl over a Vaishya boy.
+    (("Hasta", "Virgo"), ("Ashwini", "Aries"),
+     {"Varna": 0, "Bhakoot": 0}),
+])
+def test_known_pairs(boy, girl, expected):
+    points = ashtakoota(Moon(*boy), Moon(*girl))
+    for koota, value in expected.items():
+        assert points[koota] == value, koota
+    if len(expected) == len(KOOTAS):
+        assert points["Total"] == sum(expected.values())
+
+
+def test_points_stay_within_each_koota_maximum():
+    for b_nak in range(27):
+        for b_sign in range(12):
+            boy = Moon(NAKSHATRAS[b_nak], ZODIAC[b_sign])
+            points = ashtakoota(boy, boy)
+            assert all(0 <= points[k] <= MAX_POINTS[k] for k in KOOTAS)
+    assert sum(MAX_POINTS.values()) == 36
+
+
+@pytest.fixture(scope="module")
+def candidates():
+    rng = np.random.default_rng(7)
+    n = 500
+    return Candidates(rng.integers(0, 27, n, dtype=np.int8), rng.integers(0, 12, n, dtype=np.int8),
+                      rng.random(n) < 0.3)
+
+
+@pytest.mark.parametrize("seeker_is_boy", [True, False])
+def test_score_many_matches_pairwise(candidates, seeker_is_boy):
+    nak, rashi = 12, 5
+    seeker = Moon(NAKSHATRAS[nak], ZODIAC[rashi])
+    points = score_many(nak, rashi, candidates, seeker_is_boy)
+    breakdown = koota_breakdown(nak, rashi, candidates, seeker_is_boy)
+    for i in range(0, len(points), 37):
+        other = Moon(NAKSHATRAS[candidates.nakshatra[i]], ZODIAC[candidates.rashi[i]])
+        pair = ashtakoota(seeker, other) if seeker_is_boy else ashtakoota(other, seeker)
+        assert points[i] == pair["Total"]
+        assert list(breakdown[i] / 2) == [pair[k] for k in KOOTAS]
+
+
+def test_top_matches_filters_and_orders(candidates):
+    nak, rashi = 12, 5
+    idx, points = top_matches(nak, rashi, False, candidates, k=15)
+    assert 0 < len(idx) <= 15 and list(points) == sorted(points, reverse=True)
+    breakdown = koota_breakdown(nak, rashi, candidates)
+    assert (points >= 18).all() and not candidates.mangalik[idx].any()
+    assert (breakdown[idx][:, [KOOTAS.index("Nadi"), KOOTAS.index("Bhakoot")]] > 0).all()
+    everyone = score_many(nak, rashi, candidates)
+    eligible = np.setdiff1d(np.flatnonzero((everyone >= 18) & ~candidates.mangalik
+                                           & (breakdown[:, KOOTAS.index("Nadi")] > 0)
+                                           & (breakdown[:, KOOTAS.index("Bhakoot")] > 0)), idx)
+    assert len(eligible) == 0 or everyone[eligible].max() <= points.min()
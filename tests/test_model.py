@@ -0,0 +1,53 @@
+"""Chart serialization, including blobs written in the older VCH1 layout."""
+import math
+import pickle
+from datetime import datetime
+
+import pytest
+import swisseph as swe
+
+from vedic_core.model import _HEADER, _HEADER_V1, _MAGIC_V1, Chart
+
+BIRTH = datetime(1990, 5, 17, 14, 30)
+JD, LAT, LON = 2448029.1042, 28.6139, 77.2090   # 09:00 UT, New Delhi
+
+
+def chart(sid_mode=swe.SIDM_LAHIRI):
+    return Chart.from_ephemeris(JD, LAT, LON, BIRTH, sid_mode)
+
+
+def as_v1(c):
+    """The VCH1 blob for chart c: no speeds and tropical cusps."""
+    tithi, yoga, karana, sunrise, sunset = c.panchang
+    head = _HEADER_V1.pack(_MAGIC_V1, c.jd, c.lat, c.lon, c.weekday, c.ayanamsa, *c.lons,
+                           *((x + c.ayanamsa) % 360 for x in c.cusps), tithi, yoga, karana,
+                           -1 if sunrise is None else sunrise, -1 if sunset is None else sunset)
+    return head + c.codes + c.kp + c.vargas
+
+
+def test_round_trip():
+    c = chart()
+    blob = c.to_bytes()
+    assert blob[:4] == b"VCH2" and len(blob) > _HEADER.size
+    assert Chart.from_bytes(blob) == c
+    assert pickle.loads(pickle.dumps(c)) == c
+    assert c.upgraded(BIRTH) is c
+
+
+def test_v1_decodes_without_speeds():
+    c = chart()
+    old = Chart.from_bytes(as_v1(c))
+    assert list(old.lons) == list(c.lons)
+    assert all(math.isnan(s) for s in old.speeds)
+    assert (old.codes, old.kp, old.vargas, old.panchang) == (c.codes, c.kp, c.vargas, c.panchang)
+
+
+def test_v1_upgrade_recomputes_in_its_ayanamsa():
+    for sid_mode in (swe.SIDM_LAHIRI, swe.SIDM_KRISHNAMURTI, swe.SIDM_RAMAN):
+        c = chart(sid_mode)
+        assert Chart.from_bytes(as_v1(c)).upgraded(BIRTH) == c
+
+
+def test_bad_magic():
+    with pytest.raises(ValueError):
+        Chart.from_bytes(b"XXXX" + bytes(600))
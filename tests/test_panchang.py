@@ -0,0 +1,68 @@
+"""Panchang calendars: element end times against direct sampling, ayanamsas and polar days."""
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+import swisseph as swe
+
+from vedic_core.panchang import _calendar_job, panchang_calendar, sunrise_sunset
+from vedic_core.service import sidereal
+
+KOLKATA = (22.5726, 88.3639, "Asia/Kolkata")
+SPANS = {"Tithi": 12, "Karana": 6, "Nakshatra": 360 / 27, "Yoga": 360 / 27}
+
+
+def element_index(element, local_dt, tz_name, sid_mode):
+    """Index of the element in force at a local wall time, straight from swisseph."""
+    utc = local_dt.replace(tzinfo=ZoneInfo(tz_name)).astimezone(datetime.timezone.utc)
+    jd = swe.julday(utc.year, utc.month, utc.day, utc.hour + utc.minute / 60 + utc.second / 3600)
+    with sidereal(sid_mode):
+        s = swe.calc_ut(jd, swe.SUN, swe.FLG_SIDEREAL)[0][0]
+        m = swe.calc_ut(jd, swe.MOON, swe.FLG_SIDEREAL)[0][0]
+    angle = {"Tithi": m - s, "Karana": m - s, "Nakshatra": m, "Yoga": m + s}[element] % 360
+    return int(angle / SPANS[element])
+
+
+@pytest.mark.parametrize("sid_mode", [swe.SIDM_LAHIRI, swe.SIDM_RAMAN])
+def test_end_times_are_element_changes(sid_mode):
+    days = list(panchang_calendar(datetime.date(2024, 3, 1), datetime.date(2024, 3, 10), *KOLKATA, sid_mode=sid_mode))
+    assert len(days) == 10
+    step = datetime.timedelta(seconds=3)
+    for day in days:
+        for element in SPANS:
+            entries = day[element]
+            assert entries and all(a["End"] == b["Start"] for a, b in zip(entries, entries[1:]))
+            for entry in entries:
+                end = datetime.datetime.fromisoformat(entry["End"])
+                before = element_index(element, end - step, KOLKATA[2], sid_mode)
+                after = element_index(element, end + step, KOLKATA[2], sid_mode)
+                assert after != before, (element, entry)
+
+
+def test_calendar_job_uses_requested_ayanamsa():
+    start = end = datetime.date(2024, 3, 5)
+    _, raman = _calendar_job(("Kolkata", *KOLKATA, start, end, swe.SIDM_RAMAN))
+    _, lahiri = _calendar_job(("Kolkata", *KOLKATA, start, end, swe.SIDM_LAHIRI))
+    direct = list(panchang_calendar(start, end, *KOLKATA, sid_mode=swe.SIDM_RAMAN))
+    assert [d["Nakshatra"] for d in raman] == [d["Nakshatra"] for d in direct]
+    assert raman[0]["Nakshatra"][0]["End"] != lahiri[0]["Nakshatra"][0]["End"]
+
+
+def test_store_for_another_ayanamsa_is_rejected():
+    class Store:
+        sid_mode = swe.SIDM_LAHIRI
+
+        def __call__(self, body, jd): raise AssertionError("not used")
+
+    with pytest.raises(ValueError):
+        next(panchang_calendar(datetime.date(2024, 3, 5), datetime.date(2024, 3, 5), *KOLKATA,
+                               sid_mode=swe.SIDM_RAMAN, eph=Store()))
+
+
+def test_polar_night_days_start_at_midnight():
+    days = list(panchang_calendar(datetime.date(2024, 12, 20), datetime.date(2024, 12, 22), 69.65, 18.96, "Europe/Oslo"))
+    assert [d["Sunrise"] for d in days] == [None, None, None]
+    assert all(d["Tithi"] for d in days)
+    jd = swe.julday(2024, 12, 21, 0.0)
+    assert sunrise_sunset(jd, 69.65, 18.96) == (None, None)
+    assert None not in sunrise_sunset(jd, *KOLKATA[:2])
@@ -0,0 +1,56 @@
+"""PDF reports: bulk rendering, its error accounting and temp-file cleanup."""
+import base64
+import json
+import os
+from datetime import datetime
+
+import pytest
+import swisseph as swe
+
+from vedic_core.model import Chart
+from vedic_core.pdf import _render_to_file, render_bulk, report_bytes
+
+BIRTH = datetime(1990, 5, 17, 14, 30)
+JD, LAT, LON = 2448029.1042, 28.6139, 77.2090   # 09:00 UT, New Delhi
+
+
+@pytest.fixture(scope="module")
+def chart():
+    return Chart.from_ephemeris(JD, LAT, LON, BIRTH, swe.SIDM_LAHIRI)
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for rec in records: f.write(json.dumps(rec) + "\n")
+
+
+def test_report_bytes_is_a_pdf(chart):
+    pdf = report_bytes(chart, name="Test", birth=BIRTH.isoformat(), place="New Delhi")
+    assert pdf.startswith(b"%PDF") and len(pdf) > 10_000
+
+
+def test_failed_render_removes_temp_file(tmp_path):
+    path = str(tmp_path / "bad.pdf")
+    with pytest.raises(Exception):
+        _render_to_file(b"not a chart", {}, path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_render_bulk_counts_errors_and_carries_on(tmp_path, chart):
+    good = base64.b64encode(chart.to_bytes()).decode()
+    src = tmp_path / "charts.jsonl"
+    write_jsonl(src, [
+        {"id": "a", "name": "A", "birth": BIRTH.isoformat(), "chart": good},
+        {"id": "bad", "name": "B", "chart": base64.b64encode(b"garbage").decode()},
+        {"id": "nob64", "chart": "%%%"},
+        {"id": "unresolved", "error": "no such place"},
+        {"id": "c", "name": "C", "birth": BIRTH.isoformat(), "chart": good},
+    ])
+    out = tmp_path / "reports"
+    stats = render_bulk(str(src), str(out), workers=2)
+    assert stats["reports"] == 2 and stats["errors"] == 2 and stats["skipped"] == 0
+    assert set(stats["failed"]) == {"bad", "nob64"}
+    assert sorted(os.listdir(out)) == ["a.pdf", "c.pdf"]
+
+    again = render_bulk(str(src), str(out), workers=1)
+    assert again["reports"] == 0 and again["skipped"] == 2 and again["errors"] == 2
@@ -0,0 +1,114 @@
+"""ProfileStore batching, timed and failed flushes, exit flush and legacy-chart migration."""
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+from vedic_core.model import _HEADER_V1, _MAGIC_V1, Chart
+from vedic_core.profiles import MemoryBackend, Profile, ProfileStore, SQLiteBackend, encode_profile
+
+BIRTH = datetime(1990, 5, 17, 14, 30)
+CHART = Chart.from_ephemeris(2448029.1042, 28.6139, 77.2090, BIRTH)
+
+
+def profile(name, user="u"):
+    return Profile.new(user, name, "F", BIRTH, "New Delhi, India", 28.6139, 77.2090, "Asia/Kolkata", CHART)
+
+
+def v1_blob(c):
+    tithi, yoga, karana, sunrise, sunset = c.panchang
+    return _HEADER_V1.pack(_MAGIC_V1, c.jd, c.lat, c.lon, c.weekday, c.ayanamsa, *c.lons,
+                           *((x + c.ayanamsa) % 360 for x in c.cusps), tithi, yoga, karana,
+                           sunrise, sunset) + c.codes + c.kp + c.vargas
+
+
+class FlakyBackend(MemoryBackend):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def put_many(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend down")
+        super().put_many(records)
+
+
+def test_writes_are_batched():
+    backend = MemoryBackend()
+    store = ProfileStore(backend, batch_size=3, flush_interval=None)
+    saved = [store.put(profile(f"p{i}")) for i in range(7)]
+    assert backend.commits == 2 and store.stats()["pending"] == 1
+    assert [p.name for p in store.list("u")] == [p.name for p in reversed(saved)]
+    store.close()
+    assert backend.commits == 3 and len(backend.list_ids("u")) == 7
+
+
+def test_timed_flush():
+    backend = MemoryBackend()
+    store = ProfileStore(backend, flush_interval=0.05)
+    p = store.put(profile("a"))
+    assert backend.commits == 0
+    time.sleep(0.3)
+    assert backend.commits == 1 and backend.list_ids("u") == [p.profile_id]
+    store.close()
+
+
+def test_failed_flush_keeps_records_and_retries():
+    backend = FlakyBackend(failures=1)
+    store = ProfileStore(backend, flush_interval=0.05)
+    p = store.put(profile("a"))
+    with pytest.raises(ConnectionError):
+        store.flush()
+    assert store.stats()["pending"] == 1
+    time.sleep(0.3)   # the re-armed timer commits without another put
+    assert store.stats()["pending"] == 0 and backend.list_ids("u") == [p.profile_id]
+    store.close()
+
+
+def test_pending_profiles_are_flushed_at_exit(tmp_path):
+    db = tmp_path / "profiles.sqlite"
+    code = ("from datetime import datetime\n"
+            "from vedic_core.model import Chart\n"
+            "from vedic_core.profiles import Profile, ProfileStore, SQLiteBackend\n"
+            f"store = ProfileStore(SQLiteBackend({str(db)!r}), flush_interval=60)\n"
+            "dt = datetime(1990, 5, 17, 14, 30)\n"
+            "chart = Chart.from_ephemeris(2448029.1042, 28.6, 77.2, dt)\n"
+            "store.put(Profile.new('u', 'a', 'F', dt, 'X', 28.6, 77.2, 'Asia/Kolkata', chart))\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
+    assert len(SQLiteBackend(str(db)).list_ids("u")) == 1
+
+
+def test_legacy_chart_is_migrated_once():
+    backend = MemoryBackend()
+    record = dict(encode_profile(profile("old")), chart=v1_blob(CHART))
+    backend.put_many([record])
+    store = ProfileStore(backend, flush_interval=None)
+    loaded = store.get(record["id"])
+    assert loaded.chart == CHART and store.stats()["migrated"] == 1
+    store.flush()
+    assert backend.get_many([record["id"]])[record["id"]]["chart"] == CHART.to_bytes()
+    assert backend.get_many([record["id"]])[record["id"]]["updated"] == record["updated"]
+    fresh = ProfileStore(backend, flush_interval=None)
+    assert fresh.get(record["id"]).chart == CHART and fresh.stats()["migrated"] == 0
+
+
+def test_list_with_cached_ids_skips_backend_query():
+    store = ProfileStore(MemoryBackend(), flush_interval=None)
+    a = store.put(profile("a"))
+    ids = store.list_ids("u")
+    store.put(profile("b"))
+    store.put(profile("c", user="other"))
+    assert [p.profile_id for p in store.list("u", ids=ids)] == [a.profile_id]
+    assert [p.name for p in store.list("u")] == ["b", "a"]
+
+
+def test_delete():
+    store = ProfileStore(MemoryBackend(), flush_interval=None)
+    a, b = store.put(profile("a")), store.put(profile("b"))
+    store.flush()
+    store.delete(a.profile_id)
+    assert [p.profile_id for p in store.list("u")] == [b.profile_id]
+    assert store.get(a.profile_id) is None
@@ -0,0 +1,58 @@
+"""Compact prompt serialization: determinism, section priority and the token budget."""
+from datetime import datetime
+
+import pytest
+import swisseph as swe
+
+from vedic_core.dasha import DashaTree
+from vedic_core.model import Chart
+from vedic_core.prompt import estimate_tokens, legacy_context, serialize_chart
+from vedic_core.transits import TransitEvent
+
+BIRTH = datetime(1990, 5, 17, 14, 30)
+JD, LAT, LON = 2448029.1042, 28.6139, 77.2090   # 09:00 UT, New Delhi
+NOW = JD + 30 * 365.25
+
+TRANSITS = [TransitEvent(NOW + 3 * i, body, kind, value, 0.0, retro) for i, (body, kind, value, retro) in enumerate([
+    ("Jupiter", "sign", "Taurus", False), ("Saturn", "station_retro", None, True),
+    ("Mars", "nakshatra", "Rohini", False), ("Venus", "pada", ("Bharani", 2), False),
+    ("Sun", "conjunction", "Moon", False), ("Mercury", "station_direct", None, False),
+] * 8)]
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    chart = Chart.from_ephemeris(JD, LAT, LON, BIRTH, swe.SIDM_LAHIRI)
+    return chart, DashaTree.from_jd(JD).at(NOW, depth=3)
+
+
+def test_deterministic(inputs):
+    chart, chain = inputs
+    assert serialize_chart(chart, chain, TRANSITS) == serialize_chart(chart, list(chain), list(TRANSITS))
+
+
+@pytest.mark.parametrize("budget", [120, 200, 300, 450, 700, 2000])
+def test_fits_budget_and_keeps_priority(inputs, budget):
+    chart, chain = inputs
+    text = serialize_chart(chart, chain, TRANSITS, budget=budget)
+    assert estimate_tokens(text) <= budget
+    heads = [line.split(" ", 1)[0] for line in text.splitlines()]
+    order = ["CHART", "DOSHA", "DASHA", "POS", "HOUSES", "TRANSITS", "PROFILE"]
+    assert heads[:3] == order[:3]                       # always present
+    present = [h for h in order if h in heads]
+    assert present == order[:len(present)] or present == order[:5] + ["PROFILE"]
+
+
+def test_transits_are_trimmed_from_the_far_end(inputs):
+    chart, chain = inputs
+    full = serialize_chart(chart, chain, TRANSITS, budget=10_000)
+    trimmed = serialize_chart(chart, chain, TRANSITS, budget=estimate_tokens(full) - 60)
+    line = lambda text: next(l for l in text.splitlines() if l.startswith("TRANSITS"))
+    kept, every = line(trimmed).split("; "), line(full).split("; ")
+    assert 0 < len(kept) < len(every) and kept == every[:len(kept)]
+
+
+def test_smaller_than_the_legacy_prompt(inputs):
+    chart, chain = inputs
+    legacy = estimate_tokens(legacy_context(chart, chain, TRANSITS[:12]))
+    assert estimate_tokens(serialize_chart(chart, chain, TRANSITS[:12], budget=10_000)) < legacy / 2
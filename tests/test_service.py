@@ -0,0 +1,8 @@
+"""The ephemeris service under mixed ayanamsas while another thread flips the sidereal mode."""
+from vedic_core.service import stress
+
+
+def test_stress_mixed_ayanamsas_no_mismatches():
+    report = stress(threads=4, requests=60, workers=1, seed=1)
+    assert report["requests"] == 60
+    assert report["mismatches"] == 0, report["first_mismatches"]
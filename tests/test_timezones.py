@@ -0,0 +1,80 @@
+"""Time zone polygons, historical offsets and local -> UT conversion."""
+import datetime
+import json
+
+import pytest
+import swisseph as swe
+
+from vedic_core.timezones import (TimezoneIndex, TimezoneResolver, julday_utc, local_to_utc, nautical_zone,
+                                  utc_offset)
+
+NY = "America/New_York"
+
+
+def square(lon0, lat0, lon1, lat1):
+    return [[lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1], [lon0, lat0]]
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    # Kolkata with a hole that belongs to Dhaka, and Dhaka as a two-part MultiPolygon.
+    features = [
+        {"properties": {"tzid": "Asia/Kolkata"},
+         "geometry": {"type": "Polygon", "coordinates": [square(80, 10, 90, 25), square(84, 14, 86, 16)]}},
+        {"properties": {"tzid": "Asia/Dhaka"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [[square(84, 14, 86, 16)], [square(90, 20, 93, 25)]]}},
+    ]
+    src = tmp_path_factory.mktemp("tz") / "zones.json"
+    src.write_text(json.dumps({"features": features}))
+    out = src.parent / "zones.npz"
+    TimezoneIndex.from_geojson(str(src)).save(str(out))
+    return TimezoneIndex.load(str(out))
+
+
+def test_point_in_polygon(index):
+    assert index.timezone_at(22.57, 88.36) == "Asia/Kolkata"
+    assert index.timezone_at(15.0, 85.0) == "Asia/Dhaka"      # inside the hole
+    assert index.timezone_at(23.8, 90.4) == "Asia/Dhaka"
+    assert index.timezone_at(0.0, 0.0) is None
+
+
+def test_resolver_falls_back_to_hint_then_sea(index):
+    resolver = TimezoneResolver(index)
+    assert resolver.timezone_at(22.57, 88.36, hint="Europe/London") == "Asia/Kolkata"
+    assert resolver.timezone_at(51.5, -0.1, hint="Europe/London") == "Europe/London"
+    assert resolver.timezone_at(0.0, -74.0) == "Etc/GMT+5"
+    assert nautical_zone(88) == "Etc/GMT-6" and nautical_zone(5) == "Etc/GMT"
+
+
+def test_historical_india_offsets():
+    hours = lambda dt: utc_offset(dt, "Asia/Kolkata").total_seconds() / 3600
+    assert hours(datetime.datetime(1900, 1, 1)) == pytest.approx(5 + 21 / 60 + 10 / 3600)
+    assert hours(datetime.datetime(1943, 1, 1)) == 6.5     # wartime
+    assert hours(datetime.datetime(1950, 1, 1)) == 5.5
+
+
+def test_dst_gap_and_repeated_hour():
+    gap = datetime.datetime(2021, 3, 14, 2, 30)             # does not exist in New York
+    assert local_to_utc(gap, NY) == datetime.datetime(2021, 3, 14, 7, 30)
+    assert local_to_utc(gap, NY, fold=1) == datetime.datetime(2021, 3, 14, 6, 30)
+    twice = datetime.datetime(2021, 11, 7, 1, 30)           # happens twice
+    assert local_to_utc(twice, NY) == datetime.datetime(2021, 11, 7, 5, 30)
+    assert local_to_utc(twice, NY, fold=1) == datetime.datetime(2021, 11, 7, 6, 30)
+
+
+def test_birth_jd(index):
+    jd, utc_dt, tz = TimezoneResolver(index).birth_jd(datetime.datetime(1990, 5, 17, 14, 30), 22.57, 88.36)
+    assert tz == "Asia/Kolkata" and utc_dt == datetime.datetime(1990, 5, 17, 9, 0)
+    assert jd == pytest.approx(swe.julday(1990, 5, 17, 9.0)) and jd == julday_utc(utc_dt)
+
+
+def test_birth_jd_many_matches_birth_jd(index):
+    resolver = TimezoneResolver(index)
+    dts = [datetime.datetime(1943, 1, 1, 6), datetime.datetime(2021, 3, 14, 2, 30), datetime.datetime(2000, 1, 1, 12),
+           datetime.datetime(1900, 1, 1)]
+    lats, lons, hints = [22.57, 40.7, 0.0, 23.8], [88.36, -74.0, 0.0, 90.4], [None, NY, None, None]
+    jds, tzs = resolver.birth_jd_many(dts, lats, lons, hints)
+    assert tzs == ["Asia/Kolkata", NY, "Etc/GMT", "Asia/Dhaka"]
+    for i, dt in enumerate(dts):
+        jd, _, tz = resolver.birth_jd(dt, lats[i], lons[i], hints[i])
+        assert jds[i] == jd and tzs[i] == tz
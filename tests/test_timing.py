@@ -0,0 +1,93 @@
+"""Stage timing histograms and the benchmark harness's bookkeeping."""
+import json
+import threading
+
+import pytest
+
+from vedic_core import bench, timing
+from vedic_core.timing import LatencyHistogram, TimingRegistry
+
+
+@pytest.fixture
+def timing_on():
+    timing.REGISTRY.reset()
+    timing.enable()
+    yield timing.REGISTRY
+    timing.enable(False)
+    timing.REGISTRY.reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = LatencyHistogram(bounds=(0.001, 0.01, 0.1))
+    for s in [0.0005] * 50 + [0.005] * 40 + [0.05] * 9 + [2.0]:
+        hist.observe(s)
+    snap = hist.snapshot()
+    assert snap["buckets"] == {"0.001": 50, "0.01": 90, "0.1": 99, "+Inf": 100}
+    assert snap["count"] == 100 and snap["max"] == 2.0
+    assert (snap["p50"], snap["p90"], snap["p99"]) == pytest.approx((0.001, 0.01, 0.1))
+    assert hist.quantile(0.45) == pytest.approx(0.0009) and 0.1 < hist.quantile(0.995) <= 2.0
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_disabled_hooks_record_nothing():
+    timing.enable(False)
+    registry = TimingRegistry()
+    with timing.stage("x", registry): pass
+    timing.observe("y", 1.0)
+    assert registry.snapshot() == {} and "y" not in timing.REGISTRY.snapshot()
+
+
+def test_stage_timed_and_observe(timing_on):
+    @timing.timed("fn")
+    def fn(): return 42
+
+    assert fn() == 42 and fn() == 42
+    with timing.stage("block"): pass
+    timing.observe("ttft", 0.3)
+    snap = timing_on.snapshot()
+    assert snap["fn"]["count"] == 2 and snap["block"]["count"] == 1 and snap["ttft"]["sum"] == 0.3
+
+
+def test_registry_is_thread_safe():
+    registry = TimingRegistry()
+
+    def work():
+        for _ in range(1000): registry.observe("s", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for th in threads: th.start()
+    for th in threads: th.join()
+    assert registry.snapshot()["s"]["count"] == 8000
+
+
+def test_dump_formats(tmp_path):
+    registry = TimingRegistry(bounds=(0.01,))
+    registry.observe('say "hi"', 0.005)
+    registry.dump(str(tmp_path / "t.prom"))
+    prom = (tmp_path / "t.prom").read_text()
+    assert 'vedic_stage_seconds_bucket{stage="say \\"hi\\"",le="0.01"} 1' in prom
+    assert 'vedic_stage_seconds_count{stage="say \\"hi\\""} 1' in prom
+    registry.dump(str(tmp_path / "t.json"))
+    assert json.loads((tmp_path / "t.json").read_text())['say "hi"']["count"] == 1
+
+
+def test_every_case_runs_and_has_a_baseline():
+    for name, make in bench.CASES.items():
+        fn, calls = make()
+        fn()
+        assert calls >= 1, name
+    assert set(bench.load_baseline(bench.DEFAULT_BASELINE)["cases"]) == set(bench.CASES)
+
+
+def test_compare_and_save_baseline(tmp_path):
+    baseline = {"cases": {"a": {"min_us": 10.0}, "b": {"min_us": 10.0}, "c": {"min_us": 10.0}}}
+    results = {"a": {"min_us": 12.0}, "b": {"min_us": 13.0}, "c": {"min_us": 7.0}, "d": {"min_us": 1.0}}
+    report = bench.compare(results, baseline, tolerance=0.25)
+    assert {k: status for k, (_, status) in report.items()} == {"a": "ok", "b": "REGRESSION", "c": "faster", "d": "new"}
+
+    path = str(tmp_path / "baseline.json")
+    bench.save_baseline(path, {"a": {"median_us": 1.0, "min_us": 1.0}})
+    bench.save_baseline(path, {"b": {"median_us": 2.0, "min_us": 2.0}})
+    saved = bench.load_baseline(path)
+    assert set(saved["cases"]) == {"a", "b"} and saved["machine"] == bench.machine()
+    assert bench.load_baseline(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,65 @@
+"""Transit event search against brute-force sampling of the ephemeris."""
+import pytest
+import swisseph as swe
+
+from vedic_core.transits import (ZODIAC, _uniform, find_crossings, find_stations, swiss_eph,
+                                 transit_events)
+
+JD0 = swe.julday(2024, 1, 1, 0.0)
+
+
+def sampled_changes(eph, body, jd0, jd1, step, index):
+    """(jd of the sample after each change, old index, new index) sampling every `step` days."""
+    out, t = [], jd0
+    prev = index(eph(body, t)[0])
+    while t < jd1:
+        t = min(t + step, jd1)
+        cur = index(eph(body, t)[0])
+        if cur != prev: out.append((t, prev, cur))
+        prev = cur
+    return out
+
+
+# Sampling steps stay well below the shortest gap between two changes of each body.
+@pytest.mark.parametrize("body, days, divisions, sample", [
+    ("Sun", 400, 12, 0.25), ("Moon", 60, 27, 0.1), ("Mars", 800, 12, 0.25), ("Mercury", 400, 27, 0.1),
+    ("Rahu", 2000, 12, 1.0)])
+def test_crossings_match_sampling(body, days, divisions, sample):
+    eph = swiss_eph()
+    found = list(find_crossings(body, JD0, JD0 + days, _uniform(divisions), eph))
+    sampled = sampled_changes(eph, body, JD0, JD0 + days, sample, lambda lon: int(lon / (360 / divisions)))
+    assert len(found) == len(sampled) > 0
+    for (jd, b, step), (t, old, new) in zip(found, sampled):
+        assert t - sample <= jd <= t
+        assert b == (new if step > 0 else old)
+        lon = eph(body, jd)[0]
+        assert abs((lon - b * 360 / divisions + 180) % 360 - 180) < 1e-4
+
+
+def test_stations_match_sampling():
+    eph = swiss_eph()
+    found = list(find_stations("Mercury", JD0, JD0 + 400, eph))
+    flips, t, v, sample = [], JD0, eph("Mercury", JD0)[1], 0.25
+    while t < JD0 + 400:
+        t += sample
+        v_new = eph("Mercury", t)[1]
+        if (v < 0) != (v_new < 0): flips.append((t, "station_retro" if v > 0 else "station_direct"))
+        v = v_new
+    assert [k for _, k in found] == [k for _, k in flips] and len(found) >= 6
+    for (jd, _), (t, _) in zip(found, flips):
+        assert t - sample <= jd <= t
+
+
+def test_events_sorted_with_ties():
+    natal = {"Moon": 10.0, "Sun": 10.0, "Ascendant": 200.0}
+    events = transit_events(JD0, JD0 + 365, bodies=["Mars", "Jupiter", "Rahu", "Ketu"],
+                            kinds=("sign", "station", "conjunction"), natal_points=natal)
+    assert [e.jd for e in events] == sorted(e.jd for e in events)
+    ingresses = [e for e in events if e.kind == "sign"]
+    assert all(e.value in ZODIAC for e in ingresses)
+    pairs = [e for e in events if e.kind == "conjunction" and e.lon == 10.0]
+    assert {e.value for e in pairs} <= {"Moon", "Sun"}
+    # Rahu and Ketu change sign at the same instant
+    rahu = [e.jd for e in ingresses if e.body == "Rahu"]
+    ketu = [e.jd for e in ingresses if e.body == "Ketu"]
+    assert rahu == pytest.approx(ketu, abs=1e-5)
@@ -0,0 +1,65 @@
+"""Varga division tables against the formulas they replaced and the Parashari rules."""
+import random
+from bisect import bisect_right
+
+import numpy as np
+import pytest
+
+from vedic_core.varga import VARGA_LIST, VARGA_TABLES, calculate_varga_sign, varga_signs, varga_signs_array
+
+
+def formula_sign(deg, v):
+    """The original per-varga formulas (harmonic fallback above D12)."""
+    s, d = int(deg / 30), deg % 30
+    if v == 1: return s + 1
+    if v == 2: return (5 if d < 15 else 4) if s % 2 == 0 else (4 if d < 15 else 5)
+    if v == 3: return (s + int(d / 10) * 4) % 12 + 1
+    if v == 4: return (s + int(d / 7.5) * 3) % 12 + 1
+    if v == 7: return ((s if s % 2 == 0 else s + 6) + int(d / (30 / 7))) % 12 + 1
+    if v == 9: return ((0, 9, 6, 6)[s % 4] + int(d / (30 / 9))) % 12 + 1
+    if v == 10: return ((s if s % 2 == 0 else s + 8) + int(d / 3)) % 12 + 1
+    if v == 12: return (s + int(d / 2.5)) % 12 + 1
+    return int(deg * v / 30) % 12 + 1
+
+
+def sample_degrees(n=4000, seed=0):
+    """Random longitudes kept clear of every division boundary."""
+    rng = random.Random(seed)
+    bounds = sorted({b for starts, _, _ in VARGA_TABLES.values() for b in starts} | {360.0})
+    degs = (rng.uniform(0, 360) for _ in range(n))
+    return [d for d in degs if min(d - bounds[bisect_right(bounds, d) - 1], bounds[bisect_right(bounds, d)] - d) > 1e-7]
+
+
+@pytest.mark.parametrize("v", [1, 2, 3, 4, 7, 10, 12, 16, 20, 27])
+def test_unchanged_vargas_match_formulas(v):
+    for deg in sample_degrees():
+        assert calculate_varga_sign(deg, v) == formula_sign(deg, v), deg
+
+
+def test_navamsa_water_signs_start_from_cancer():
+    for deg in sample_degrees():
+        s = int(deg / 30)
+        if s % 4 == 3: assert calculate_varga_sign(deg, 9) == (3 + int(deg % 30 / (30 / 9))) % 12 + 1, deg
+        else: assert calculate_varga_sign(deg, 9) == formula_sign(deg, 9), deg
+
+
+@pytest.mark.parametrize("deg, v, sign", [
+    (3, 30, 1), (7, 30, 11), (12, 30, 9), (20, 30, 3), (27, 30, 7),       # Aries: Mars Saturn Jupiter Mercury Venus
+    (33, 30, 2), (37, 30, 6), (45, 30, 12), (53, 30, 10), (57, 30, 8),    # Taurus: Venus Mercury Jupiter Saturn Mars
+    (0.5, 24, 5), (30.5, 24, 4), (29.9, 24, 4),                           # D24 from Leo / Cancer
+    (0.5, 40, 1), (30.5, 40, 7),                                          # D40 from Aries / Libra
+    (0.5, 45, 1), (30.5, 45, 5), (60.5, 45, 9),                           # D45 by modality
+    (0.2, 60, 1), (31.2, 60, 4), (359.9, 60, 11),                         # D60 counted from the sign
+])
+def test_parashari_spot_values(deg, v, sign):
+    assert calculate_varga_sign(deg, v) == sign
+
+
+def test_array_and_list_lookups_match_scalar():
+    degs = sample_degrees(1000, seed=1)
+    table = varga_signs_array(np.array(degs))
+    assert table.shape == (len(degs), len(VARGA_LIST))
+    for deg, row in zip(degs, table):
+        expected = [calculate_varga_sign(deg, v) for v in VARGA_LIST]
+        assert varga_signs(deg) == expected
+        assert row.tolist() == expected
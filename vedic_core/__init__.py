@@ -0,0 +1,125 @@
+"""Headless Vedic astrology engine behind the TaraVaani app.
+
+Importing this package has no side effects: no Streamlit, Firebase or Gemini
+setup, and submodules (with heavy dependencies such as NumPy and matplotlib)
+are only imported when one of their names is first accessed.
+"""
+import importlib
+
+_EXPORTS = {
+    "get_kp_lords": "kp",
+    "KP_LORDS": "kp",
+    "KP_YEARS": "kp",
+    "kp_table": "kp",
+    "kp_index": "kp",
+    "kp_lords_array": "kp",
+    "next_kp_boundary": "kp",
+    "calculate_varga_sign": "varga",
+    "get_navamsa_pos": "varga",
+    "VARGA_LIST": "varga",
+    "VARGA_TABLES": "varga",
+    "varga_signs": "varga",
+    "varga_signs_array": "varga",
+    "calculate_panchang": "panchang",
+    "panchang_calendar": "panchang",
+    "panchang_calendars": "panchang",
+    "sunrise_sunset": "panchang",
+    "get_detailed_interpretations": "interpretations",
+    "get_nakshatra_properties": "chart",
+    "get_planet_status": "chart",
+    "get_planet_positions": "chart",
+    "calculate_vimshottari_structure": "dasha",
+    "get_sub_periods": "dasha",
+    "DashaTree": "dasha",
+    "DashaPeriod": "dasha",
+    "DASHA_LEVELS": "dasha",
+    "current_dasha_chains": "dasha",
+    "jd_to_datetime": "dasha",
+    "datetime_to_jd": "dasha",
+    "TransitEvent": "transits",
+    "transit_events": "transits",
+    "find_crossings": "transits",
+    "find_stations": "transits",
+    "describe_event": "transits",
+    "get_planet_positions_batch": "batch",
+    "calculate_varga_sign_vec": "batch",
+    "get_kp_lords_vec": "batch",
+    "BATCH_BODIES": "batch",
+    "draw_chart": "render",
+    "render_chart_png": "render",
+    "render_chart_svg": "svg",
+    "Gazetteer": "gazetteer",
+    "Place": "gazetteer",
+    "PlaceResolver": "gazetteer",
+    "open_default_gazetteer": "gazetteer",
+    "TimezoneIndex": "timezones",
+    "TimezoneResolver": "timezones",
+    "local_to_utc": "timezones",
+    "open_default_resolver": "timezones",
+    "TieredCache": "cache",
+    "cached_planet_positions": "cache",
+    "cached_chart": "cache",
+    "Chart": "model",
+    "AIResponder": "ai",
+    "GeminiBackend": "ai",
+    "StubBackend": "ai",
+    "FakeBackend": "ai",
+    "RateLimiter": "ai",
+    "TOPICS": "ai",
+    "prefetch_report": "ai",
+    "prefetch_report_sync": "ai",
+    "topic_prompt": "ai",
+    "topic_question": "ai",
+    "serialize_chart": "prompt",
+    "ChatHistory": "chat",
+    "ChatStore": "chat",
+    "DEFAULT_CHAT_DB": "chat",
+    "Profile": "profiles",
+    "ProfileStore": "profiles",
+    "MemoryBackend": "profiles",
+    "SQLiteBackend": "profiles",
+    "FirestoreBackend": "profiles",
+    "open_default_store": "profiles",
+    "KOOTAS": "matching",
+    "Candidates": "matching",
+    "ashtakoota": "matching",
+    "score_many": "matching",
+    "top_matches": "matching",
+    "estimate_tokens": "prompt",
+    "chart_fingerprint": "ai",
+    "default_response_cache": "ai",
+    "open_backend": "ai",
+    "ChartView": "model",
+    "DIVISIONAL_CHARTS": "model",
+    "ReportPool": "pdf",
+    "build_report": "pdf",
+    "report_bytes": "pdf",
+    "ChebyshevEphemeris": "ephemeris",
+    "open_default_ephemeris": "ephemeris",
+    "AYANAMSAS": "service",
+    "HOUSE_SYSTEMS": "service",
+    "ChartRequest": "service",
+    "EphemerisService": "service",
+    "ayanamsa_of": "service",
+    "default_service": "service",
+    "sidereal": "service",
+    "Frame": "frames",
+    "KP": "frames",
+    "TropicalPass": "frames",
+    "default_chart_cache": "cache",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,323 @@
+"""Prediction text generation: pluggable model backends, streaming and a
+persistent response cache.
+
+A backend is any object with stream(prompt) -> iterator of text chunks.
+GeminiBackend wraps google-generativeai with one configured model reused
+for every request; StubBackend returns canned text locally for tests and
+offline development. AIResponder streams a backend's reply and, for cached
+requests, stores the finished text in a TieredCache keyed by chart
+fingerprint, topic, language, PROMPT_VERSION and a hash of the system
+context. The context carries the person's name and gender, the current
+date, the running dasha and the coming transits. So a reply is only reused
+for the same person on the same day, and never outlives the dates it
+talks about.
+
+prefetch_report asks for every topic concurrently (asyncio, bounded
+concurrency, a token-bucket rate limit and retries with backoff) and fills
+that cache, so later topic requests are instant. Only transient failures
+(connection drops, timeouts, HTTP 429 and 5xx) are retried. asyncio and
+argparse are imported where they are used, which keeps this module cheap to
+import for the app. Load-test it offline with
+
+    python -m vedic_core.ai loadtest --charts 50 --concurrency 8 --rate 20
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+from .cache import TieredCache, canonical_key
+from .timing import observe
+
+# Bump whenever the system prompt or its chart serialization changes so old replies are not served.
+PROMPT_VERSION = 4
+DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_AI_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "ai")
+TOPICS = ["General Life", "Career", "Marriage", "Health", "Wealth", "Spiritual Growth"]
+
+
+def topic_prompt(system_context, topic):
+    """The prompt for a topic request; the user-visible question is the last line."""
+    return system_context + "\n\n" + topic_question(topic)
+
+
+def topic_question(topic):
+    return f"Please tell me about my {topic}."
+
+
+class GeminiBackend:
+    def __init__(self, api_key, model_name=DEFAULT_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    # No acomplete: the SDK's async client binds to the first event loop it sees, and each
+    # prefetch runs in a fresh one, so concurrent calls go through worker threads instead.
+    def stream(self, prompt):
+        t0, first = time.perf_counter(), True
+        for chunk in self._model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                if first: observe("ai.gemini_first_chunk", time.perf_counter() - t0); first = False
+                yield text
+        observe("ai.gemini", time.perf_counter() - t0)
+
+
+class StubBackend:
+    """Deterministic local backend: echoes the last prompt line back in chunks."""
+    model_name = "stub"
+
+    def __init__(self, reply=None, chunk_size=24, delay=0.0):
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.calls = 0
+
+    def _reply(self, prompt):
+        return self.reply or f"[stub] {prompt.strip().splitlines()[-1] if prompt.strip() else ''}"
+
+    def stream(self, prompt):
+        self.calls += 1
+        text = self._reply(prompt)
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay: time.sleep(self.delay)
+            yield text[i:i + self.chunk_size]
+
+
+class FakeBackend(StubBackend):
+    """StubBackend with simulated latency and transient failures, for load tests.
+    Records the peak number of requests in flight."""
+    model_name = "fake"
+
+    def __init__(self, latency=0.2, jitter=0.1, failure_rate=0.0, seed=0, reply=None):
+        super().__init__(reply)
+        self.latency, self.jitter, self.failure_rate = latency, jitter, failure_rate
+        self._rng = random.Random(seed)
+        self.in_flight = self.peak_in_flight = self.failures = 0
+
+    async def acomplete(self, prompt):
+        import asyncio
+
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+            if self._rng.random() < self.failure_rate:
+                self.failures += 1
+                raise ConnectionError("simulated transient backend failure")
+            return self._reply(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+def chart_fingerprint(chart):
+    """Stable id of a Chart's contents (see model.Chart.to_bytes)."""
+    return canonical_key("chart-fp", blob=chart.to_bytes().hex())[:32]
+
+
+def response_key(fingerprint, topic, lang, model_name=DEFAULT_MODEL, system_context=""):
+    return canonical_key("ai", v=PROMPT_VERSION, chart=fingerprint, topic=topic, lang=lang, model=model_name,
+                         context=system_context)
+
+
+class AIResponder:
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+
+    def key(self, fingerprint, topic, lang, system_context):
+        return response_key(fingerprint, topic, lang, self.backend.model_name, system_context)
+
+    def ask(self, prompt, cache_key=None):
+        """Yields the reply as chunks. With a cache_key a cached reply comes back as a single
+        chunk, and a fresh one is stored once it has streamed through completely."""
+        if cache_key is not None and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        for chunk in self.backend.stream(prompt):
+            parts.append(chunk)
+            yield chunk
+        if cache_key is not None and self.cache is not None and parts:
+            self.cache.set(cache_key, "".join(parts))
+
+    def complete(self, prompt, cache_key=None):
+        return "".join(self.ask(prompt, cache_key))
+
+    async def acomplete(self, prompt, cache_key=None):
+        """Whole reply without streaming; uses the backend's acomplete when it has one,
+        otherwise runs its blocking stream in a worker thread."""
+        if cache_key is not None and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None: return cached
+        import asyncio
+
+        if hasattr(self.backend, "acomplete"):
+            text = await self.backend.acomplete(prompt)
+        else:
+            text = await asyncio.to_thread(lambda: "".join(self.backend.stream(prompt)))
+        if cache_key is not None and self.cache is not None and text:
+            self.cache.set(cache_key, text)
+        return text
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second on average, bursts up to `burst`.
+    Each acquire reserves a token under a threading.Lock (the balance may go negative) and
+    then sleeps until its slot, so one limiter can be shared across event loops and threads."""
+
+    def __init__(self, rate, burst=1):
+        self.rate, self.burst = rate, burst
+        self._tokens, self._last = float(burst), time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        import asyncio
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate) - 1
+            self._last = now
+            wait = -self._tokens / self.rate
+        if wait > 0: await asyncio.sleep(wait)
+
+
+_transient = None
+
+
+def transient_errors():
+    """Exception classes worth retrying: connection drops, timeouts and, when the Google
+    SDK is installed, its HTTP 429 and 5xx errors. Anything else is re-raised at once."""
+    global _transient
+    if _transient is None:
+        errors = [ConnectionError, TimeoutError]
+        try:
+            from google.api_core import exceptions as gexc
+        except ImportError:
+            pass
+        else:
+            errors += [gexc.TooManyRequests, gexc.ResourceExhausted, gexc.InternalServerError,
+                       gexc.BadGateway, gexc.ServiceUnavailable, gexc.GatewayTimeout, gexc.DeadlineExceeded]
+        _transient = tuple(errors)
+    return _transient
+
+
+async def _with_retries(make_call, limiter, attempts, base_delay, stats):
+    import asyncio
+
+    for attempt in range(attempts):
+        await limiter.acquire()
+        try:
+            return await make_call()
+        except transient_errors():
+            if attempt == attempts - 1: raise
+            stats["retries"] += 1
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, base_delay * 2 ** attempt))
+
+
+async def prefetch_report(responder, system_context, fingerprint, lang, topics=TOPICS,
+                          concurrency=3, rate=2.0, attempts=4, base_delay=0.5, limiter=None):
+    """Requests every topic concurrently and stores each reply in the responder's cache.
+    Returns ({topic: text or the exception that outlasted the retries}, stats)."""
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = limiter or RateLimiter(rate, burst=concurrency)
+    stats = {"requested": 0, "cached": 0, "retries": 0, "failed": 0}
+
+    async def one(topic):
+        key = responder.key(fingerprint, topic, lang, system_context)
+        cached = responder.cache.get(key) if responder.cache is not None else None
+        if cached is not None:
+            stats["cached"] += 1
+            return topic, cached
+        async with semaphore:
+            stats["requested"] += 1
+            try:
+                text = await _with_retries(lambda: responder.acomplete(topic_prompt(system_context, topic), key),
+                                           limiter, attempts, base_delay, stats)
+            except Exception as e:
+                stats["failed"] += 1
+                return topic, e
+        return topic, text
+
+    results = await asyncio.gather(*(one(t) for t in topics))
+    return dict(results), stats
+
+
+def prefetch_report_sync(responder, system_context, fingerprint, lang, **kwargs):
+    """prefetch_report from synchronous code (e.g. a Streamlit script thread)."""
+    import asyncio
+
+    return asyncio.run(prefetch_report(responder, system_context, fingerprint, lang, **kwargs))
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_response_cache():
+    """Process-wide reply cache; disk tier lives in $VEDIC_AI_CACHE_DIR (or ~/.cache/vedic_core/ai)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TieredCache(max_entries=512, directory=os.environ.get("VEDIC_AI_CACHE_DIR", DEFAULT_AI_CACHE_DIR),
+                                         max_bytes=64 * 1024 * 1024)
+        return _default_cache
+
+
+def open_backend(api_key=None):
+    """Backend named by $VEDIC_AI_BACKEND: "stub", or "gemini" (the default, needs api_key)."""
+    if os.environ.get("VEDIC_AI_BACKEND", "gemini") == "stub":
+        return StubBackend()
+    return GeminiBackend(api_key, os.environ.get("VEDIC_AI_MODEL", DEFAULT_MODEL))
+
+
+async def _load_test(args):
+    import asyncio
+
+    backend = FakeBackend(latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+    responder = AIResponder(backend, TieredCache(max_entries=args.charts * len(TOPICS) + 1))
+    limiter = RateLimiter(args.rate, burst=args.concurrency)  # one shared budget, as against a real API quota
+    t0 = time.perf_counter()
+    reports = await asyncio.gather(*(
+        prefetch_report(responder, f"chart {i}", f"fp{i}", "English", concurrency=args.concurrency,
+                        attempts=args.attempts, base_delay=args.base_delay, limiter=limiter)
+        for i in range(args.charts)))
+    elapsed = time.perf_counter() - t0
+    totals = {k: sum(stats[k] for _, stats in reports) for k in ("requested", "retries", "failed")}
+    print(f"{args.charts} reports x {len(TOPICS)} topics in {elapsed:.2f}s "
+          f"({totals['requested'] / elapsed:.1f} req/s, limit {args.rate}/s)")
+    print(f"retries {totals['retries']}, failed {totals['failed']}, backend calls {backend.calls}, "
+          f"simulated failures {backend.failures}, peak in flight {backend.peak_in_flight}")
+    return 1 if totals["failed"] else 0
+
+
+def main(argv=None):
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="AI report tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    lt = sub.add_parser("loadtest", help="prefetch full reports against a fake backend")
+    lt.add_argument("--charts", type=int, default=20)
+    lt.add_argument("--concurrency", type=int, default=3, help="in-flight requests per report")
+    lt.add_argument("--rate", type=float, default=10.0, help="requests per second across all reports")
+    lt.add_argument("--latency", type=float, default=0.2)
+    lt.add_argument("--failure-rate", type=float, default=0.1)
+    lt.add_argument("--attempts", type=int, default=4)
+    lt.add_argument("--base-delay", type=float, default=0.1)
+    lt.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return asyncio.run(_load_test(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
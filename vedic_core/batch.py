@@ -0,0 +1,51 @@
+"""Vectorized chart engine for computing many births in one call."""
+import numpy as np
+import swisseph as swe
+
+from .frames import TropicalPass
+from .kp import kp_lords_array
+from .varga import VARGA_LIST, varga_signs_array
+
+BATCH_BODIES = ["Ascendant", "Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+
+def calculate_varga_sign_vec(deg, varga_num):
+    """Vectorized calculate_varga_sign over an array of longitudes (same tables)"""
+    return varga_signs_array(deg)[..., VARGA_LIST.index(varga_num)]
+
+def get_kp_lords_vec(deg):
+    """Vectorized get_kp_lords. Returns (sign_lord, star_lord, sub_lord) as indices into KP_LORDS"""
+    lords = kp_lords_array(deg)
+    return lords[..., 0], lords[..., 1], lords[..., 2]
+
+def get_planet_positions_batch(jds, lats, lons, sid_mode=swe.SIDM_LAHIRI):
+    """Computes the numeric core of get_planet_positions for N births in one call.
+    Ephemeris lookups stay per record (one frames.TropicalPass each); everything derived
+    from the longitudes is evaluated as array operations over all records at once.
+    Body axis follows BATCH_BODIES, varga axis follows VARGA_LIST."""
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    lats = np.broadcast_to(np.asarray(lats, dtype=float), jds.shape)
+    lons = np.broadcast_to(np.asarray(lons, dtype=float), jds.shape)
+    n = len(jds)
+
+    longitudes = np.empty((n, len(BATCH_BODIES)))
+    cusps = np.empty((n, 12))
+    for i in range(n):
+        frame = TropicalPass(jds[i], lats[i], lons[i]).frame(sid_mode, "P")
+        longitudes[i] = frame.lons
+        cusps[i] = frame.cusps
+
+    vargas = varga_signs_array(longitudes).transpose(0, 2, 1)
+    houses = ((vargas - vargas[:, :, :1]) % 12 + 1).astype(np.int8)
+
+    nak_span = 360/27
+    nakshatra = (np.floor(longitudes / nak_span).astype(np.int64) % 27).astype(np.int8)
+    charan = (np.floor((longitudes % nak_span) / (nak_span/4)).astype(np.int64) + 1).astype(np.int8)
+
+    kp = kp_lords_array(longitudes)
+    kp_cusps = kp_lords_array(cusps)
+
+    return {
+        "jd": jds, "longitudes": longitudes, "vargas": vargas, "houses": houses,
+        "nakshatra": nakshatra, "charan": charan, "kp": kp,
+        "cusps": cusps, "kp_cusps": kp_cusps,
+    }
@@ -0,0 +1,276 @@
+"""Reproducible micro-benchmarks for the hot paths, checked against a baseline.
+
+    python -m vedic_core.bench                       # run and compare with benchmarks/baseline.json
+    python -m vedic_core.bench --save                # record a new baseline
+    python -m vedic_core.bench -k dasha -k kp        # only cases whose name contains a filter
+    python -m vedic_core.bench --stages              # also print the per-stage timing histograms
+
+Every case runs on fixed inputs (seeded births, longitudes and dates) and
+reports the median and minimum time per call over `--repeat` samples.
+A case regresses when its minimum exceeds the baseline minimum by more than
+`--tolerance` (default 25%), and the exit status is then 1. The minimum is
+compared because noise on a shared machine only ever adds time. Baselines only
+mean something on the machine that recorded them, so the file stores a
+machine description and a mismatch is reported rather than ignored.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import swisseph as swe
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+SEED = 20240101
+
+
+def _births(n, seed=SEED):
+    """(jd, lat, lon, birth_dt) tuples spread over 1920-2020 and the inhabited latitudes."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        dt = datetime.datetime(1920, 1, 1) + datetime.timedelta(minutes=rng.randrange(100 * 525960))
+        jd = swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60)
+        out.append((jd, rng.uniform(-45, 60), rng.uniform(-125, 150), dt))
+    return out
+
+
+def _case_planet_positions():
+    from .chart import get_planet_positions
+
+    births = _births(20)
+    return lambda: [get_planet_positions(jd, lat, lon, dt, "English") for jd, lat, lon, dt in births], len(births)
+
+
+def _case_from_ephemeris():
+    from .model import Chart
+
+    births = _births(20)
+    return lambda: [Chart.from_ephemeris(jd, lat, lon, dt, sid_mode=swe.SIDM_LAHIRI) for jd, lat, lon, dt in births], len(births)
+
+
+def _case_from_frames():
+    from .frames import KP
+    from .model import Chart
+
+    births = _births(20)
+    pairs = [(swe.SIDM_LAHIRI, "P"), (swe.SIDM_LAHIRI, "W"), (swe.SIDM_RAMAN, "E"), KP]
+    return lambda: [Chart.from_frames(jd, lat, lon, dt, pairs) for jd, lat, lon, dt in births], len(births)
+
+
+def _degrees(n=1000):
+    rng = random.Random(SEED)
+    return [rng.uniform(0, 360) for _ in range(n)]
+
+
+def _case_kp_lords():
+    from .kp import get_kp_lords
+
+    degs = _degrees()
+    return lambda: [get_kp_lords(d) for d in degs], len(degs)
+
+
+def _case_kp_lords_sub_sub():
+    from .kp import get_kp_lords
+
+    degs = _degrees()
+    return lambda: [get_kp_lords(d, sub_sub=True) for d in degs], len(degs)
+
+
+def _case_varga_sign():
+    from .varga import VARGA_LIST, calculate_varga_sign
+
+    degs = _degrees(100)
+    return lambda: [calculate_varga_sign(d, v) for d in degs for v in VARGA_LIST], len(degs) * len(VARGA_LIST)
+
+
+def _case_vimshottari():
+    from .dasha import calculate_vimshottari_structure
+
+    births = _births(50)
+    return lambda: [calculate_vimshottari_structure(jd, dt) for jd, _, _, dt in births], len(births)
+
+
+def _case_sub_periods():
+    from .dasha import DASHA_LORDS, DASHA_YEARS, get_sub_periods
+
+    start = datetime.datetime(2000, 1, 1)
+    pairs = list(zip(DASHA_LORDS, DASHA_YEARS)) * 10
+    return lambda: [get_sub_periods(lord, start, years) for lord, years in pairs], len(pairs)
+
+
+def _case_dasha_tree():
+    from .dasha import DashaTree
+    from .service import sidereal
+
+    births = _births(50)
+    with sidereal(swe.SIDM_LAHIRI):
+        moons = [swe.calc_ut(jd, swe.MOON, swe.FLG_SIDEREAL)[0][0] for jd, _, _, _ in births]
+    at = swe.julday(2025, 6, 1, 0)
+    # A fresh tree per call so the memoized expansions are part of the measurement.
+    return lambda: [DashaTree(jd, m).at(at, depth=5) for (jd, _, _, _), m in zip(births, moons)], len(births)
+
+
+def _chart_inputs():
+    from .model import Chart
+
+    jd, lat, lon, dt = _births(1)[0]
+    chart = Chart.from_ephemeris(jd, lat, lon, dt, sid_mode=swe.SIDM_LAHIRI)
+    return chart.charts_data()["D1"], chart.first_house_sign("D1")
+
+
+def _case_draw_chart(style):
+    def make():
+        from .render import draw_chart
+
+        planets, asc = _chart_inputs()
+        return lambda: draw_chart(planets, asc, style, "D1"), 1
+    return make
+
+
+def _case_render_svg(style):
+    def make():
+        from .svg import _render, render_chart_svg
+
+        planets, asc = _chart_inputs()
+
+        def run():
+            _render.cache_clear()   # measure the render, not the memo
+            return render_chart_svg(planets, asc, style, "D1")
+        return run, 1
+    return make
+
+
+CASES = {
+    "chart.get_planet_positions": _case_planet_positions,
+    "chart.from_ephemeris": _case_from_ephemeris,
+    "chart.from_frames_4": _case_from_frames,
+    "kp.get_kp_lords": _case_kp_lords,
+    "kp.get_kp_lords_sub_sub": _case_kp_lords_sub_sub,
+    "varga.calculate_varga_sign": _case_varga_sign,
+    "dasha.vimshottari_structure": _case_vimshottari,
+    "dasha.get_sub_periods": _case_sub_periods,
+    "dasha.tree_at_depth5": _case_dasha_tree,
+    **{f"render.draw_chart_{s.lower()}": _case_draw_chart(s) for s in ("North", "South", "East")},
+    **{f"render.svg_{s.lower()}": _case_render_svg(s) for s in ("North", "South", "East")},
+}
+
+
+def machine():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "swisseph": swe.version}
+
+
+def measure(make, repeat=7, min_time=0.2):
+    """(median, min) seconds per call. The inner loop count is calibrated so one
+    sample takes at least `min_time`; a warm-up run absorbs imports and caches."""
+    fn, calls = make()
+    fn()
+    loops = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(loops): fn()
+        if time.perf_counter() - t >= min_time or loops >= 1 << 20: break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(loops): fn()
+        samples.append((time.perf_counter() - t) / (loops * calls))
+    return statistics.median(samples), min(samples)
+
+
+def run(filters=(), repeat=7, min_time=0.2, progress=None):
+    """{case: {"median_us", "min_us"}} for every case matching one of `filters` (all if empty)."""
+    results = {}
+    for name, make in CASES.items():
+        if filters and not any(f in name for f in filters): continue
+        med, best = measure(make, repeat, min_time)
+        results[name] = {"median_us": round(med * 1e6, 3), "min_us": round(best * 1e6, 3)}
+        if progress: progress(name, results[name])
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """{case: (ratio to baseline minimum or None, status)}; status is "ok", "REGRESSION",
+    "faster" (beyond the tolerance the other way) or "new"."""
+    report = {}
+    for name, r in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            report[name] = (None, "new")
+            continue
+        ratio = r["min_us"] / base["min_us"]
+        status = "REGRESSION" if ratio > 1 + tolerance else "faster" if ratio < 1 / (1 + tolerance) else "ok"
+        report[name] = (ratio, status)
+    return report
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f: return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, merge=True):
+    """Writes results (merged into the existing cases by default, so a filtered run only
+    updates its own cases) together with the machine description."""
+    old = (load_baseline(path) or {}).get("cases", {}) if merge else {}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = {"machine": machine(), "recorded": datetime.date.today().isoformat(), "cases": {**old, **results}}
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(path + ".tmp", path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks with baseline comparison")
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="run cases whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="record the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown of the minimum (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per sample")
+    parser.add_argument("--stages", action="store_true", help="enable vedic_core.timing and print its histograms")
+    parser.add_argument("--json", action="store_true", help="print results and comparison as JSON")
+    args = parser.parse_args(argv)
+
+    from . import timing
+
+    if args.stages: timing.enable()
+    baseline = load_baseline(args.baseline)
+    progress = None if args.json else (lambda name, r: print(f"  {name:<30} {r['median_us']:>12.2f} us", file=sys.stderr))
+    results = run(args.filters, args.repeat, args.min_time, progress)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    report = compare(results, baseline or {}, args.tolerance)
+    if args.json:
+        out = {"cases": {name: {**results[name], "ratio": ratio, "status": status} for name, (ratio, status) in report.items()}}
+        if args.stages: out["stages"] = timing.REGISTRY.snapshot()
+        print(json.dumps(out, indent=2))
+    else:
+        if baseline is None:
+            print(f"no baseline at {args.baseline}; run with --save to record one")
+        elif baseline.get("machine") != machine():
+            print(f"note: baseline was recorded on {baseline.get('machine')}, this is {machine()}")
+        for name, (ratio, status) in report.items():
+            r = results[name]
+            vs = f"{ratio:6.2f}x" if ratio is not None else "     -"
+            print(f"{name:<30} median {r['median_us']:>12.2f} us  min {r['min_us']:>12.2f} us  {vs}  {status}")
+        if args.stages: print(timing.REGISTRY.to_prometheus(), end="")
+    return 1 if any(status == "REGRESSION" for _, status in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Bulk chart generation for imported birth records.
+
+    python -m vedic_core.bulk clients.csv -o charts.jsonl
+    python -m vedic_core.bulk clients.parquet -o charts/ --format parquet --workers 8
+
+Input rows are read lazily (CSV via the csv module, Parquet in record
+batches) and cut into chunks; each chunk is one work unit for a process
+pool. A worker resolves the place (explicit lat/lon, else the offline
+gazetteer and local geocode cache), converts the local birth time to UT
+with the time zone index and computes the Chart. Results are written in
+input order as chunks complete, so at most `workers * 2` chunks are held
+in memory at once.
+
+After every written chunk a checkpoint (<output>.ckpt) records how many
+chunks are done and how long the output is; a rerun with the same
+arguments truncates any partial tail and carries on from there. JSONL goes
+to one file; Parquet output is a directory with one part file per chunk.
+Rows that cannot be resolved are written with an "error" field instead of
+a chart.
+"""
+import argparse
+import base64
+import csv
+import datetime
+import itertools
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+
+import swisseph as swe
+
+DEFAULT_CHUNK_SIZE = 2000
+COLUMNS = ("id", "name", "gender", "date", "time", "place", "lat", "lon", "tz")
+
+# --- reading ---
+def read_records(path, columns=None, batch_size=DEFAULT_CHUNK_SIZE):
+    """Yields input rows as dicts keyed by the COLUMNS names (missing ones are absent)."""
+    rename = {v: k for k, v in (columns or {}).items()}
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                yield {rename.get(k, k): v for k, v in row.items()}
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield {rename.get(k, k): v for k, v in row.items()}
+
+
+def chunked(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk: return
+        yield chunk
+
+
+# --- worker side ---
+_worker = {}
+
+
+def _init_worker(sid_mode):
+    from .gazetteer import PlaceResolver, open_default_gazetteer
+    from .timezones import open_default_resolver
+
+    _worker["sid_mode"] = sid_mode
+    places = PlaceResolver(open_default_gazetteer(), None)
+    _worker["place"] = lru_cache(maxsize=65536)(places.resolve)
+    _worker["tz"] = open_default_resolver()
+
+
+def _birth_dt(row):
+    date = row.get("date")
+    if isinstance(date, datetime.datetime): return date
+    if not isinstance(date, datetime.date): date = datetime.date.fromisoformat(str(date).strip())
+    t = row.get("time") or "00:00"
+    if not isinstance(t, datetime.time): t = datetime.time.fromisoformat(str(t).strip())
+    return datetime.datetime.combine(date, t)
+
+
+def chart_record(row):
+    """One output record for an input row. Raises ValueError for rows that cannot be resolved."""
+    from .model import ZODIAC, NAKSHATRAS, Chart
+
+    birth_dt = _birth_dt(row)
+    place = row.get("place") or ""
+    hint = row.get("tz") or None
+    if row.get("lat") not in (None, "") and row.get("lon") not in (None, ""):
+        lat, lon = float(row["lat"]), float(row["lon"])
+    else:
+        found = _worker["place"](place)
+        if found is None: raise ValueError(f"place not found: {place!r}")
+        lat, lon, hint = found.lat, found.lon, hint or found.timezone
+    jd, _, tz = _worker["tz"].birth_jd(birth_dt, lat, lon, hint=hint)
+    chart = Chart.from_ephemeris(jd, lat, lon, birth_dt, sid_mode=_worker["sid_mode"])
+    return {
+        "id": row.get("id"), "name": row.get("name"), "gender": row.get("gender"),
+        "birth": birth_dt.isoformat(), "place": place, "lat": lat, "lon": lon, "tz": tz, "jd": jd,
+        "lagna": ZODIAC[chart.sign(0)], "rashi": ZODIAC[chart.sign(2)],
+        "nakshatra": NAKSHATRAS[chart.nakshatra(2)], "pada": chart.pada(2),
+        "chart": chart.to_bytes(),
+    }
+
+
+def process_chunk(index, rows):
+    out = []
+    for row in rows:
+        try: out.append(chart_record(row))
+        except (ValueError, TypeError, KeyError) as e:
+            out.append({"id": row.get("id"), "name": row.get("name"), "error": str(e)})
+    return index, out
+
+
+# --- writing ---
+class JSONLWriter:
+    """Appends to one file; the checkpointed position is its byte length."""
+
+    def __init__(self, path, position=0):
+        self.path = path
+        self.f = open(path, "ab")
+        self.f.truncate(position)
+        self.f.seek(position)
+
+    def write(self, index, records):
+        for r in records:
+            if "chart" in r: r = {**r, "chart": base64.b64encode(r["chart"]).decode("ascii")}
+            self.f.write(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+    """One part file per chunk in a directory; the checkpointed position is the chunk count."""
+
+    def __init__(self, path, position=0):
+        import pyarrow  # noqa: F401  (fail before any work is scheduled)
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, index, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        cols = ["id", "name", "gender", "birth", "place", "lat", "lon", "tz", "jd",
+                "lagna", "rashi", "nakshatra", "pada", "chart", "error"]
+        table = pa.Table.from_pylist([{c: r.get(c) for c in cols} for r in records])
+        part = os.path.join(self.path, f"part-{index:06d}.parquet")
+        pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        return index + 1
+
+    def close(self):
+        pass
+
+
+def _load_checkpoint(path, meta):
+    try:
+        with open(path, encoding="utf-8") as f: ckpt = json.load(f)
+    except FileNotFoundError:
+        return None
+    if any(ckpt.get(k) != v for k, v in meta.items()):
+        raise SystemExit(f"checkpoint {path} was written with different arguments; delete it to start over")
+    return ckpt
+
+
+def _save_checkpoint(path, ckpt):
+    with open(path + ".tmp", "w", encoding="utf-8") as f: json.dump(ckpt, f)
+    os.replace(path + ".tmp", path)
+
+
+def run(input_path, output, fmt="jsonl", chunk_size=DEFAULT_CHUNK_SIZE, workers=None, columns=None,
+        sid_mode=swe.SIDM_LAHIRI, checkpoint=None, progress=None):
+    """Generates charts for every row of `input_path`, resuming from the checkpoint if one
+    exists. Returns {"records", "errors", "seconds", "rate"} for this run."""
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    checkpoint = checkpoint or output.rstrip("/") + ".ckpt"
+    meta = {"input": os.path.abspath(input_path), "format": fmt, "chunk_size": chunk_size, "sid_mode": sid_mode,
+            "columns": dict(columns or {})}
+    ckpt = _load_checkpoint(checkpoint, meta) or {**meta, "chunks": 0, "position": 0, "records": 0, "errors": 0}
+    writer = (ParquetWriter if fmt == "parquet" else JSONLWriter)(output, ckpt["position"])
+
+    rows = itertools.islice(read_records(input_path, columns, chunk_size), ckpt["chunks"] * chunk_size, None)
+    chunks = enumerate(chunked(rows, chunk_size), start=ckpt["chunks"])
+    records = errors = 0
+    t0 = time.perf_counter()
+    done, pending, next_index = {}, set(), ckpt["chunks"]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(sid_mode,)) as pool:
+        try:
+            while True:
+                for index, chunk in itertools.islice(chunks, max(0, workers * 2 - len(pending) - len(done))):
+                    pending.add(pool.submit(process_chunk, index, chunk))
+                if not pending and not done: break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    index, out = fut.result()
+                    done[index] = out
+                while next_index in done:
+                    out = done.pop(next_index)
+                    bad = sum("error" in r for r in out)
+                    records += len(out)
+                    errors += bad
+                    ckpt.update(chunks=next_index + 1, position=writer.write(next_index, out),
+                                records=ckpt["records"] + len(out), errors=ckpt["errors"] + bad)
+                    _save_checkpoint(checkpoint, ckpt)
+                    next_index += 1
+                    if progress: progress(ckpt, records / (time.perf_counter() - t0))
+        finally:
+            writer.close()
+    seconds = time.perf_counter() - t0
+    return {"records": records, "errors": errors, "seconds": seconds, "rate": records / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate charts for a CSV/Parquet file of birth records")
+    parser.add_argument("input", help="CSV or .parquet with columns " + ", ".join(COLUMNS))
+    parser.add_argument("-o", "--output", required=True, help="JSONL file, or a directory for --format parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--col", action="append", default=[], metavar="FIELD=COLUMN",
+                        help="map an input column to a field, e.g. --col date=dob")
+    parser.add_argument("--checkpoint", help="default: <output>.ckpt")
+    args = parser.parse_args(argv)
+
+    columns = dict(c.split("=", 1) for c in args.col)
+    def progress(ckpt, rate):
+        print(f"\r{ckpt['records']} records ({ckpt['errors']} errors), {rate:.0f} rec/s", end="", file=sys.stderr, flush=True)
+    stats = run(args.input, args.output, args.format, args.chunk_size, args.workers, columns,
+                checkpoint=args.checkpoint, progress=progress)
+    print(f"\n{stats['records']} records in {stats['seconds']:.1f} s ({stats['rate']:.0f} rec/s), "
+          f"{stats['errors']} errors", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Content-addressed cache for computed chart bundles.
+
+Two tiers: a bounded in-process LRU in front of an on-disk store that evicts
+the least recently used files once it grows past a byte budget. The store's
+size is a running counter; only crossing the budget walks the directory, on a
+background thread. Entries are
+keyed by a SHA-256 of the canonicalised inputs, so the same birth computed by
+any user in any session hits the same entry.
+"""
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import swisseph as swe
+
+# Bump when chart computation or the Chart encoding changes so stale
+# bundles are never served.
+CACHE_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "charts")
+
+
+def canonical_key(namespace, **inputs):
+    """SHA-256 over a canonical JSON encoding of `inputs` (sorted keys, floats rounded)."""
+    def norm(v):
+        if isinstance(v, float): return round(v, 6)
+        if isinstance(v, (datetime.date, datetime.datetime)): return v.isoformat()
+        if isinstance(v, (list, tuple)): return [norm(x) for x in v]
+        if isinstance(v, dict): return {str(k): norm(x) for k, x in v.items()}
+        return v
+    payload = json.dumps({"ns": namespace, **{k: norm(v) for k, v in inputs.items()}},
+                         sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chart_key(jd, lat, lon, birth_dt, ayanamsa=swe.SIDM_LAHIRI, house_system="P"):
+    return canonical_key("chart", v=CACHE_VERSION, jd=float(jd), lat=float(lat), lon=float(lon),
+                         birth_dt=birth_dt, ayanamsa=int(ayanamsa), house_system=house_system)
+
+
+class TieredCache:
+    """Memory LRU (max_entries) over a disk directory (max_bytes). Values are pickled
+    once on insert and unpickled per hit, so callers never share mutable state."""
+
+    def __init__(self, max_entries=256, directory=None, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()        # memory LRU and hit counters only
+        self._disk_lock = threading.Lock()   # byte counter and the eviction flag
+        self._disk_bytes = 0
+        self._evicting = False
+        self.hits_memory = self.hits_disk = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    # --- disk tier ---
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for f in files:
+                if not f.endswith(".pkl"): continue
+                path = os.path.join(root, f)
+                try: st = os.stat(path)
+                except FileNotFoundError: continue
+                yield path, st.st_size, st.st_mtime
+
+    def _disk_get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f: blob = f.read()
+            os.utime(path)  # mtime doubles as last-access time for eviction
+            return blob
+        except FileNotFoundError:
+            return None
+
+    def _disk_put(self, key, blob):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try: old = os.path.getsize(path)
+        except FileNotFoundError: old = 0
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f: f.write(blob)
+            os.replace(tmp, path)
+        except BaseException:
+            # e.g. ENOSPC: a stray .tmp would never be counted or evicted
+            try: os.unlink(tmp)
+            except FileNotFoundError: pass
+            raise
+        with self._disk_lock:
+            self._disk_bytes += len(blob) - old
+            if self._disk_bytes <= self.max_bytes or self._evicting: return
+            self._evicting = True
+        threading.Thread(target=self._evict_disk, name="TieredCache-evict", daemon=True).start()
+
+    def _evict_disk(self):
+        # Runs on its own thread, one at a time, only once the byte counter passes the
+        # budget. Drops oldest-accessed files until we are back under 90% of it.
+        removed = 0
+        try:
+            entries = sorted(self._disk_entries(), key=lambda e: e[2])
+            excess = sum(size for _, size, _ in entries) - self.max_bytes * 0.9
+            for path, size, _ in entries:
+                if removed >= excess: break
+                try:
+                    os.remove(path)
+                    removed += size
+                except FileNotFoundError:
+                    pass
+        finally:
+            with self._disk_lock:
+                self._disk_bytes -= removed
+                self._evicting = False
+
+    # --- public API ---
+    # The lock covers the memory LRU only; disk reads and writes happen outside it.
+    def get(self, key, default=None):
+        with self._lock:
+            blob = self._mem.get(key)
+            if blob is not None:
+                self._mem.move_to_end(key)
+                self.hits_memory += 1
+        if blob is not None: return pickle.loads(blob)
+        blob = self._disk_get(key) if self.directory else None
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return default
+            self.hits_disk += 1
+            self._mem_put(key, blob)
+        return pickle.loads(blob)
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._mem_put(key, blob)
+        if self.directory: self._disk_put(key, blob)
+
+    def _mem_put(self, key, blob):
+        self._mem[key] = blob
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._mem.clear()
+        if disk and self.directory:
+            removed = 0
+            for path, size, _ in list(self._disk_entries()):
+                try:
+                    os.remove(path)
+                    removed += size
+                except FileNotFoundError:
+                    pass
+            with self._disk_lock: self._disk_bytes -= removed
+
+    def stats(self):
+        with self._disk_lock: disk_bytes = self._disk_bytes
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "hits_memory": self.hits_memory, "hits_disk": self.hits_disk, "misses": self.misses,
+                "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+                "memory_entries": len(self._mem), "disk_bytes": disk_bytes,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_chart_cache():
+    """Process-wide chart cache; disk tier lives in $VEDIC_CACHE_DIR (or ~/.cache/vedic_core/charts)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TieredCache(directory=os.environ.get("VEDIC_CACHE_DIR", DEFAULT_CACHE_DIR))
+        return _default_cache
+
+
+def cached_chart(jd, lat, lon, birth_dt, ayanamsa=swe.SIDM_LAHIRI, cache=None, house_system="P", service=None):
+    """Chart.from_ephemeris through the chart cache (entries are Chart.to_bytes blobs).
+    Misses are computed by `service` (an EphemerisService) when given, else in this thread."""
+    from .model import Chart
+    from .service import ChartRequest, compute_chart
+
+    cache = cache if cache is not None else default_chart_cache()
+    key = chart_key(jd, lat, lon, birth_dt, ayanamsa, house_system)
+    blob = cache.get(key)
+    if blob is not None:
+        return Chart.from_bytes(blob)
+    request = ChartRequest(jd, lat, lon, birth_dt, ayanamsa, house_system)
+    chart = service.chart(request) if service is not None else compute_chart(request)
+    cache.set(key, chart.to_bytes())
+    return chart
+
+
+def cached_planet_positions(jd, lat, lon, birth_dt, lang, ayanamsa=swe.SIDM_LAHIRI, cache=None):
+    """get_planet_positions through the chart cache. Returns the same 7-tuple."""
+    return cached_chart(jd, lat, lon, birth_dt, ayanamsa, cache).legacy()
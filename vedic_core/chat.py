@@ -0,0 +1,117 @@
+"""Bounded chat history for the AI tab.
+
+Each session keeps at most `max_messages` recent turns (and `max_chars` of
+text) in memory. Older turns are paged out to a ChatStore (SQLite) and
+folded into a rolling summary that stands in for them in the prompt. The UI
+renders a recent window and pages older turns back in from the store only
+when asked.
+"""
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+DEFAULT_CHAT_DB = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "chat.sqlite")
+_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)", re.S)
+
+
+class ChatStore:
+    """Paged-out messages per session, in SQLite (":memory:" when path is None)."""
+
+    def __init__(self, path=DEFAULT_CHAT_DB):
+        if path and path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS messages (session TEXT, seq INTEGER, role TEXT, content TEXT, "
+                         "PRIMARY KEY (session, seq))")
+
+    def append(self, session, messages):
+        """messages: iterable of (seq, role, content)."""
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?)",
+                                 [(session, seq, role, content) for seq, role, content in messages])
+
+    def page(self, session, before_seq, limit):
+        """Up to `limit` messages with seq < before_seq, oldest first, as dicts."""
+        with self._lock:
+            rows = self._db.execute("SELECT seq, role, content FROM messages WHERE session = ? AND seq < ? "
+                                    "ORDER BY seq DESC LIMIT ?", (session, before_seq, limit)).fetchall()
+        return [{"seq": seq, "role": role, "content": content} for seq, role, content in reversed(rows)]
+
+    def delete(self, session):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE session = ?", (session,))
+
+
+def rolling_summary(summary, messages, limit=1500):
+    """Extractive summary: the first sentence of each paged-out turn, oldest lines
+    dropped once the summary exceeds `limit` characters."""
+    lines = summary.splitlines() if summary else []
+    for m in messages:
+        text = " ".join(m["content"].split())
+        first = _SENTENCE.match(text)
+        gist = (first.group(1) if first else text)[:200]
+        lines.append(f"{'User' if m['role'] == 'user' else 'TaraVaani'}: {gist}")
+    while lines and sum(len(l) + 1 for l in lines) > limit:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ChatHistory:
+    def __init__(self, store=None, session_id=None, max_messages=12, max_chars=24000,
+                 summarizer=rolling_summary):
+        self.store = store
+        self.session_id = session_id or uuid.uuid4().hex
+        self.max_messages, self.max_chars = max_messages, max_chars
+        self.summarizer = summarizer
+        self.recent = []        # dicts with seq, role, content
+        self.summary = ""
+        self.next_seq = 0
+        self._chars = 0
+
+    def __len__(self):
+        """All messages in the conversation, including paged-out ones."""
+        return self.next_seq
+
+    @property
+    def first_recent_seq(self):
+        return self.recent[0]["seq"] if self.recent else self.next_seq
+
+    def append(self, role, content):
+        self.recent.append({"seq": self.next_seq, "role": role, "content": content})
+        self.next_seq += 1
+        self._chars += len(content)
+        # Always keep the last exchange in memory, however long it is
+        n_out = 0
+        while len(self.recent) - n_out > 2 and (len(self.recent) - n_out > self.max_messages or self._chars > self.max_chars):
+            self._chars -= len(self.recent[n_out]["content"])
+            n_out += 1
+        if n_out: self._page_out(n_out)
+
+    def _page_out(self, n):
+        old, self.recent = self.recent[:n], self.recent[n:]
+        if self.store is not None:
+            self.store.append(self.session_id, [(m["seq"], m["role"], m["content"]) for m in old])
+        self.summary = self.summarizer(self.summary, old)
+
+    def window(self, n):
+        """The last n messages for display, paging older ones in from the store if needed."""
+        shown = self.recent[-n:] if n > 0 else []
+        missing = n - len(shown)
+        if missing > 0 and self.store is not None and self.first_recent_seq > 0:
+            shown = self.store.page(self.session_id, self.first_recent_seq, missing) + shown
+        return shown
+
+    def prompt_context(self, last=4):
+        """Rolling summary of paged-out turns plus the last few messages verbatim."""
+        parts = []
+        if self.summary:
+            parts.append("Earlier in this conversation (summary):\n" + self.summary)
+        parts.append("\n".join(f"{m['role']}: {m['content']}" for m in self.recent[-last:]))
+        return "\n\n".join(parts)
+
+    def clear(self):
+        if self.store is not None: self.store.delete(self.session_id)
+        self.recent, self.summary, self.next_seq, self._chars = [], "", 0, 0
@@ -0,0 +1,199 @@
+"""Vimshottari dasha periods."""
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import swisseph as swe
+
+def calculate_vimshottari_structure(jd, birth_date, sid_mode=swe.SIDM_LAHIRI):
+    from .service import sidereal
+
+    with sidereal(sid_mode): moon_pos = swe.calc_ut(jd, 1, swe.FLG_SIDEREAL)[0][0]
+    nak_deg = (moon_pos * (27/360)) 
+    nak_idx = int(nak_deg)
+    balance_prop = 1 - (nak_deg - nak_idx)
+    lords = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+    years = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+    start_lord_idx = nak_idx % 9
+    dashas = []
+    curr_date = birth_date
+    first_dur = years[start_lord_idx] * balance_prop
+    dashas.append({"Lord": lords[start_lord_idx], "Start": curr_date, "End": curr_date + datetime.timedelta(days=first_dur*365.25), "FullYears": years[start_lord_idx]})
+    curr_date = dashas[0]['End']
+    for i in range(1, 9):
+        idx = (start_lord_idx + i) % 9
+        dur = years[idx]
+        dashas.append({"Lord": lords[idx], "Start": curr_date, "End": curr_date + datetime.timedelta(days=dur*365.25), "FullYears": dur})
+        curr_date = dashas[-1]['End']
+    return dashas
+
+def get_sub_periods(lord_name, start_date, level_years):
+    lords = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+    years = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+    try: start_idx = lords.index(lord_name)
+    except: return []
+    subs = []
+    curr = start_date
+    for i in range(9):
+        idx = (start_idx + i) % 9
+        sub_lord = lords[idx]
+        sub_years = years[idx]
+        duration_years = (level_years * sub_years) / 120
+        end_date = curr + datetime.timedelta(days=duration_years*365.25)
+        subs.append({"Lord": sub_lord, "Start": curr, "End": end_date, "Duration": duration_years, "FullYears": sub_years})
+        curr = end_date
+    return subs
+
+# --- LAZY DASHA TREE ---
+DASHA_LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+DASHA_YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+DASHA_LEVELS = ["Mahadasha", "Antardasha", "Pratyantardasha", "Sookshma", "Prana", "Deha"]
+YEAR_DAYS = 365.25
+# CUM[l][i]: fraction of a parent period elapsed before its i-th sub-period when the parent's lord is l
+CUM = [[sum(DASHA_YEARS[(l + j) % 9] for j in range(i)) / 120 for i in range(10)] for l in range(9)]
+
+
+def jd_to_datetime(jd):
+    y, m, d, h = swe.revjul(jd)
+    return datetime.datetime(y, m, d) + datetime.timedelta(hours=h)
+
+
+def datetime_to_jd(dt):
+    return swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60 + dt.second / 3600)
+
+
+class DashaPeriod(NamedTuple):
+    lord: str
+    level: int          # 1 = Mahadasha ... 6 = Deha
+    start_jd: float
+    end_jd: float
+    path: tuple         # child index at each level, from the Mahadasha down
+
+    @property
+    def start(self): return jd_to_datetime(self.start_jd)
+
+    @property
+    def end(self): return jd_to_datetime(self.end_jd)
+
+
+class DashaTree:
+    """Vimshottari periods as an implicit tree over one 120-year cycle.
+
+    The cycle is anchored where the birth nakshatra's lord period would have
+    begun, so sub-periods of the first (balance) Mahadasha fall on their true
+    dates. Levels are expanded on demand and each expanded node keeps only its
+    ten boundary JDs; point lookups bisect one level at a time. Periods run from
+    birth_jd to end_jd, the end of the ninth Mahadasha; at() refuses any other
+    moment rather than report the first or last period as running.
+    """
+    __slots__ = ("birth_jd", "_root", "_bounds")
+
+    def __init__(self, birth_jd, moon_lon):
+        nak_deg = moon_lon * (27 / 360)
+        nak_idx = int(nak_deg)
+        lord = nak_idx % 9
+        elapsed = nak_deg - nak_idx
+        self.birth_jd = birth_jd
+        self._root = (birth_jd - elapsed * DASHA_YEARS[lord] * YEAR_DAYS, 120 * YEAR_DAYS, lord)
+        self._bounds = {}
+
+    @classmethod
+    def from_jd(cls, jd, sid_mode=swe.SIDM_LAHIRI):
+        from .service import sidereal
+
+        with sidereal(sid_mode): moon = swe.calc_ut(jd, 1, swe.FLG_SIDEREAL)[0][0]
+        return cls(jd, moon)
+
+    @property
+    def end_jd(self):
+        start, length, _ = self._root
+        return start + length
+
+    def covers(self, jd):
+        """Whether a period is running at `jd`: birth_jd <= jd < end_jd."""
+        return self.birth_jd <= jd < self.end_jd
+
+    def _expand(self, path):
+        """(boundaries, first child lord) for the node at `path` (() is the whole cycle)."""
+        hit = self._bounds.get(path)
+        if hit is not None: return hit
+        if path:
+            parent_bounds, parent_first = self._expand(path[:-1])
+            k = path[-1]
+            start, length = parent_bounds[k], parent_bounds[k + 1] - parent_bounds[k]
+            lord = (parent_first + k) % 9
+        else:
+            start, length, lord = self._root
+        hit = (array("d", (start + length * f for f in CUM[lord])), lord)
+        self._bounds[path] = hit
+        return hit
+
+    def _period(self, path):
+        bounds, first = self._expand(path[:-1])
+        k = path[-1]
+        return DashaPeriod(DASHA_LORDS[(first + k) % 9], len(path), bounds[k], bounds[k + 1], path)
+
+    def children(self, period=None):
+        """The nine sub-periods of `period`; the Mahadashas when `period` is None."""
+        path = period.path if period else ()
+        return [self._period(path + (k,)) for k in range(9)]
+
+    def at(self, jd, depth=5):
+        """Chain of running periods at `jd`, Mahadasha first, `depth` levels deep.
+        ValueError unless covers(jd)."""
+        if not self.covers(jd):
+            raise ValueError(f"jd {jd} is outside the dasha cycle [{self.birth_jd}, {self.end_jd})")
+        chain, path = [], ()
+        for _ in range(depth):
+            bounds, _ = self._expand(path)
+            k = min(max(bisect_right(bounds, jd) - 1, 0), 8)   # clamp only guards float round-off
+            path += (k,)
+            chain.append(self._period(path))
+        return chain
+
+    def periods(self, level, jd0, jd1):
+        """All periods at `level` (1 = Mahadasha) overlapping [jd0, jd1], in order."""
+        out, stack = [], [()]
+        while stack:
+            path = stack.pop()
+            bounds, _ = self._expand(path)
+            lo = max(bisect_right(bounds, jd0) - 1, 0)
+            hi = min(bisect_left(bounds, jd1), 9)
+            kids = [path + (k,) for k in range(lo, hi)]
+            if len(path) + 1 == level: out.extend(self._period(p) for p in kids)
+            else: stack.extend(reversed(kids))
+        return out
+
+
+def current_dasha_chains(birth_jds, moon_lons, at_jd, depth=3):
+    """Running dasha chain at `at_jd` for many charts at once.
+    Returns (lords, starts, ends): arrays of shape (N, depth) with lord indices
+    into DASHA_LORDS and period boundaries as JDs. Rows where `at_jd` falls before
+    birth or after the ninth Mahadasha (see DashaTree.covers) get lord -1 and NaN."""
+    import numpy as np
+
+    birth_jds = np.asarray(birth_jds, dtype=float)
+    moon_lons = np.asarray(moon_lons, dtype=float)
+    at = np.broadcast_to(np.asarray(at_jd, dtype=float), birth_jds.shape)
+    cum, years = np.asarray(CUM), np.asarray(DASHA_YEARS, dtype=float)
+
+    nak_deg = moon_lons * (27 / 360)
+    nak_idx = nak_deg.astype(np.int64)
+    lord = nak_idx % 9
+    start = birth_jds - (nak_deg - nak_idx) * years[lord] * YEAR_DAYS
+    length = np.full(birth_jds.shape, 120 * YEAR_DAYS)
+
+    lords = np.empty(birth_jds.shape + (depth,), dtype=np.int8)
+    starts, ends = np.empty(lords.shape), np.empty(lords.shape)
+    rows = np.arange(len(birth_jds))
+    outside = (at < birth_jds) | (at >= start + length)
+    for level in range(depth):
+        bounds = start[:, None] + length[:, None] * cum[lord]
+        k = np.clip((bounds[:, 1:] <= at[:, None]).sum(axis=1), 0, 8)
+        child_lord = (lord + k) % 9
+        start, end = bounds[rows, k], bounds[rows, k + 1]
+        lords[:, level], starts[:, level], ends[:, level] = child_lord, start, end
+        lord, length = child_lord, end - start
+    lords[outside], starts[outside], ends[outside] = -1, np.nan, np.nan
+    return lords, starts, ends
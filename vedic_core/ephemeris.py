@@ -0,0 +1,278 @@
+"""Precomputed sidereal ephemeris: Chebyshev segments in a memory-mapped file.
+
+Each graha's sidereal longitude (unwrapped, so it is smooth across 0 deg)
+is fitted per fixed-length segment with a Chebyshev series at the
+Chebyshev nodes. Speeds come from the derivative of the same series.
+Ketu is Rahu + 180. Segment lengths and degrees are chosen per body so
+the fit error is around 1e-4 arcsec (about 0.08 arcsec for the true node,
+which wobbles on a scale of days). Near a conjunction with the Sun,
+swisseph's gravitational light-deflection term rises and falls within a
+day or so, faster than a segment can follow. Segments that come within
+NEAR_SUN_DEG of the Sun are therefore flagged at build time, and lookups
+in them go to swisseph. That is 4-7% of the time for Mars, Jupiter, Venus
+and Saturn, about a fifth for Mercury, and none for the Sun, Moon and
+nodes. `verify` reports the worst error and where it occurs.
+
+    python -m vedic_core.ephemeris build            # 1900-2100, Lahiri
+    python -m vedic_core.ephemeris verify --samples 20000
+    python -m vedic_core.ephemeris bench
+
+The file is mapped read-only, so every process (app workers, bulk pools)
+shares one copy through the page cache. ChebyshevEphemeris.lon_speed has
+the (body, jd) -> (longitude, speed) signature that transits and the
+panchang calendar accept as `eph`. lon_speed_array evaluates NumPy arrays
+of times in one pass.
+"""
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+import swisseph as swe
+
+from .service import sidereal
+
+MAGIC = b"VEPH\x00\x00\x00\x01"
+_HEADER = struct.Struct("<8sIddI")        # magic, sid_mode, jd0, jd1, n_bodies
+_BODY = struct.Struct("<12sdIIQQ")        # name, segment days, coefficients, segments, data offset, flags offset
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "ephemeris_lahiri.bin")
+
+START_JD = 2415020.5   # 1900-01-01 00:00 UT
+END_JD = 2488069.5     # 2100-01-01 00:00 UT
+# body: (swisseph id, segment days, number of coefficients)
+SEGMENTS = {
+    "Sun": (swe.SUN, 16, 12), "Moon": (swe.MOON, 4, 16), "Mars": (swe.MARS, 8, 12),
+    "Mercury": (swe.MERCURY, 8, 14), "Jupiter": (swe.JUPITER, 8, 10), "Venus": (swe.VENUS, 8, 12),
+    "Saturn": (swe.SATURN, 8, 10), "Rahu": (swe.TRUE_NODE, 4, 14),
+}
+DEFLECTED = {"Mars", "Mercury", "Jupiter", "Venus", "Saturn"}
+NEAR_SUN_DEG = 3.0
+GRAHAS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+
+
+def _align(n):
+    return (n + 63) & ~63
+
+
+def _fit_body(pid, seg_days, n_coef, jd0, n_seg):
+    """(n_seg, n_coef) coefficients; the first is pre-halved so eval is sum(c_k T_k)."""
+    k = np.arange(n_coef)
+    nodes = np.cos(np.pi * (k + 0.5) / n_coef)[::-1]          # ascending in time
+    basis = np.cos(np.outer(k, np.pi * (k[::-1] + 0.5) / n_coef)) * (2 / n_coef)
+    basis[0] /= 2
+    starts = jd0 + seg_days * np.arange(n_seg)
+    times = starts[:, None] + (nodes + 1) * (seg_days / 2)
+    lons = np.empty(times.shape)
+    flags = swe.FLG_SIDEREAL
+    for i, jd in enumerate(times.ravel()):
+        lons.flat[i] = swe.calc_ut(float(jd), pid, flags)[0][0]
+    lons = np.unwrap(lons, period=360, axis=1)
+    return lons @ basis.T
+
+
+def _near_sun(coef, sun_coef, seg_days, sun_days, step=0.25):
+    """uint8 flag per segment: 1 if the body comes within NEAR_SUN_DEG of the Sun in it."""
+    from numpy.polynomial.chebyshev import chebval
+
+    x = np.linspace(-1, 1, int(seg_days / step) + 1)
+    lon = chebval(x, coef.T)                                   # (n_seg, len(x)); c0 is pre-halved
+    jd_off = seg_days * np.arange(len(coef))[:, None] + (x + 1) * (seg_days / 2)
+    j = np.minimum((jd_off // sun_days).astype(np.int64), len(sun_coef) - 1)
+    xs = np.clip(2 * (jd_off - j * sun_days) / sun_days - 1, -1, 1)
+    theta = np.arccos(xs)
+    sun = sum(sun_coef[j, k] * np.cos(k * theta) for k in range(sun_coef.shape[1]))
+    elong = np.abs((lon - sun + 180) % 360 - 180)
+    return (elong.min(axis=1) < NEAR_SUN_DEG).astype(np.uint8)
+
+
+def build(path=DEFAULT_PATH, jd0=START_JD, jd1=END_JD, sid_mode=swe.SIDM_LAHIRI, progress=None):
+    names = list(SEGMENTS)
+    table_end = _align(_HEADER.size + _BODY.size * len(names))
+    entries, blobs, offset, fits = [], [], table_end, {}
+    with sidereal(sid_mode):   # held for the whole fit (about a minute)
+        for name in names:
+            pid, seg_days, n_coef = SEGMENTS[name]
+            n_seg = math.ceil((jd1 - jd0) / seg_days)
+            coef = fits[name] = _fit_body(pid, seg_days, n_coef, jd0, n_seg).astype("<f8")
+            flags = _near_sun(coef, fits["Sun"], seg_days, SEGMENTS["Sun"][1]) if name in DEFLECTED \
+                else np.zeros(n_seg, dtype=np.uint8)
+            entries.append(_BODY.pack(name.encode(), seg_days, n_coef, n_seg, offset, _align(offset + coef.nbytes)))
+            blobs.append((offset, coef.tobytes()))
+            offset = _align(offset + coef.nbytes)
+            blobs.append((offset, flags.tobytes()))
+            offset = _align(offset + flags.nbytes)
+            if progress: progress(name, flags.mean())
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, sid_mode, jd0, jd1, len(names)) + b"".join(entries))
+        for off, blob in blobs:
+            f.seek(off)
+            f.write(blob)
+    os.replace(tmp, path)
+    return path
+
+
+class ChebyshevEphemeris:
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            magic, self.sid_mode, self.jd0, self.jd1, n = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC: raise ValueError(f"{path} is not an ephemeris store")
+            entries = [_BODY.unpack(f.read(_BODY.size)) for _ in range(n)]
+        self.path = path
+        self._seg, self._coef, self._flags, self._last = {}, {}, {}, {}
+        for raw, seg_days, n_coef, n_seg, offset, flags_offset in entries:
+            name = raw.rstrip(b"\0").decode()
+            self._seg[name] = seg_days
+            self._coef[name] = np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=(n_seg, n_coef))
+            self._flags[name] = np.memmap(path, dtype=np.uint8, mode="r", offset=flags_offset, shape=(n_seg,))
+
+    def _check(self, jd):
+        if not (self.jd0 <= jd <= self.jd1):
+            raise ValueError(f"JD {jd} outside the ephemeris store ({self.jd0}-{self.jd1})")
+
+    def _swiss(self, body, jd):
+        from .service import sidereal
+        from .transits import swiss_lon_speed
+
+        with sidereal(self.sid_mode): return swiss_lon_speed(body, jd)
+
+    def lon_speed(self, body, jd):
+        """Sidereal longitude [0, 360) and speed (deg/day) of a graha at `jd`."""
+        name = "Rahu" if body == "Ketu" else body
+        self._check(jd)
+        seg = self._seg[name]
+        coef = self._coef[name]
+        i = min(int((jd - self.jd0) // seg), len(coef) - 1)
+        last = self._last.get(name)
+        if last is None or last[0] != i:
+            last = self._last[name] = (i, None if self._flags[name][i] else coef[i].tolist())
+        c = last[1]
+        if c is None: return self._swiss(body, jd)
+        x = 2 * (jd - self.jd0 - i * seg) / seg - 1
+        # T_k for the value and k * U_{k-1} for the derivative, in one recurrence.
+        t0, t1, u0, u1 = 1.0, x, 1.0, 2 * x
+        val, der = c[0] + c[1] * x, c[1]
+        for k in range(2, len(c)):
+            t0, t1 = t1, 2 * x * t1 - t0
+            der += k * c[k] * u1
+            u0, u1 = u1, 2 * x * u1 - u0
+            val += c[k] * t1
+        return ((val + 180) % 360 if body == "Ketu" else val % 360), der * 2 / seg
+
+    __call__ = lon_speed
+
+    def lon_speed_array(self, body, jds):
+        """Vectorized lon_speed over an array of JDs; returns (longitudes, speeds)."""
+        ketu = body == "Ketu"
+        if ketu: body = "Rahu"
+        jds = np.asarray(jds, dtype=float)
+        if jds.size and (jds.min() < self.jd0 or jds.max() > self.jd1):
+            raise ValueError(f"JDs outside the ephemeris store ({self.jd0}-{self.jd1})")
+        seg, coef = self._seg[body], self._coef[body]
+        i = np.minimum(((jds - self.jd0) // seg).astype(np.int64), len(coef) - 1)
+        x = 2 * (jds - self.jd0 - i * seg) / seg - 1
+        c = coef[i]
+        t0, t1, u0, u1 = np.ones_like(x), x, np.ones_like(x), 2 * x
+        val, der = c[..., 0] + c[..., 1] * x, c[..., 1].copy()
+        for k in range(2, c.shape[-1]):
+            t0, t1 = t1, 2 * x * t1 - t0
+            der += k * c[..., k] * u1
+            u0, u1 = u1, 2 * x * u1 - u0
+            val += c[..., k] * t1
+        lon, speed = ((val + 180) % 360 if ketu else val % 360), der * 2 / seg
+        near_sun = np.flatnonzero(self._flags[body][i])
+        for n in near_sun:
+            lon[n], speed[n] = self._swiss("Ketu" if ketu else body, float(jds[n]))
+        return lon, speed
+
+    def near_sun_fraction(self, body):
+        """Share of the range served by swisseph for `body` (flagged segments)."""
+        return float(self._flags["Rahu" if body == "Ketu" else body].mean())
+
+    def positions(self, jds):
+        """(longitudes, speeds), each shaped (len(jds), 9) in GRAHAS order."""
+        out = [self.lon_speed_array(b, jds) for b in GRAHAS]
+        return np.stack([o[0] for o in out], axis=-1), np.stack([o[1] for o in out], axis=-1)
+
+
+def open_default_ephemeris(sid_mode=swe.SIDM_LAHIRI):
+    """The store at $VEDIC_EPHEMERIS (or ~/.cache/vedic_core/ephemeris_lahiri.bin) if it
+    exists and was built for `sid_mode`, else None (callers fall back to swisseph)."""
+    path = os.environ.get("VEDIC_EPHEMERIS", DEFAULT_PATH)
+    if not os.path.exists(path): return None
+    store = ChebyshevEphemeris(path)
+    return store if store.sid_mode == sid_mode else None
+
+
+def verify(store, samples=20000, seed=0):
+    """Max |error| per body against swisseph at random instants and at segment edges
+    (both sides): {body: (max lon error arcsec, JD of that error, max speed error deg/day)}."""
+    from .transits import swiss_eph
+
+    swiss = swiss_eph(store.sid_mode)
+    rng = np.random.default_rng(seed)
+    jds = rng.uniform(store.jd0, store.jd1, samples)
+    report = {}
+    for body in GRAHAS:
+        seg = store._seg["Rahu" if body == "Ketu" else body]
+        edges = store.jd0 + seg * rng.integers(1, int((store.jd1 - store.jd0) // seg), samples // 10)
+        t = np.concatenate([jds, edges, edges - 1e-9])
+        lon, speed = store.lon_speed_array(body, t)
+        ref = np.array([swiss(body, float(jd)) for jd in t])
+        d_lon = np.abs((lon - ref[:, 0] + 180) % 360 - 180) * 3600
+        report[body] = (float(d_lon.max()), float(t[d_lon.argmax()]), float(np.abs(speed - ref[:, 1]).max()))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chebyshev ephemeris store tools")
+    parser.add_argument("--path", default=os.environ.get("VEDIC_EPHEMERIS", DEFAULT_PATH))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="fit the store from swisseph")
+    b.add_argument("--start", type=float, default=START_JD, help="JD (default 1900-01-01)")
+    b.add_argument("--end", type=float, default=END_JD, help="JD (default 2100-01-01)")
+    v = sub.add_parser("verify", help="max error against swisseph over the full range")
+    v.add_argument("--samples", type=int, default=20000)
+    sub.add_parser("bench", help="lookup speed against swisseph")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        t = time.perf_counter()
+        build(args.path, args.start, args.end,
+              progress=lambda name, near: print(f"  {name:<8} {near:.1%} of segments near the Sun", file=sys.stderr))
+        print(f"{args.path}: {os.path.getsize(args.path) / 1e6:.1f} MB in {time.perf_counter() - t:.0f} s")
+        return 0
+    store = ChebyshevEphemeris(args.path)
+    if args.cmd == "verify":
+        worst = 0.0
+        for body, (d_lon, at, d_speed) in verify(store, args.samples).items():
+            worst = max(worst, d_lon)
+            print(f"{body:<8} max |dlon| {d_lon:.6f}\" (JD {at:.2f})  max |dspeed| {d_speed:.2e} deg/day  "
+                  f"swisseph {store.near_sun_fraction(body):.1%}")
+        print(f"worst longitude error {worst:.6f} arcsec")
+        return 0
+    from .transits import swiss_eph
+
+    swiss = swiss_eph(store.sid_mode)
+    jds = np.random.default_rng(1).uniform(store.jd0, store.jd1, 20000)
+    for body in ("Sun", "Moon", "Rahu"):
+        t = time.perf_counter()
+        for jd in jds[:5000]: swiss(body, float(jd))
+        t_swe = (time.perf_counter() - t) / 5000
+        t = time.perf_counter()
+        for jd in jds[:5000]: store.lon_speed(body, float(jd))
+        t_scalar = (time.perf_counter() - t) / 5000
+        t = time.perf_counter()
+        store.lon_speed_array(body, jds)
+        t_vec = (time.perf_counter() - t) / len(jds)
+        print(f"{body:<5} swisseph {t_swe * 1e6:7.2f} us  scalar {t_scalar * 1e6:6.2f} us  "
+              f"vectorized {t_vec * 1e9:6.1f} ns/point  ({t_swe / t_vec:,.0f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""One tropical ephemeris pass per chart, with sidereal frames derived from it.
+
+swisseph's sidereal longitudes are its tropical ones (true equinox of date)
+minus the ayanamsa including nutation, get_ayanamsa_ex_ut, to within 1e-9".
+So a TropicalPass fetches every body once, tropically and with speeds, along
+with the houses. Each ayanamsa then costs one get_ayanamsa_ex_ut under the
+swisseph lock, and each frame costs a subtraction per longitude. Rahu is
+fetched once, and Ketu is the point opposite it. swisseph can only give the
+true node's speed by differencing, which nearly triples the node's cost. So
+Rahu and Ketu carry the mean node's daily motion instead, which swisseph
+computes cheaply.
+
+House systems: the ascendant and sidereal time come from Porphyry houses,
+which exist at every latitude. Other quadrant systems (Placidus, Koch) are
+computed from them in the tropical frame only when asked for, once per
+system, and are shifted like the bodies. They are undefined inside the polar
+circles, and asking for them there raises ValueError. Equal and Whole Sign
+are laid out from the sidereal ascendant. A tropical Whole Sign would start
+at the tropical sign boundaries. KP uses
+Placidus cusps under the Krishnamurti ayanamsa, given here as the KP preset.
+"""
+from array import array
+from typing import NamedTuple
+
+import swisseph as swe
+
+from .service import HOUSE_SYSTEMS, house_system_code, sidereal
+from .timing import stage
+
+FETCH_PIDS = (swe.SUN, swe.MOON, swe.MARS, swe.MERCURY, swe.JUPITER, swe.VENUS, swe.SATURN)
+KP = (swe.SIDM_KRISHNAMURTI, "P")
+
+
+class Frame(NamedTuple):
+    """A chart's sidereal frame. lons, speeds follow model.BODIES (Ascendant first,
+    Ketu last); cusps are houses 1-12. Speeds are in degrees/day. They are the
+    tropical rates, which are 0.00004°/day (precession) above the sidereal ones."""
+    sid_mode: int
+    house_system: str
+    ayanamsa: float
+    lons: array
+    speeds: array
+    cusps: array
+
+
+class TropicalPass:
+    """Tropical longitudes and speeds of Sun..Rahu, the ascendant and the sidereal
+    time for one moment and place. The frames derived from it are memoized."""
+    __slots__ = ("jd", "lat", "lon", "lons", "speeds", "asc", "armc", "_eps", "_cusps", "_ayanamsas")
+
+    def __init__(self, jd, lat, lon):
+        self.jd, self.lat, self.lon = jd, lat, lon
+        with stage("chart.ephemeris"):
+            lons, speeds = array("d"), array("d")
+            for pid in FETCH_PIDS:
+                xx = swe.calc_ut(jd, pid, swe.FLG_SPEED)[0]
+                lons.append(xx[0])
+                speeds.append(xx[3])
+            lons.append(swe.calc_ut(jd, swe.TRUE_NODE, 0)[0][0])
+            speeds.append(swe.calc_ut(jd, swe.MEAN_NODE, swe.FLG_SPEED)[0][3])
+            cusps, ascmc = swe.houses(jd, lat, lon, b"O")
+        self.lons, self.speeds = lons, speeds
+        self.asc, self.armc, self._eps = ascmc[0], ascmc[2], None
+        self._cusps = {"O": cusps}
+        self._ayanamsas = {}
+
+    def ayanamsa(self, sid_mode):
+        """Ayanamsa (with nutation) of `sid_mode` at this moment."""
+        value = self._ayanamsas.get(sid_mode)
+        if value is None:
+            with sidereal(sid_mode):
+                value = self._ayanamsas[sid_mode] = swe.get_ayanamsa_ex_ut(self.jd, 0)[1]
+        return value
+
+    def tropical_cusps(self, code):
+        """Cusps 1-12 of a quadrant house system, tropical. ValueError where the system is
+        undefined (Placidus and Koch inside the polar circles)."""
+        cusps = self._cusps.get(code)
+        if cusps is None:
+            if self._eps is None: self._eps = swe.calc_ut(self.jd, swe.ECL_NUT)[0][0]
+            try:
+                cusps = self._cusps[code] = swe.houses_armc(self.armc, self.lat, self._eps, code.encode())[0]
+            except swe.Error:
+                name = next(k for k, v in HOUSE_SYSTEMS.items() if v == code)
+                raise ValueError(f"{name} houses are undefined at latitude {self.lat:.2f}; "
+                                 "use Porphyry, Equal or Whole Sign") from None
+        return cusps
+
+    def frame(self, sid_mode=swe.SIDM_LAHIRI, house_system="P"):
+        ay = self.ayanamsa(sid_mode)
+        code = house_system_code(house_system)
+        asc = (self.asc - ay) % 360
+        lons = array("d", [asc])
+        lons.extend((lon - ay) % 360 for lon in self.lons)
+        lons.append((lons[-1] + 180) % 360)
+        speeds = array("d", [0.0])
+        speeds.extend(self.speeds)
+        speeds.append(self.speeds[-1])
+        if code == "E": cusps = array("d", ((asc + 30 * i) % 360 for i in range(12)))
+        elif code == "W": cusps = array("d", ((asc // 30 * 30 + 30 * i) % 360 for i in range(12)))
+        else: cusps = array("d", ((c - ay) % 360 for c in self.tropical_cusps(code)))
+        return Frame(sid_mode, code, ay, lons, speeds, cusps)
+
+    def frames(self, pairs):
+        """Frames for (sid_mode, house_system) pairs, e.g. [(swe.SIDM_LAHIRI, "W"), KP]."""
+        return [self.frame(sid_mode, house_system) for sid_mode, house_system in pairs]
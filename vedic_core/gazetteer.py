@@ -0,0 +1,349 @@
+"""Offline place lookup: a memory-mapped city index with OpenCage as fallback.
+
+The index is built once from a GeoNames dump (e.g. cities15000.txt, optionally
+with countryInfo.txt for country names and admin1CodesASCII.txt for state and
+province names, which then appear in display names as "City, State, Country"):
+
+    python -m vedic_core.gazetteer build cities15000.txt --country-info countryInfo.txt \
+        --admin1 admin1CodesASCII.txt -o gazetteer.idx
+    python -m vedic_core.gazetteer search "kolk"
+
+File layout: a fixed header followed by little-endian column arrays (lat/lon
+in microdegrees, population, timezone id, display-name offsets), a sorted
+array of normalized search keys pointing at places, and two UTF-8 blobs.
+Everything is read through mmap, so opening is O(1) and lookups touch only
+the pages they bisect through.
+"""
+import argparse
+import difflib
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import unicodedata
+from typing import NamedTuple, Optional
+
+MAGIC = b"VGAZ\x00\x00\x00\x01"
+_HEADER = struct.Struct("<8sIIIII")  # magic, n_places, n_keys, n_tz, names_len, keys_len
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "gazetteer.idx")
+DEFAULT_GEOCODE_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "geocode.sqlite")
+
+
+class Place(NamedTuple):
+    name: str
+    lat: float
+    lon: float
+    timezone: Optional[str]
+    source: str
+
+
+def normalize(text):
+    """Lowercase, accent-stripped, single-spaced form used for all keys and queries."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().replace(".", " ").replace("-", " ").split())
+
+
+def _align(n):
+    return (n + 3) & ~3
+
+
+def _layout(n_places, n_keys, n_tz, names_len, keys_len):
+    """Byte offsets of every section; shared by the writer and the reader."""
+    off, sections = _HEADER.size, {}
+    for name, size in (("lat", 4 * n_places), ("lon", 4 * n_places), ("pop", 4 * n_places),
+                       ("tz", 2 * n_places), ("name_off", 4 * (n_places + 1)),
+                       ("key_off", 4 * (n_keys + 1)), ("key_place", 4 * n_keys),
+                       ("tz_off", 4 * (n_tz + 1)), ("names", names_len), ("keys", keys_len)):
+        off = _align(off)
+        sections[name] = (off, size)
+        off += size
+    return sections, off
+
+
+# --- build ---
+def build_index(cities_path, out_path, country_info_path=None, max_alt_len=40, admin1_path=None):
+    """Writes an index from a GeoNames cities file. Returns the number of places."""
+    countries, admin1 = {}, {}
+    if country_info_path:
+        with open(country_info_path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"): continue
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) > 4: countries[cols[0]] = cols[4]
+    if admin1_path:
+        with open(admin1_path, encoding="utf-8") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) > 1: admin1[cols[0]] = cols[1]   # "IN.28" -> "West Bengal"
+
+    places, keys, tz_ids = [], [], {}
+    with open(cities_path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18: continue
+            name, ascii_name, alternates = cols[1], cols[2], cols[3]
+            cc, tz = cols[8], cols[17]
+            pid = len(places)
+            state = admin1.get(f"{cc}.{cols[10]}")
+            display = f"{name}, {state}, {countries.get(cc, cc)}" if state else f"{name}, {countries.get(cc, cc)}"
+            places.append((display, float(cols[4]), float(cols[5]),
+                           int(cols[14] or 0), tz_ids.setdefault(tz, len(tz_ids))))
+            seen = set()
+            for alias in [name, ascii_name, *alternates.split(",")]:
+                k = normalize(alias)
+                if k and len(k) <= max_alt_len and k not in seen:
+                    seen.add(k)
+                    keys.append((k, pid))
+    keys.sort()
+
+    names_blob, name_off = bytearray(), []
+    for display, *_ in places:
+        name_off.append(len(names_blob))
+        names_blob += display.encode("utf-8")
+    tz_off = []
+    for tz in sorted(tz_ids, key=tz_ids.get):
+        tz_off.append(len(names_blob))
+        names_blob += tz.encode("utf-8")
+    tz_off.append(len(names_blob))
+    name_off.append(tz_off[0])
+
+    keys_blob, key_off = bytearray(), []
+    for k, _ in keys:
+        key_off.append(len(keys_blob))
+        keys_blob += k.encode("utf-8")
+    key_off.append(len(keys_blob))
+
+    n, m, t = len(places), len(keys), len(tz_ids)
+    sections, total = _layout(n, m, t, len(names_blob), len(keys_blob))
+    buf = bytearray(total)
+    _HEADER.pack_into(buf, 0, MAGIC, n, m, t, len(names_blob), len(keys_blob))
+
+    def put(section, fmt, values):
+        struct.pack_into(f"<{len(values)}{fmt}", buf, sections[section][0], *values)
+
+    put("lat", "i", [round(p[1] * 1e6) for p in places])
+    put("lon", "i", [round(p[2] * 1e6) for p in places])
+    put("pop", "I", [min(p[3], 2**32 - 1) for p in places])
+    put("tz", "H", [p[4] for p in places])
+    put("name_off", "I", name_off)
+    put("key_off", "I", key_off)
+    put("key_place", "I", [pid for _, pid in keys])
+    put("tz_off", "I", tz_off)
+    buf[sections["names"][0]:sections["names"][0] + len(names_blob)] = names_blob
+    buf[sections["keys"][0]:sections["keys"][0] + len(keys_blob)] = keys_blob
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f: f.write(buf)
+    os.replace(tmp, out_path)
+    return n
+
+
+# --- read ---
+class Gazetteer:
+    """Read-only view over an index file built by build_index."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, t, names_len, keys_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC: raise ValueError(f"{path} is not a gazetteer index")
+        self.n_places, self.n_keys = n, m
+        sections, _ = _layout(n, m, t, names_len, keys_len)
+        view = memoryview(self._mm)
+
+        def col(section, fmt):
+            off, size = sections[section]
+            return view[off:off + size].cast(fmt)
+
+        self._lat, self._lon, self._pop = col("lat", "i"), col("lon", "i"), col("pop", "I")
+        self._tz, self._name_off = col("tz", "H"), col("name_off", "I")
+        self._key_off, self._key_place, self._tz_off = col("key_off", "I"), col("key_place", "I"), col("tz_off", "I")
+        self._names = view[sections["names"][0]:sections["names"][0] + names_len]
+        self._keys = view[sections["keys"][0]:sections["keys"][0] + keys_len]
+
+    def close(self):
+        for v in (self._lat, self._lon, self._pop, self._tz, self._name_off,
+                  self._key_off, self._key_place, self._tz_off, self._names, self._keys):
+            v.release()
+        self._mm.close()
+        self._file.close()
+
+    def _key(self, i):
+        return bytes(self._keys[self._key_off[i]:self._key_off[i + 1]])
+
+    def place(self, pid):
+        tz = self._tz[pid]
+        return Place(
+            name=bytes(self._names[self._name_off[pid]:self._name_off[pid + 1]]).decode("utf-8"),
+            lat=self._lat[pid] / 1e6, lon=self._lon[pid] / 1e6,
+            timezone=bytes(self._names[self._tz_off[tz]:self._tz_off[tz + 1]]).decode("utf-8") or None,
+            source="gazetteer",
+        )
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def _prefix_pids(self, prefix, scan_limit):
+        key = prefix.encode("utf-8")
+        i, pids = self._lower_bound(key), {}
+        while i < self.n_keys and len(pids) < scan_limit:
+            k = self._key(i)
+            if not k.startswith(key): break
+            pid = self._key_place[i]
+            pids[pid] = pids.get(pid, False) or k == key
+            i += 1
+        return pids
+
+    def search(self, query, limit=10, scan_limit=2000):
+        """Places whose name (or an alternate name) starts with `query`.
+        Exact name matches rank first, then by population."""
+        pids = self._prefix_pids(normalize(query), scan_limit)
+        ranked = sorted(pids, key=lambda p: (not pids[p], -self._pop[p]))
+        return [self.place(p) for p in ranked[:limit]]
+
+    def fuzzy(self, query, limit=5, cutoff=0.75):
+        """Close spellings of `query`, drawn from keys sharing its first letter."""
+        q = normalize(query)
+        if not q: return []
+        candidates = {}
+        for i in range(self._lower_bound(q[:1].encode()), self.n_keys):
+            k = self._key(i)
+            if not k.startswith(q[:1].encode()): break
+            candidates.setdefault(k.decode("utf-8"), self._key_place[i])
+        matches = difflib.get_close_matches(q, list(candidates), n=limit * 3, cutoff=cutoff)
+        pids = list(dict.fromkeys(candidates[m] for m in matches))
+        pids.sort(key=lambda p: -self._pop[p])
+        return [self.place(p) for p in pids[:limit]]
+
+    def lookup(self, query):
+        """The place for free text like "Kolkata", "Kolkata, India" or "Kolkata, West
+        Bengal, India", or None. Only an exact name (or alternate name) counts, the most
+        populous one if several share it. Qualifiers after the name must agree with the
+        place (see _qualifies), else None, so the caller can fall back to a geocoder
+        instead of taking a namesake. Near misses are for suggestions(), never an answer."""
+        city, *qualifiers = query.split(",")
+        qualifiers = [q for q in map(normalize, qualifiers) if q]
+        pids = self._prefix_pids(normalize(city), scan_limit=2000)
+        exact = sorted((p for p, is_exact in pids.items() if is_exact), key=lambda p: -self._pop[p])
+        for pid in exact:
+            place = self.place(pid)
+            if _qualifies(place, qualifiers): return place
+        return None
+
+    def suggestions(self, query, limit=5):
+        """Places the user may have meant: prefix matches, else close spellings."""
+        city = query.partition(",")[0]
+        return self.search(city, limit) or self.fuzzy(city, limit)
+
+
+def _qualifies(place, qualifiers):
+    """Whether normalized qualifiers ("state", "country" or "state, country") agree with a
+    display name "City, [State, ]Country". The last qualifier is the country; a lone one
+    may instead be the state. Middle ones must be the state, unless the index was built
+    without state names, in which case they are not checked."""
+    if not qualifiers: return True
+    *states, country = [normalize(part) for part in place.name.split(",")[1:]]
+    if len(qualifiers) == 1: return qualifiers[0] == country or qualifiers[0] in states
+    return qualifiers[-1] == country and (not states or all(q in states for q in qualifiers[:-1]))
+
+
+# --- resolver with online fallback ---
+class PlaceResolver:
+    """Resolves free-text places: local geocode cache, then the offline
+    gazetteer, then OpenCage (if a geocoder is configured). Online answers
+    are written to the cache so the same query never goes out twice. A failed
+    online lookup (network, quota, bad key) counts in `geocoder_errors` and
+    resolves to None like an unknown place."""
+
+    def __init__(self, gazetteer=None, geocoder=None, cache_path=DEFAULT_GEOCODE_CACHE):
+        self.gazetteer = gazetteer
+        self.geocoder = geocoder
+        self._lock = threading.Lock()
+        self._db = None
+        self.geocoder_errors = 0
+        if cache_path:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS geocode (query TEXT PRIMARY KEY, name TEXT, lat REAL, lon REAL, timezone TEXT)")
+
+    def _cached(self, key):
+        if self._db is None: return None
+        with self._lock:
+            row = self._db.execute("SELECT name, lat, lon, timezone FROM geocode WHERE query = ?", (key,)).fetchone()
+        return Place(*row, source="cache") if row else None
+
+    def _remember(self, key, place):
+        if self._db is None: return
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+                             (key, place.name, place.lat, place.lon, place.timezone))
+
+    def resolve(self, query):
+        """Place for `query` from the cache, the gazetteer (exact names only) or the
+        geocoder, else None; see Gazetteer.suggestions() for near misses."""
+        key = normalize(query)
+        if not key: return None
+        place = self._cached(key)
+        if place: return place
+        if self.gazetteer:
+            place = self.gazetteer.lookup(query)
+            if place: return place
+        if self.geocoder:
+            try:
+                res = self.geocoder.geocode(query)
+            except Exception:  # OpenCage raises its own error classes and requests' on network failure
+                with self._lock: self.geocoder_errors += 1
+                return None
+            if res:
+                top = res[0]
+                place = Place(name=top.get("formatted", query),
+                              lat=top["geometry"]["lat"], lon=top["geometry"]["lng"],
+                              timezone=top.get("annotations", {}).get("timezone", {}).get("name"),
+                              source="opencage")
+                self._remember(key, place)
+                return place
+        return None
+
+
+def open_default_gazetteer():
+    """Gazetteer at $VEDIC_GAZETTEER (or ~/.cache/vedic_core/gazetteer.idx), or None if not built."""
+    path = os.environ.get("VEDIC_GAZETTEER", DEFAULT_INDEX_PATH)
+    return Gazetteer(path) if os.path.exists(path) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline gazetteer tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="build an index from a GeoNames cities file")
+    b.add_argument("cities")
+    b.add_argument("--country-info")
+    b.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt, for state names")
+    b.add_argument("-o", "--output", default=os.environ.get("VEDIC_GAZETTEER", DEFAULT_INDEX_PATH))
+    s = sub.add_parser("search", help="prefix/fuzzy search an index")
+    s.add_argument("query")
+    s.add_argument("--index", default=os.environ.get("VEDIC_GAZETTEER", DEFAULT_INDEX_PATH))
+    s.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        n = build_index(args.cities, args.output, args.country_info, admin1_path=args.admin1)
+        print(f"wrote {n} places to {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+        return 0
+    gaz = Gazetteer(args.index)
+    for p in gaz.search(args.query, args.limit) or gaz.fuzzy(args.query, args.limit):
+        print(f"{p.name:<40} {p.lat:>10.5f} {p.lon:>11.5f}  {p.timezone}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
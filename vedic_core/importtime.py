@@ -0,0 +1,78 @@
+"""Cold-start import-time budget for vedic_core entry points.
+
+Each module is imported in a fresh interpreter so the measurement reflects
+what a newly spawned worker pays. Run with:
+
+    python -m vedic_core.importtime [--repeat N] [--json]
+
+Exits non-zero when any module's median import time exceeds its budget.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Milliseconds, generous enough for a loaded CI box; tighten as the engine slims down.
+BUDGETS_MS = {
+    "vedic_core": 25,
+    "vedic_core.kp": 25,
+    "vedic_core.varga": 25,
+    "vedic_core.dasha": 60,
+    "vedic_core.panchang": 60,
+    "vedic_core.chart": 60,
+    "vedic_core.model": 60,
+    "vedic_core.ai": 60,
+    "vedic_core.prompt": 60,
+    "vedic_core.batch": 250,
+    "vedic_core.profiles": 60,
+    "vedic_core.bulk": 60,
+    "vedic_core.matching": 250,
+    "vedic_core.pdf": 120,
+    "vedic_core.ephemeris": 250,
+    "vedic_core.timing": 25,
+    "vedic_core.bench": 60,
+    "vedic_core.service": 25,
+    "vedic_core.frames": 40,
+}
+
+_SNIPPET = "import time; t = time.perf_counter(); import {mod}; print(time.perf_counter() - t)"
+
+
+def measure(module, repeat=5):
+    """Median wall-clock seconds to import `module` in a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _SNIPPET.format(mod=module)],
+                             check=True, capture_output=True, text=True).stdout
+        samples.append(float(out.strip()))
+    return statistics.median(samples)
+
+
+def run(budgets=BUDGETS_MS, repeat=5):
+    """Returns {module: {"ms": measured, "budget_ms": budget, "ok": bool}}."""
+    report = {}
+    for module, budget in budgets.items():
+        ms = measure(module, repeat) * 1000
+        report[module] = {"ms": round(ms, 2), "budget_ms": budget, "ok": ms <= budget}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for module, r in report.items():
+            flag = "ok" if r["ok"] else "OVER BUDGET"
+            print(f"{module:<24} {r['ms']:>8.2f} ms / {r['budget_ms']:>4} ms  {flag}")
+    return 0 if all(r["ok"] for r in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Static ascendant interpretation texts for the Summary tab."""
+
+def get_detailed_interpretations(asc_sign_name):
+    """Returns detailed text for Summary Tab based on Ascendant"""
+    data = {
+        "Aries": {
+            "Gen": "As an Aries Ascendant, you are born under the sign of the Ram, ruled by Mars. This placement bestows upon you a dynamic, energetic, and pioneering spirit. You are a natural initiator who loves to start new projects.",
+            "Pers": "You possess a strong will and a direct approach to life. You are courageous, confident, and enthusiastic. However, you can also be impulsive and impatient. You value independence highly and often prefer to lead rather than follow.",
+            "Phys": "Physically, you tend to have a strong, athletic build with prominent features, often a distinct nose or eyebrows. You likely walk quickly and have an intense gaze. High energy levels are a hallmark of your constitution.",
+            "Health": "You are prone to issues related to the head, such as migraines, headaches, or fevers. Stress management is crucial for you. Regular exercise is not just good for your body but essential for venting your excess mental energy.",
+            "Career": "You thrive in competitive environments. Careers in the military, police, sports, engineering, or entrepreneurship suit you well. You need a role that offers autonomy and challenges rather than routine desk work.",
+            "Rel": "In relationships, you are passionate and direct. You enjoy the chase and are often the one to initiate interest. You need a partner who can match your energy but also has the patience to handle your occasional outbursts."
+        },
+        "Taurus": {
+            "Gen": "As a Taurus Ascendant, you are ruled by Venus, the planet of beauty and luxury. You are grounded, practical, and have a deep appreciation for the material comforts of life.",
+            "Pers": "You are reliable, patient, and persistent. Once you set your mind to something, you see it through. You can be quite stubborn and resistant to change, valuing stability above all else. You have a calming presence.",
+            "Phys": "You typically have a solid, sturdy build, often with a thick or prominent neck. Your eyes are likely large and expressive. You tend to move deliberately and gracefully, rarely rushing.",
+            "Health": "Your sensitive areas are the throat and neck. You may be prone to sore throats, thyroid issues, or tonsillitis. There is a tendency to gain weight due to a love for good food, so diet management is key.",
+            "Career": "You excel in fields requiring patience and resource management. Finance, banking, agriculture, music, arts, or the luxury goods industry are excellent fits. You build wealth steadily and securely.",
+            "Rel": "You are a loyal and sensual partner. You take your time falling in love, but once committed, you are in it for the long haul. You express love through physical touch and tangible gifts."
+        },
+        "Gemini": {
+            "Gen": "Ruled by Mercury, you are the communicator of the zodiac. You are intellectually curious, adaptable, and quick-witted. Variety is the spice of your life.",
+            "Pers": "You are sociable, charming, and love to gather information. However, your dual nature can make you indecisive or restless. You bore easily and need constant mental stimulation.",
+            "Phys": "You tend to have a tall, slender, and agile frame. Your arms and hands may be expressive when you speak. You often look younger than your actual age due to your lively energy.",
+            "Health": "You are prone to nervous system issues, anxiety, and respiratory problems like asthma. Your active mind can lead to insomnia, so learning to relax is vital.",
+            "Career": "Careers in communication, writing, journalism, sales, marketing, or IT suit you perfectly. You thrive in fast-paced environments where you can multitask and network.",
+            "Rel": "You need a partner who is intellectually stimulating. A meeting of the minds is more important to you than deep emotional displays. You can be flirtatious and fun-loving in relationships."
+        },
+        "Cancer": {
+            "Gen": "Ruled by the Moon, you are sensitive, intuitive, and deeply connected to your emotions. You have a strong attachment to home, family, and your roots.",
+            "Pers": "You are nurturing and protective of those you love. However, you can be moody and easily hurt by criticism. You have a hard shell but a very soft, caring heart inside.",
+            "Phys": "You generally have a round face with soft features and expressive eyes. You may have a tendency to carry weight in the midsection. Your appearance often radiates a gentle, approachable vibe.",
+            "Health": "Your stomach and digestive system are sensitive. Emotional stress often manifests as digestive upsets. You may also be prone to chest congestion or water retention.",
+            "Career": "You excel in caring professions like nursing, teaching, psychology, or human resources. Real estate, hospitality, and cooking are also natural fits for your nurturing talents.",
+            "Rel": "You seek emotional security above all else. You are a devoted partner who loves to 'mother' your significant other. You need a partner who values family and loyalty as much as you do."
+        },
+        "Leo": {
+            "Gen": "Ruled by the Sun, you are born to shine. You are confident, charismatic, and have a natural flair for leadership. You love being the center of attention.",
+            "Pers": "You are generous, warm-hearted, and loyal. However, you can also be arrogant or domineering if your ego goes unchecked. You have a strong sense of personal pride and dignity.",
+            "Phys": "You tend to have a broad upper body, strong shoulders, and a majestic gait. You may have a thick mane of hair. You have a commanding presence that draws people to you.",
+            "Health": "The heart and spine are your vulnerable areas. You may face issues with blood pressure or back pain. Regular cardiovascular exercise is essential for your well-being.",
+            "Career": "You belong in leadership roles or the public eye. Politics, entertainment, management, or government are ideal. You dislike taking orders and thrive where you can be the boss.",
+            "Rel": "You are a passionate and romantic partner. You treat your loved one like royalty but expect the same adoration in return. Loyalty is non-negotiable for you."
+        },
+        "Virgo": {
+            "Gen": "Ruled by Mercury, you are the perfectionist of the zodiac. You are analytical, practical, and have a keen eye for detail. You love to be of service.",
+            "Pers": "You are modest, intelligent, and hardworking. You can be critical of yourself and others, striving for perfection. You are the person who notices the details everyone else misses.",
+            "Phys": "You typically have a slender, neat, and youthful appearance. Your features are often sharp or delicate. You usually pay great attention to hygiene and dress.",
+            "Health": "Your digestive system and intestines are sensitive. Nervous tension often affects your stomach. A clean, balanced diet is critical for your health.",
+            "Career": "You excel in jobs requiring precision and analysis. Accounting, data analysis, medicine, editing, or coding are perfect. You are the troubleshooter who fixes systems.",
+            "Rel": "You are a practical and devoted partner. You show love through acts of service rather than grand romantic gestures. You seek an intelligent, tidy, and reliable mate."
+        },
+        "Libra": {
+            "Gen": "Ruled by Venus, you are the diplomat. You value harmony, balance, and justice. You are charming, social, and dislike conflict of any kind.",
+            "Pers": "You are refined and artistic. However, your desire to please everyone can make you indecisive. You thrive in partnerships and hate being alone.",
+            "Phys": "You are often blessed with a well-proportioned body and pleasing features, perhaps a beautiful smile or dimples. You tend to age well and maintain a youthful charm.",
+            "Health": "The kidneys and lower back are your vulnerable areas. You should drink plenty of water. Balance is key for you—avoiding excess in food or drink is important.",
+            "Career": "You excel in fields involving negotiation, aesthetics, or law. Diplomacy, fashion design, interior decorating, or counseling are great fits. You work best in a team.",
+            "Rel": "Relationships are central to your life. You are a romantic and accommodating partner. You need a relationship that is harmonious and aesthetically pleasing."
+        },
+        "Scorpio": {
+            "Gen": "Ruled by Mars and Ketu, you are intense, magnetic, and secretive. You possess incredible willpower and emotional depth. You see beneath the surface.",
+            "Pers": "You are determined and resilient. While fiercely loyal, you can be vindictive if betrayed. You are a private person who keeps your true feelings hidden.",
+            "Phys": "You have a strong, sturdy build with a powerful presence. Your eyes are often piercing and hypnotic. You exude a mysterious charisma.",
+            "Health": "Your reproductive system and excretory organs are sensitive. You may be prone to hidden ailments. Finding a healthy outlet for your intense emotions is vital.",
+            "Career": "You thrive in research, investigation, or crisis management. Surgery, detective work, psychology, or the occult are ideal. You have the focus to solve deep mysteries.",
+            "Rel": "Love is an all-or-nothing experience for you. You crave deep soul-intimacy. You are possessive and protective, expecting absolute fidelity from your partner."
+        },
+        "Sagittarius": {
+            "Gen": "Ruled by Jupiter, you are the eternal optimist. You are adventurous, philosophical, and love freedom. You seek the higher meaning of life.",
+            "Pers": "You are honest, straightforward, and enthusiastic. However, you can be blunt or tactless. You dislike restrictions and need plenty of space to explore.",
+            "Phys": "You are likely to be tall and athletic. You have a jovial, open expression and a confident stride. You may have a high forehead.",
+            "Health": "The hips, thighs, and liver are your vulnerable areas. You may be prone to sciatica or weight gain due to overindulgence. Moderation is key for you.",
+            "Career": "You excel in teaching, publishing, religion, law, or travel. You need a career that offers freedom and a sense of purpose. You dislike micromanagement.",
+            "Rel": "You need a partner who is also your best friend and travel companion. You value freedom in relationships and dislike clinginess. You seek a partner who shares your philosophy."
+        },
+        "Capricorn": {
+            "Gen": "Ruled by Saturn, you are ambitious, disciplined, and practical. You play the long game and are willing to work hard for success.",
+            "Pers": "You are responsible, serious, and cautious. You value tradition and structure. You can be pessimistic but have a dry sense of humor. You command respect.",
+            "Phys": "You tend to have a lean, wiry build. Your features may be prominent or bony. You often look mature for your age when young, but age gracefully later.",
+            "Health": "Your knees, joints, bones, and skin are sensitive. You may suffer from arthritis or dry skin. You need to ensure you get enough calcium and keep moving.",
+            "Career": "You are built for the corporate world and administration. Management, government, construction, or mining are suitable. You climb the ladder of success steadily.",
+            "Rel": "You take relationships seriously. You are cautious in love but incredibly loyal and reliable once committed. You seek a partner who is responsible and ambitious."
+        },
+        "Aquarius": {
+            "Gen": "Ruled by Saturn and Rahu, you are the innovator. You are unconventional, humanitarian, and intellectual. You march to the beat of your own drum.",
+            "Pers": "You are friendly but detached. You value your freedom and individuality above all. You are often ahead of your time and love to break traditions.",
+            "Phys": "You often have a unique or unusual appearance. You may be tall with striking features. There is often something 'electric' about your vibe.",
+            "Health": "The ankles, calves, and circulatory system are your weak points. You may be prone to sprains or varicose veins. Keeping your circulation moving is important.",
+            "Career": "You excel in technology, science, or social change. IT, aviation, astrology, or scientific research are excellent. You work best in groups or organizations.",
+            "Rel": "You need a partner who respects your freedom. You are attracted to intelligence and uniqueness. You can be aloof, so friendship is the best foundation for your romance."
+        },
+        "Pisces": {
+            "Gen": "Ruled by Jupiter, you are the dreamer. You are compassionate, imaginative, and deeply spiritual. You feel the emotions of others.",
+            "Pers": "You are kind, adaptable, and intuitive. However, you can be impractical or escapist. You often sacrifice your own needs for the sake of others.",
+            "Phys": "You tend to have a soft, gentle appearance with dreamy, watery eyes. You may have smaller feet or hands. Your demeanor is usually calm.",
+            "Health": "Your feet and lymphatic system are sensitive. You may be prone to swelling or water retention. You are sensitive to drugs and alcohol.",
+            "Career": "You thrive in creative or healing professions. Music, film, photography, nursing, counseling, or spirituality are ideal. You need a career that uses your empathy.",
+            "Rel": "You are a hopeless romantic seeking a soulmate. You are incredibly giving and forgiving in love. You need a partner who grounds you without crushing your dreams."
+        }
+    }
+    # Default to Aries if unknown, but code logic ensures valid sign name
+    return data.get(asc_sign_name, data["Aries"])
@@ -0,0 +1,96 @@
+"""Krishnamurti Paddhati sign, star, sub and sub-sub lords.
+
+The zodiac is divided once, at import, into the 249 KP subs (the 243 star
+subs, with the six that straddle a sign cusp split in two) and, lazily, into
+sub-subs. Lookups are a bisect over the boundary list, or a single
+searchsorted for arrays of longitudes.
+"""
+from bisect import bisect_right
+from fractions import Fraction
+
+KP_LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+KP_YEARS = [7, 20, 6, 10, 7, 18, 16, 19, 17]
+# Sign lords of Aries..Pisces as indices into KP_LORDS
+KP_SIGN_LORDS = [4, 1, 8, 3, 2, 8, 1, 4, 6, 7, 7, 6]
+
+
+def _divide(depth):
+    """Boundaries of the nakshatra tree `depth` levels deep (1 = star, 2 = sub, 3 = sub-sub),
+    merged with the sign cusps. Returns (starts, rows) with rows of lord indices
+    (sign, star, sub[, sub_sub]). Exact arithmetic keeps shared boundaries identical."""
+    nak = Fraction(40, 3)
+    spans = [(i * nak, nak, (i % 9,)) for i in range(27)]
+    for _ in range(depth - 1):
+        nxt = []
+        for start, length, path in spans:
+            lord = path[-1]
+            for k in range(9):
+                sub = (lord + k) % 9
+                part = length * KP_YEARS[sub] / 120
+                nxt.append((start, part, path + (sub,)))
+                start += part
+        spans = nxt
+    starts, rows = [], []
+    for start, _, path in spans:
+        starts.append(start)
+        rows.append(path)
+    for sign in range(12):
+        cusp = Fraction(30 * sign)
+        i = bisect_right(starts, cusp) - 1
+        if starts[i] != cusp:
+            starts.insert(i + 1, cusp)
+            rows.insert(i + 1, rows[i])
+    rows = [(KP_SIGN_LORDS[int(s // 30)],) + path for s, path in zip(starts, rows)]
+    return [float(s) for s in starts], rows
+
+
+KP_SUB_STARTS, KP_SUB_ROWS = _divide(2)
+_tables = {2: (KP_SUB_STARTS, KP_SUB_ROWS)}
+_arrays = {}
+
+
+def kp_table(level="sub"):
+    """(starts, rows) for level "sub" (249 entries) or "sub_sub" (built on first use)."""
+    depth = 3 if level == "sub_sub" else 2
+    if depth not in _tables: _tables[depth] = _divide(depth)
+    return _tables[depth]
+
+
+def kp_index(deg, level="sub"):
+    """Index into kp_table(level) of the division containing longitude `deg`."""
+    return bisect_right(kp_table(level)[0], deg % 360) - 1
+
+
+def get_kp_lords(deg, sub_sub=False):
+    """Calculates Sign, Star (Nakshatra) and Sub Lord for KP (plus Sub-Sub Lord if asked)"""
+    starts, rows = kp_table("sub_sub" if sub_sub else "sub")
+    return tuple(KP_LORDS[i] for i in rows[bisect_right(starts, deg % 360) - 1])
+
+
+def next_kp_boundary(deg, level="sub", direction=1):
+    """(longitude, index) of the first division boundary strictly after `deg` moving in
+    `direction` (+1 forward, -1 retrograde); index is the division entered."""
+    starts, _ = kp_table(level)
+    n = len(starts)
+    deg %= 360
+    i = bisect_right(starts, deg) - 1
+    if direction > 0:
+        j = (i + 1) % n
+        return starts[j], j
+    # Moving backwards we leave division i at its start (or the previous one if sitting on it)
+    j = i if starts[i] < deg else (i - 1) % n
+    return starts[j], (j - 1) % n
+
+
+def kp_lords_array(deg, sub_sub=False):
+    """Vectorized lookup: an integer array of shape deg.shape + (3,) (or (4,) with sub_sub)
+    holding sign, star, sub[, sub-sub] lords as indices into KP_LORDS."""
+    import numpy as np
+
+    depth = 3 if sub_sub else 2
+    if depth not in _arrays:
+        starts, rows = kp_table("sub_sub" if sub_sub else "sub")
+        _arrays[depth] = (np.asarray(starts), np.asarray(rows, dtype=np.int8))
+    starts, rows = _arrays[depth]
+    deg = np.asarray(deg, dtype=float) % 360
+    return rows[np.searchsorted(starts, deg, side="right") - 1]
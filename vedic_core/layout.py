@@ -0,0 +1,63 @@
+"""Backend-neutral geometry for North, South and East Indian charts.
+
+Coordinates are in chart units with the origin at the bottom-left and y
+pointing up (matplotlib convention); each style spans [0, extent] on both axes.
+Renderers (matplotlib, SVG, PDF) draw exactly these lines and labels.
+"""
+
+EXTENT = {"North": 1, "South": 1, "East": 3}
+
+# Line segments ((x0, y0), (x1, y1)).
+LINES = {
+    "North": [
+        ((0, 1), (1, 0)), ((0, 0), (1, 1)),
+        ((0, 0.5), (0.5, 0)), ((0.5, 0), (1, 0.5)),
+        ((0.5, 1), (1, 0.5)), ((0, 0.5), (0.5, 1)),
+        ((0, 0), (1, 0)), ((1, 0), (1, 1)), ((1, 1), (0, 1)), ((0, 1), (0, 0)),
+    ],
+    "East": [
+        ((0, 0), (3, 0)), ((3, 0), (3, 3)), ((3, 3), (0, 3)), ((0, 3), (0, 0)),
+        ((1, 0), (1, 3)), ((2, 0), (2, 3)), ((0, 1), (3, 1)), ((0, 2), (3, 2)),
+        ((0, 3), (1, 2)), ((0, 0), (1, 1)), ((2, 1), (3, 0)), ((2, 2), (3, 3)),
+    ],
+    "South": [((0, i), (1, i)) for i in (0, 0.25, 0.5, 0.75, 1)]
+           + [((i, 0), (i, 1)) for i in (0, 0.25, 0.5, 0.75, 1)],
+}
+
+# Blank centre box (x, y, width, height) with a "Rashi" caption, if any.
+CENTER = {"North": None, "East": (1, 1, 1, 1), "South": (0.25, 0.25, 0.5, 0.5)}
+
+# North is laid out by house, East and South by fixed sign (1=Aries ... 12=Pisces).
+NORTH_HOUSE_POS = {1: (0.5, 0.8), 2: (0.25, 0.85), 3: (0.15, 0.75), 4: (0.2, 0.5), 5: (0.15, 0.25), 6: (0.25, 0.15), 7: (0.5, 0.2), 8: (0.75, 0.15), 9: (0.85, 0.25), 10: (0.8, 0.5), 11: (0.85, 0.75), 12: (0.75, 0.85)}
+EAST_SIGN_POS = {
+    1: (1.5, 2.5), 2: (2.3, 2.7), 3: (2.7, 2.3), 4: (2.5, 1.5),
+    5: (2.7, 0.7), 6: (2.3, 0.3), 7: (1.5, 0.5), 8: (0.7, 0.3),
+    9: (0.3, 0.7), 10: (0.5, 1.5), 11: (0.3, 2.3), 12: (0.7, 2.7)
+}
+SOUTH_SIGN_POS = {1: (0.37, 0.87), 2: (0.62, 0.87), 3: (0.87, 0.87), 4: (0.87, 0.62), 5: (0.87, 0.37), 6: (0.87, 0.12), 7: (0.62, 0.12), 8: (0.37, 0.12), 9: (0.12, 0.12), 10: (0.12, 0.37), 11: (0.12, 0.62), 12: (0.12, 0.87)}
+
+
+def chart_labels(house_planets, asc_sign, style):
+    """Text to place on the chart as (x, y, text, kind) with kind "sign" or "planets"."""
+    labels = []
+    if style == "North":
+        for h, (x, y) in NORTH_HOUSE_POS.items():
+            sign_num = ((asc_sign + h - 2) % 12) + 1
+            labels.append((x, y - 0.08, str(sign_num), "sign"))
+            if house_planets[h]:
+                labels.append((x, y, "\n".join(house_planets[h]), "planets"))
+        return labels
+    sign_pos = EAST_SIGN_POS if style == "East" else SOUTH_SIGN_POS
+    for h, planets in house_planets.items():
+        sign = ((asc_sign + h - 2) % 12) + 1
+        x, y = sign_pos[sign]
+        txt_p = "\n".join(planets)
+        if h == 1: txt_p += "\n(Asc)"
+        if txt_p.strip():
+            labels.append((x, y, txt_p, "planets"))
+    return labels
+
+
+def normalize_style(style):
+    """Anything other than North/East falls back to South, as draw_chart always has."""
+    return style if style in ("North", "East") else "South"
@@ -0,0 +1,191 @@
+"""Ashtakoota (Guna Milan) matching over precomputed tables.
+
+The eight kootas depend only on the two Moon nakshatras (Tara, Yoni, Gana,
+Nadi) or the two Moon signs (Varna, Vashya, Graha Maitri, Bhakoot), so
+each is tabulated once as a 27x27 or 12x12 integer matrix indexed
+[boy, girl]. Scores are stored in half points (Vashya, Tara and Maitri have
+halves), so the 36-point total is 72 in table units. Scoring one profile
+against N candidates is a row gather from each summed table:
+
+    total = NAK_TOTAL[b_nak, g_naks] + RASHI_TOTAL[b_rashi, g_rashis]
+
+Nakshatra and sign attributes come from chart.get_nakshatra_properties so
+they always agree with the chart summary.
+
+    python -m vedic_core.matching bench --candidates 100000
+"""
+import argparse
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .chart import get_nakshatra_properties
+from .model import NAKSHATRAS, ZODIAC
+
+KOOTAS = ["Varna", "Vashya", "Tara", "Yoni", "Graha Maitri", "Gana", "Bhakoot", "Nadi"]
+MAX_POINTS = {"Varna": 1, "Vashya": 2, "Tara": 3, "Yoni": 4, "Graha Maitri": 5, "Gana": 6, "Bhakoot": 7, "Nadi": 8}
+
+_VARNA_RANK = {"Shudra": 0, "Vaishya": 1, "Kshatriya": 2, "Brahmin": 3}
+_VASHYA = ["Chatushpad", "Manav", "Jalchar", "Vanchar", "Keet"]
+_VASHYA_POINTS = [  # half points, [boy][girl]
+    [4, 2, 2, 1, 2],
+    [2, 4, 1, 0, 2],
+    [2, 1, 4, 2, 2],
+    [1, 0, 2, 4, 0],
+    [2, 2, 2, 0, 4],
+]
+_YONIS = ["Horse", "Elephant", "Goat", "Snake", "Dog", "Cat", "Rat", "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion"]
+_YONI_POINTS = [
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+]
+# Natural friendships: +1 friend, 0 neutral, -1 enemy (row planet's view of column planet).
+_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+_FRIENDSHIP = [
+    [0, 1, 1, 0, 1, -1, -1],
+    [1, 0, 0, 1, 0, 0, 0],
+    [1, 1, 0, -1, 1, 0, 0],
+    [1, -1, 0, 0, 0, 1, 0],
+    [1, 1, 1, -1, 0, -1, 0],
+    [-1, -1, 0, 1, 0, 0, 1],
+    [-1, -1, -1, 1, 0, 1, 0],
+]
+_MAITRI_POINTS = {(1, 1): 10, (1, 0): 8, (0, 0): 6, (1, -1): 2, (0, -1): 1, (-1, -1): 0}
+_GANAS = ["Deva", "Manushya", "Rakshasa"]
+_GANA_POINTS = [[12, 12, 2], [10, 12, 0], [2, 0, 12]]  # half points, [boy][girl]
+
+
+def _build():
+    nak = [get_nakshatra_properties(n, "Aries", 1) for n in NAKSHATRAS]
+    sign = [get_nakshatra_properties("Ashwini", z, 1) for z in ZODIAC]
+    varna = [_VARNA_RANK[p["Varna"]] for p in sign]
+    vashya = [_VASHYA.index(p["Vashya"].split("/")[0]) for p in sign]
+    lord = [_LORDS.index(p["SignLord"]) for p in sign]
+    yoni = [_YONIS.index(p["Yoni"]) for p in nak]
+    gana = [_GANAS.index(p["Gana"]) for p in nak]
+    nadi = [p["Nadi"] for p in nak]
+
+    b, g = np.meshgrid(np.arange(12), np.arange(12), indexing="ij")
+    dist = (b - g) % 12 + 1   # boy's sign counted from the girl's
+    tables = {
+        "Varna": np.where(np.take(varna, b) >= np.take(varna, g), 2, 0),
+        "Vashya": np.asarray(_VASHYA_POINTS)[np.take(vashya, b), np.take(vashya, g)],
+        "Graha Maitri": np.vectorize(lambda i, j: 10 if lord[i] == lord[j] else _MAITRI_POINTS[tuple(sorted(
+            (_FRIENDSHIP[lord[i]][lord[j]], _FRIENDSHIP[lord[j]][lord[i]]), reverse=True))])(b, g),
+        "Bhakoot": np.where(np.isin(dist, (2, 12, 5, 9, 6, 8)), 0, 14),
+    }
+    b, g = np.meshgrid(np.arange(27), np.arange(27), indexing="ij")
+    tara_ok = lambda frm, to: ~np.isin(((to - frm) % 27 + 1) % 9, (3, 5, 7))
+    tables.update({
+        "Tara": 3 * tara_ok(g, b) + 3 * tara_ok(b, g),
+        "Yoni": 2 * np.asarray(_YONI_POINTS)[np.take(yoni, b), np.take(yoni, g)],
+        "Gana": np.asarray(_GANA_POINTS)[np.take(gana, b), np.take(gana, g)],
+        "Nadi": np.where(np.take(nadi, b) == np.take(nadi, g), 0, 16),
+    })
+    return {k: tables[k].astype(np.int16) for k in KOOTAS}
+
+
+KOOTA_TABLES = _build()   # half points, [boy, girl]; 12x12 for sign kootas, 27x27 for nakshatra kootas
+_BY_SIGN = ("Varna", "Vashya", "Graha Maitri", "Bhakoot")
+RASHI_TOTAL = sum(KOOTA_TABLES[k] for k in _BY_SIGN).astype(np.int16)
+NAK_TOTAL = sum(KOOTA_TABLES[k] for k in KOOTAS if k not in _BY_SIGN).astype(np.int16)
+
+
+class Candidates(NamedTuple):
+    """Match inputs for many profiles: Moon nakshatra (0-26), Moon sign (0-11), Mangalik flag."""
+    nakshatra: np.ndarray
+    rashi: np.ndarray
+    mangalik: np.ndarray
+
+    @classmethod
+    def from_charts(cls, charts):
+        charts = list(charts)
+        return cls(np.fromiter((c.nakshatra(2) for c in charts), np.int8, len(charts)),
+                   np.fromiter((c.sign(2) for c in charts), np.int8, len(charts)),
+                   np.fromiter((c.is_mangalik() for c in charts), bool, len(charts)))
+
+
+def ashtakoota(boy, girl):
+    """Per-koota points and total for two Charts (boy first)."""
+    b, g = (boy.nakshatra(2), boy.sign(2)), (girl.nakshatra(2), girl.sign(2))
+    points = {k: float(KOOTA_TABLES[k][(b[1], g[1]) if k in _BY_SIGN else (b[0], g[0])]) / 2 for k in KOOTAS}
+    points["Total"] = sum(points.values())
+    return points
+
+
+def score_many(nak, rashi, candidates, seeker_is_boy=True):
+    """Total points (float array) for one seeker (Moon nakshatra and sign) against every candidate."""
+    if seeker_is_boy:
+        units = NAK_TOTAL[nak, candidates.nakshatra] + RASHI_TOTAL[rashi, candidates.rashi]
+    else:
+        units = NAK_TOTAL[candidates.nakshatra, nak] + RASHI_TOTAL[candidates.rashi, rashi]
+    return units / 2
+
+
+def koota_breakdown(nak, rashi, candidates, seeker_is_boy=True):
+    """(N, 8) half-point scores in KOOTAS order, for inspecting a shortlist."""
+    out = np.empty((len(candidates.nakshatra), len(KOOTAS)), dtype=np.int16)
+    for i, k in enumerate(KOOTAS):
+        s, c = (rashi, candidates.rashi) if k in _BY_SIGN else (nak, candidates.nakshatra)
+        out[:, i] = KOOTA_TABLES[k][s, c] if seeker_is_boy else KOOTA_TABLES[k][c, s]
+    return out
+
+
+def top_matches(nak, rashi, mangalik, candidates, k=10, seeker_is_boy=True, min_points=18,
+                reject=("Nadi", "Bhakoot"), mangalik_rule="match"):
+    """Indices and points of the k best candidates, best first.
+
+    reject: kootas whose dosha (zero points) disqualifies a candidate.
+    mangalik_rule: "match" keeps candidates with the seeker's Mangalik status,
+    "exclude" drops Mangalik candidates, None ignores it.
+    """
+    points = score_many(nak, rashi, candidates, seeker_is_boy)
+    ok = points >= min_points
+    for koota in reject:
+        s, c = (rashi, candidates.rashi) if koota in _BY_SIGN else (nak, candidates.nakshatra)
+        ok &= (KOOTA_TABLES[koota][s, c] if seeker_is_boy else KOOTA_TABLES[koota][c, s]) > 0
+    if mangalik_rule == "match": ok &= candidates.mangalik == bool(mangalik)
+    elif mangalik_rule == "exclude": ok &= ~candidates.mangalik
+    idx = np.flatnonzero(ok)
+    if len(idx) > k:
+        idx = idx[np.argpartition(-points[idx], k - 1)[:k]]
+    idx = idx[np.lexsort((idx, -points[idx]))]
+    return idx, points[idx]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ashtakoota matching tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="time one-vs-many scoring over random candidates")
+    b.add_argument("--candidates", type=int, default=100_000)
+    b.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    padas = rng.integers(0, 108, args.candidates)
+    cands = Candidates((padas // 4).astype(np.int8), (padas // 9).astype(np.int8), rng.random(args.candidates) < 0.4)
+    t = time.perf_counter()
+    for i in range(args.repeat):
+        idx, pts = top_matches(i % 27, (i % 27) * 4 // 9, False, cands, k=10)
+    per = (time.perf_counter() - t) / args.repeat
+    print(f"{args.candidates} candidates: {per * 1000:.2f} ms per top-10 search "
+          f"({args.candidates / per / 1e6:.1f} M candidates/s); best {pts[:3].tolist()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
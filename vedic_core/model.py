@@ -0,0 +1,296 @@
+"""Compact chart representation.
+
+A Chart holds only numbers: body and cusp longitudes as float arrays, and
+signs, nakshatras, lords, vargas and panchang elements as small integer
+codes. Names, degree strings, interpretation texts and nakshatra properties
+are looked up from the static tables when a chart is displayed, through
+view() or the legacy accessors, so sessions never hold copies of them.
+"""
+import math
+import struct
+from array import array
+from collections.abc import Mapping
+
+import swisseph as swe
+
+from .frames import TropicalPass
+from .kp import KP_LORDS, kp_lords_array
+from .panchang import format_panchang, lunar_codes, sun_times
+from .timing import stage
+from .varga import VARGA_LIST, varga_signs
+
+BODIES = ["Ascendant", "Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+ZODIAC = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+NAKSHATRAS = ["Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"]
+DAY_LORDS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+_NAK = 360 / 27
+# Combustion orbs in degrees from the Sun, (direct, retrograde), per BODIES index
+COMBUSTION_ORBS = {2: (12, 12), 3: (17, 17), 4: (14, 12), 5: (11, 11), 6: (10, 8), 7: (15, 15)}
+MANGALIK_HOUSES = (1, 4, 7, 8, 12)
+# (title, charts_data key) for every chart shown in the app and the PDF report.
+DIVISIONAL_CHARTS = [
+    ("Lagna (D1)", "D1"), ("Hora (D2) - Wealth", "D2"), ("Drekkana (D3) - Siblings", "D3"),
+    ("Chaturthamsha (D4) - Luck", "D4"), ("Saptamsa (D7) - Children", "D7"), ("Navamsa (D9) - Spouse", "D9"),
+    ("Dasamsa (D10) - Career", "D10"), ("Dwadasamsa (D12) - Parents", "D12"), ("Shodasamsa (D16) - Vehicles", "D16"),
+    ("Vimsamsa (D20) - Spiritual", "D20"), ("Chaturvimsamsa (D24) - Learning", "D24"), ("Saptavimsamsa (D27) - Strength", "D27"),
+    ("Trimsamsa (D30) - Misfortune", "D30"), ("Khavedamsa (D40) - Auspicious", "D40"), ("Akshavedamsa (D45) - General", "D45"),
+    ("Shastiamsa (D60) - Karma", "D60"), ("Chalit (Bhav)", "Chalit"), ("Sun Chart", "Sun"), ("Moon Chart", "Moon"),
+]
+
+_MAGIC = b"VCH2"
+# magic, jd, lat, lon, weekday, ayanamsa, 10 longitudes, 10 speeds, 12 cusps, tithi, yoga, karana, sunrise, sunset
+_HEADER = struct.Struct("<4sdddBd10d10d12dBBBii")
+_MAGIC_V1 = b"VCH1"   # no speeds, tropical cusps; still read so stored profiles load
+_HEADER_V1 = struct.Struct("<4sdddBd10d12dBBBii")
+_N_CODES, _N_KP, _N_VARGAS = 3 * len(BODIES), 3 * (len(BODIES) + 12), len(VARGA_LIST) * len(BODIES)
+
+
+class Chart:
+    """One birth chart as arrays and integer codes.
+
+    codes:  per body (sign 0-11, nakshatra 0-26, pada 0-3)
+    kp:     per body then per cusp (sign, star, sub lord) as indices into KP_LORDS
+    vargas: per varga (VARGA_LIST order) then per body, varga sign 1-12
+    """
+    __slots__ = ("jd", "lat", "lon", "weekday", "ayanamsa", "lons", "speeds", "cusps", "panchang", "codes", "kp", "vargas")
+
+    def __init__(self, jd, lat, lon, weekday, ayanamsa, lons, speeds, cusps, panchang, codes, kp, vargas):
+        self.jd, self.lat, self.lon, self.weekday, self.ayanamsa = jd, lat, lon, weekday, ayanamsa
+        self.lons, self.speeds, self.cusps = lons, speeds, cusps
+        self.panchang = panchang  # (tithi, yoga, karana, sunrise secs or None, sunset secs or None)
+        self.codes, self.kp, self.vargas = codes, kp, vargas
+
+    @classmethod
+    def from_ephemeris(cls, jd, lat, lon, birth_dt, sid_mode=swe.SIDM_LAHIRI, house_system="P"):
+        """Computes a chart in ayanamsa `sid_mode` with cusps from `house_system`."""
+        return cls.from_frames(jd, lat, lon, birth_dt, [(sid_mode, house_system)])[0]
+
+    @classmethod
+    def from_frames(cls, jd, lat, lon, birth_dt, pairs):
+        """Charts for several (sid_mode, house_system) pairs from one ephemeris pass
+        (see frames.py); sunrise and sunset are found once for all of them."""
+        tp = TropicalPass(jd, lat, lon)
+        with stage("chart.panchang"):
+            times = sun_times(jd, lat, lon, birth_dt)
+        return [cls.from_frame(tp.frame(sid_mode, house_system), jd, lat, lon, birth_dt, times)
+                for sid_mode, house_system in pairs]
+
+    @classmethod
+    def from_frame(cls, frame, jd, lat, lon, birth_dt, sun_times):
+        """A chart from a frames.Frame and the birth's (sunrise, sunset) from panchang.sun_times."""
+        lons = frame.lons
+        codes = bytearray()
+        for deg in lons:
+            codes += bytes((int(deg / 30) % 12, int(deg / _NAK) % 27, int(deg % _NAK / (_NAK / 4))))
+        with stage("chart.kp"):
+            kp = bytes(kp_lords_array(list(lons) + list(frame.cusps)).astype("uint8").ravel())
+        with stage("chart.vargas"):
+            per_body = [varga_signs(deg) for deg in lons]
+            vargas = bytes(signs[vi] for vi in range(len(VARGA_LIST)) for signs in per_body)
+        panchang = (*lunar_codes(lons[1], lons[2]), *sun_times)
+        return cls(float(jd), float(lat), float(lon), birth_dt.weekday(), frame.ayanamsa, lons,
+                   frame.speeds, frame.cusps, panchang, bytes(codes), kp, vargas)
+
+    # --- serialization ---
+    def to_bytes(self):
+        tithi, yoga, karana, sunrise, sunset = self.panchang
+        head = _HEADER.pack(_MAGIC, self.jd, self.lat, self.lon, self.weekday, self.ayanamsa,
+                            *self.lons, *self.speeds, *self.cusps, tithi, yoga, karana,
+                            -1 if sunrise is None else sunrise, -1 if sunset is None else sunset)
+        return head + self.codes + self.kp + self.vargas
+
+    @classmethod
+    def from_bytes(cls, blob):
+        magic = bytes(blob[:4])
+        if magic == _MAGIC:
+            fields, o = _HEADER.unpack_from(blob), _HEADER.size
+            lons, speeds, cusps = array("d", fields[6:16]), array("d", fields[16:26]), array("d", fields[26:38])
+        elif magic == _MAGIC_V1:
+            fields, o = _HEADER_V1.unpack_from(blob), _HEADER_V1.size
+            lons, speeds, cusps = array("d", fields[6:16]), array("d", [float("nan")] * 10), array("d", fields[16:28])
+        else: raise ValueError("not a serialized Chart")
+        jd, lat, lon, weekday, ayanamsa = fields[1:6]
+        tithi, yoga, karana, sunrise, sunset = fields[-5:]
+        panchang = (tithi, yoga, karana, None if sunrise < 0 else sunrise, None if sunset < 0 else sunset)
+        codes, kp, vargas = blob[o:o + _N_CODES], blob[o + _N_CODES:o + _N_CODES + _N_KP], blob[o + _N_CODES + _N_KP:]
+        return cls(jd, lat, lon, weekday, ayanamsa, lons, speeds, cusps, panchang, bytes(codes), bytes(kp), bytes(vargas))
+
+    def upgraded(self, birth_dt):
+        """This chart, or if it was decoded from a VCH1 blob (no speeds, tropical cusps),
+        the same birth recomputed in the same ayanamsa."""
+        if not math.isnan(self.speeds[1]): return self
+        from .service import ayanamsa_of
+
+        sid_mode = ayanamsa_of(self.jd, self.ayanamsa)
+        return Chart.from_ephemeris(self.jd, self.lat, self.lon, birth_dt,
+                                    swe.SIDM_LAHIRI if sid_mode is None else sid_mode)
+
+    def __reduce__(self):
+        return Chart.from_bytes, (self.to_bytes(),)
+
+    def __eq__(self, other):
+        return isinstance(other, Chart) and self.to_bytes() == other.to_bytes()
+
+    def __repr__(self):
+        return f"<Chart jd={self.jd:.5f} lagna={ZODIAC[self.sign(0)]} moon={NAKSHATRAS[self.nakshatra(2)]}>"
+
+    # --- codes ---
+    def sign(self, body):
+        return self.codes[3 * body]
+
+    def nakshatra(self, body):
+        return self.codes[3 * body + 1]
+
+    def pada(self, body):
+        return self.codes[3 * body + 2] + 1
+
+    def varga_sign(self, varga, body):
+        return self.vargas[VARGA_LIST.index(varga) * len(BODIES) + body]
+
+    def kp_lords(self, i):
+        """(sign, star, sub) lord names for body i, or cusp i - len(BODIES)."""
+        return tuple(KP_LORDS[c] for c in self.kp[3 * i:3 * i + 3])
+
+    def first_house_sign(self, key):
+        """Sign (1-12) in the first house of charts_data()[key]."""
+        if key == "Sun": return self.sign(1) + 1
+        if key == "Moon": return self.sign(2) + 1
+        return self.varga_sign(1 if key == "Chalit" else int(key[1:]), 0)
+
+    def house(self, body):
+        return (self.sign(body) - self.sign(0)) % 12 + 1
+
+    def is_retrograde(self, body):
+        """Mars..Saturn with negative speed; Rahu and Ketu always (their mean motion)."""
+        if body in (8, 9): return True
+        return body >= 3 and self.speeds[body] < 0
+
+    def is_combust(self, body):
+        """Within COMBUSTION_ORBS of the Sun (the narrower orb when retrograde)."""
+        orbs = COMBUSTION_ORBS.get(body)
+        if orbs is None: return False
+        gap = abs((self.lons[body] - self.lons[1] + 180) % 360 - 180)
+        return gap < orbs[self.is_retrograde(body)]
+
+    def is_mangalik(self):
+        """Mars in house 1, 4, 7, 8 or 12 from the Lagna."""
+        return self.house(3) in MANGALIK_HOUSES
+
+    # --- display formatting (the shapes get_planet_positions has always returned) ---
+    def raw_bodies(self):
+        return dict(zip(BODIES, self.lons))
+
+    def charts_data(self):
+        n = len(BODIES)
+        charts = {}
+        for vi, v in enumerate(VARGA_LIST):
+            row = self.vargas[vi * n:(vi + 1) * n]
+            chart = {i: [] for i in range(1, 13)}
+            for b in range(1, n):
+                chart[((row[b] - row[0]) % 12) + 1].append(BODIES[b])
+            charts[f"D{v}"] = chart
+        charts["Chalit"] = charts["D1"]
+        for key, ref in (("Sun", 1), ("Moon", 2)):
+            chart = {i: [] for i in range(1, 13)}
+            for b in range(1, n):
+                chart[((self.sign(b) - self.sign(ref)) % 12) + 1].append(BODIES[b])
+            charts[key] = chart
+        return charts
+
+    def planet_details(self):
+        from .chart import get_planet_status
+
+        details = []
+        for b, deg in enumerate(self.lons):
+            sign_name = ZODIAC[self.sign(b)]
+            details.append({
+                "Planet": BODIES[b], "Sign": sign_name, "Nakshatra": NAKSHATRAS[self.nakshatra(b)],
+                "Degree": f"{int(deg%30)}°{int((deg%30%1)*60)}'",
+                "House": self.house(b), "Status": get_planet_status(BODIES[b], sign_name),
+                "Retrograde": "Yes" if self.is_retrograde(b) else "No",
+                "Combust": "Yes" if self.is_combust(b) else "No",
+            })
+        return details
+
+    def kp_planets(self):
+        return [dict(zip(("Planet", "Sign Lord", "Star Lord", "Sub Lord"), (name, *self.kp_lords(b))))
+                for b, name in enumerate(BODIES)]
+
+    def kp_cusps(self):
+        rows = []
+        for i, c_deg in enumerate(self.cusps):
+            c_s, c_st, c_sb = self.kp_lords(len(BODIES) + i)
+            rows.append({"Cusp": i + 1, "Degree": f"{int(c_deg%30)}°", "Sign": ZODIAC[int(c_deg/30)%12], "Sign Lord": c_s, "Star Lord": c_st, "Sub Lord": c_sb})
+        return rows
+
+    def ruling_planets(self):
+        keys = ("Sign Lord", "Star Lord", "Sub Lord")
+        return [
+            {"Type": "Ascendant", **dict(zip(keys, self.kp_lords(0)))},
+            {"Type": "Moon", **dict(zip(keys, self.kp_lords(2)))},
+            {"Type": "Day Lord", "Sign Lord": DAY_LORDS[self.weekday], "Star Lord": "-", "Sub Lord": "-"}
+        ]
+
+    def summary(self):
+        from .chart import get_nakshatra_properties
+        from .interpretations import get_detailed_interpretations
+
+        lagna, rashi, nak, charan = ZODIAC[self.sign(0)], ZODIAC[self.sign(2)], NAKSHATRAS[self.nakshatra(2)], self.pada(2)
+        moon_house = self.house(2)
+        if moon_house in [1, 6, 11]: paya = "Gold (Swarna)"
+        elif moon_house in [2, 5, 9]: paya = "Silver (Rajat)"
+        elif moon_house in [3, 7, 10]: paya = "Copper (Tamra)"
+        else: paya = "Iron (Loha)"
+        summary = {
+            "Lagna": lagna, "Rashi": rashi, "Nakshatra": nak, "Charan": charan,
+            "Mangalik": "Yes" if self.is_mangalik() else "No",
+            "Paya": paya,
+            "Asc_Sign_ID": int(self.lons[0] // 30) + 1,
+            **format_panchang((*self.panchang, self.ayanamsa)),
+            **get_detailed_interpretations(lagna),
+            **get_nakshatra_properties(nak, rashi, charan)
+        }
+        rahu_deg = self.lons[8]
+        side1, side2 = True, True
+        for deg in self.lons[1:8]:
+            diff = (deg - rahu_deg) % 360
+            if diff > 180: side1 = False
+            if diff < 180: side2 = False
+        summary["Kalsarpa"] = "Yes" if (side1 or side2) else "No"
+        east_chart_data = {i: [] for i in range(12)}
+        for b, deg in enumerate(self.lons):
+            east_chart_data[int(deg / 30)].append(BODIES[b][:2])
+        summary["east_chart"] = east_chart_data
+        return summary
+
+    def legacy(self):
+        """The 7-tuple get_planet_positions returns."""
+        return (self.charts_data(), self.planet_details(), self.kp_planets(), self.kp_cusps(),
+                self.ruling_planets(), self.summary(), self.raw_bodies())
+
+    def view(self):
+        return ChartView(self)
+
+
+class ChartView(Mapping):
+    """Read-only mapping with the app's chart keys ("Charts", "Summary", ...),
+    each formatted from the Chart on first access and kept for the view's lifetime."""
+    _KEYS = {"Charts": "charts_data", "Planet_Details": "planet_details", "KP_Planets": "kp_planets",
+             "KP_Cusps": "kp_cusps", "Ruling_Planets": "ruling_planets", "Summary": "summary",
+             "Raw_Bodies": "raw_bodies"}
+
+    def __init__(self, chart):
+        self.chart = chart
+        self._formatted = {}
+
+    def __getitem__(self, key):
+        if key not in self._formatted:
+            if key not in self._KEYS: raise KeyError(key)
+            self._formatted[key] = getattr(self.chart, self._KEYS[key])()
+        return self._formatted[key]
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
@@ -0,0 +1,280 @@
+"""Panchang (tithi, yoga, karana, sunrise/sunset) for a birth moment, and
+day-by-day Panchang calendars for a place over any date range.
+
+Calendar generation finds every tithi, karana, nakshatra and yoga change in
+the range by root solving on the Sun/Moon longitudes (all four are monotonic
+in time), streaming them in order, so each day only slices already-found
+transitions instead of re-evaluating the ephemeris.
+"""
+import datetime
+import os
+import sys
+from zoneinfo import ZoneInfo
+
+import swisseph as swe
+
+from .timing import stage
+
+YOGAS = ["Vishkumbha", "Priti", "Ayushman", "Saubhagya", "Sobhana", "Atiganda", "Sukarma", "Dhriti", "Shula", "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata", "Variyan", "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti"]
+NAKSHATRAS = ["Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"]
+MOVABLE_KARANAS = ["Bava", "Balava", "Kaulava", "Taitila", "Gara", "Vanija", "Vishti"]
+VARAS = ["Somavara", "Mangalavara", "Budhavara", "Guruvara", "Shukravara", "Shanivara", "Ravivara"]  # Monday first, like weekday()
+TIME_TOL = 1e-6  # days
+
+
+def tithi_name(idx):
+    """idx 0..29 -> "Shukla 1" ... "Krishna 15" (the app's existing naming)."""
+    num = idx + 1
+    return f"{'Shukla' if num <= 15 else 'Krishna'} {num if num <= 15 else num - 15}"
+
+
+def karana_name(idx):
+    """idx 0..59 (half-tithis from new moon): Kimstughna, 8 cycles of the 7 movable karanas,
+    then Shakuni, Chatushpada and Naga."""
+    if idx == 0: return "Kimstughna"
+    if idx >= 57: return ["Shakuni", "Chatushpada", "Naga"][idx - 57]
+    return MOVABLE_KARANAS[(idx - 1) % 7]
+
+
+def sunrise_sunset(jd_start, lat, lon):
+    """(sunrise, sunset) JDs (UT) of the first sunrise after jd_start and the sunset after it.
+    Either is None when the Sun does not rise or set (midnight sun, polar night),
+    which swisseph reports as flag -2."""
+    geopos = (lon, lat, 0)
+    with stage("panchang.rise_trans"):
+        flag, tret = swe.rise_trans(jd_start, swe.SUN, swe.CALC_RISE, geopos)
+        rise = None if flag == -2 else tret[0]
+        flag, tret = swe.rise_trans(jd_start if rise is None else rise, swe.SUN, swe.CALC_SET, geopos)
+        sett = None if flag == -2 else tret[0]
+    return rise, sett
+
+
+def _seconds_of_day(jd):
+    y, m, d, h = swe.revjul(jd)
+    return round(h * 3600) % 86400
+
+
+def _hms(secs):
+    return "Unknown" if secs is None else f"{secs // 3600:02d}:{secs // 60 % 60:02d}:{secs % 60:02d}"
+
+
+def sun_times(jd, lat, lon, birth_dt):
+    """(sunrise, sunset) of the birth day as seconds after midnight on the birth clock,
+    or (None, None) if the Sun does not rise or set there."""
+    # Local offset implied by the birth time, so sunrise/sunset read in the same clock
+    y, m, d, h = swe.revjul(jd)
+    offset_days = round(((birth_dt - datetime.datetime(y, m, d)).total_seconds() / 3600 - h) * 60) / 1440
+    try:
+        local_midnight = swe.julday(birth_dt.year, birth_dt.month, birth_dt.day, 0) - offset_days
+        rise, sett = sunrise_sunset(local_midnight, lat, lon)
+    except swe.Error: return None, None
+    return tuple(None if t is None else _seconds_of_day(t + offset_days) for t in (rise, sett))
+
+
+def lunar_codes(sun_pos, moon_pos):
+    """(tithi, yoga, karana) indices from sidereal Sun and Moon longitudes."""
+    diff = (moon_pos - sun_pos) % 360
+    total = (moon_pos + sun_pos) % 360
+    return int(diff / 12), int(total / (13 + 20/60)), int(diff / 6)
+
+
+def panchang_codes(jd, lat, lon, birth_dt, moon_pos, sid_mode=swe.SIDM_LAHIRI):
+    """(tithi, yoga, karana, sunrise, sunset, ayanamsa) for a birth: element indices,
+    sunrise/sunset as seconds after midnight on the birth clock (None if not found).
+    `moon_pos` is the sidereal Moon in `sid_mode`."""
+    from .service import sidereal
+
+    with sidereal(sid_mode):
+        sun_pos = swe.calc_ut(jd, 0, swe.FLG_SIDEREAL)[0][0]
+        ayanamsa = swe.get_ayanamsa_ex_ut(jd, 0)[1]
+    return (*lunar_codes(sun_pos, moon_pos), *sun_times(jd, lat, lon, birth_dt), ayanamsa)
+
+
+def format_panchang(codes):
+    tithi, yoga, karana, sunrise, sunset, ayanamsa = codes
+    return {"Sunrise": _hms(sunrise), "Sunset": _hms(sunset), "Tithi": tithi_name(tithi), "Yoga": YOGAS[yoga], "Karan": karana_name(karana), "Ayanamsa": f"{ayanamsa:.2f}°"}
+
+
+def calculate_panchang(jd, lat, lon, birth_dt, moon_pos, sid_mode=swe.SIDM_LAHIRI):
+    return format_panchang(panchang_codes(jd, lat, lon, birth_dt, moon_pos, sid_mode))
+
+
+# --- CALENDAR GENERATION ---
+class _SunMoon:
+    """Sidereal Sun/Moon longitudes and speeds, memoized per instant so the
+    four angle functions share every ephemeris evaluation they have in common.
+    `eph` is an optional (body, jd) -> (longitude, speed) callable such as a
+    ChebyshevEphemeris; by default swisseph is called in `sid_mode`."""
+
+    def __init__(self, eph=None, sid_mode=swe.SIDM_LAHIRI):
+        self._memo = {}
+        self._eph = eph
+        self._sid_mode = sid_mode
+
+    def __call__(self, jd):
+        hit = self._memo.get(jd)
+        if hit is None:
+            if self._eph is not None:
+                hit = self._memo[jd] = self._eph("Sun", jd) + self._eph("Moon", jd)
+            else:
+                from .service import sidereal
+
+                flags = swe.FLG_SIDEREAL | swe.FLG_SPEED
+                with sidereal(self._sid_mode):
+                    s, m = swe.calc_ut(jd, swe.SUN, flags)[0], swe.calc_ut(jd, swe.MOON, flags)[0]
+                hit = self._memo[jd] = (s[0], s[3], m[0], m[3])
+            if len(self._memo) > 4096: self._memo.clear()
+        return hit
+
+
+_ANGLES = {
+    # name: (span in degrees, angle(sun, moon), rate(sun_speed, moon_speed), labeller)
+    "Tithi": (12, lambda s, m: (m - s) % 360, lambda vs, vm: vm - vs, tithi_name),
+    "Karana": (6, lambda s, m: (m - s) % 360, lambda vs, vm: vm - vs, karana_name),
+    "Nakshatra": (360 / 27, lambda s, m: m, lambda vs, vm: vm, NAKSHATRAS.__getitem__),
+    "Yoga": (360 / 27, lambda s, m: (m + s) % 360, lambda vs, vm: vm + vs, YOGAS.__getitem__),
+}
+
+
+def _transitions(sun_moon, element, jd0):
+    """Endless stream of (jd, index) for each change of `element` after jd0,
+    preceded by (jd0, index at jd0). Newton on the monotonic angle, kept inside a bracket."""
+    span, angle, rate, _ = _ANGLES[element]
+    n = round(360 / span)
+    s, vs, m, vm = sun_moon(jd0)
+    a = angle(s, m)
+    idx = int(a / span) % n
+    yield jd0, idx
+    t = jd0
+    while True:
+        target = ((idx + 1) % n) * span
+        lo = t
+        while True:   # predict forward until the boundary is bracketed
+            s, vs, m, vm = sun_moon(t)
+            t_next = t + max(((target - angle(s, m)) % 360) / rate(vs, vm), 1e-4)
+            s2, _, m2, _ = sun_moon(t_next)
+            d = (angle(s2, m2) - target + 180) % 360 - 180
+            if d >= 0: hi = t_next; break
+            lo = t = t_next
+        t = hi
+        while hi - lo > TIME_TOL:
+            s, vs, m, vm = sun_moon(t)
+            d = (angle(s, m) - target + 180) % 360 - 180
+            if abs(d) < 1e-7: break
+            if d >= 0: hi = t
+            else: lo = t
+            t_new = t - d / rate(vs, vm)
+            t = t_new if lo < t_new < hi else 0.5 * (lo + hi)
+        idx = (idx + 1) % n
+        yield t, idx
+
+
+def _local(jd, zone):
+    y, m, d, h = swe.revjul(jd)
+    utc = datetime.datetime(y, m, d, tzinfo=datetime.timezone.utc) + datetime.timedelta(hours=h)
+    return utc.astimezone(zone).replace(tzinfo=None, microsecond=0)
+
+
+def panchang_calendar(start_date, end_date, lat, lon, tz_name, sid_mode=swe.SIDM_LAHIRI, eph=None):
+    """Yields one dict per civil day in [start_date, end_date] for a place.
+
+    Each day runs sunrise to next sunrise; "Tithi", "Nakshatra", "Yoga" and
+    "Karana" list every element in force during it with local start/end times.
+    On days without a sunrise (polar night, midnight sun) the day starts at
+    local midnight instead, and "Sunrise"/"Sunset" are None when absent.
+    `eph` (e.g. a ChebyshevEphemeris built for `sid_mode`) replaces swisseph
+    for the Sun and Moon; sunrise and sunset still come from swisseph. A store
+    built for another ayanamsa is a ValueError.
+    """
+    if eph is not None and getattr(eph, "sid_mode", sid_mode) != sid_mode:
+        raise ValueError(f"ephemeris store is for ayanamsa {eph.sid_mode}, not {sid_mode}")
+    zone = ZoneInfo(tz_name)
+    sun_moon = _SunMoon(eph, sid_mode)
+
+    def local_midnight_jd(day):
+        offset = datetime.datetime.combine(day, datetime.time(), tzinfo=zone).utcoffset()
+        return swe.julday(day.year, day.month, day.day, 0) - offset.total_seconds() / 86400
+
+    def day_start(day):
+        """(start, sunrise, sunset): the day starts at sunrise, or local midnight without one."""
+        midnight = local_midnight_jd(day)
+        rise, sett = sunrise_sunset(midnight, lat, lon)
+        return (midnight if rise is None else rise), rise, sett
+
+    today = day_start(start_date)
+    streams = {name: _transitions(sun_moon, name, today[0] - 2) for name in _ANGLES}
+    pending = {name: [next(it), next(it)] for name, it in streams.items()}
+
+    day = start_date
+    while day <= end_date:
+        tomorrow = day_start(day + datetime.timedelta(days=1))
+        (start, rise, sett), next_start = today, tomorrow[0]
+        entry = {
+            "Date": day.isoformat(), "Vara": VARAS[day.weekday()],
+            "Sunrise": None if rise is None else _local(rise, zone).isoformat(),
+            "Sunset": None if sett is None else _local(sett, zone).isoformat(),
+        }
+        for name, it in streams.items():
+            window = pending[name]
+            while window[-1][0] < next_start: window.append(next(it))
+            while len(window) > 2 and window[1][0] <= start: window.pop(0)
+            label = _ANGLES[name][3]
+            entry[name] = [
+                {"Name": label(idx), "Start": _local(t0, zone).isoformat(), "End": _local(t1, zone).isoformat()}
+                for (t0, idx), (t1, _) in zip(window, window[1:]) if t0 < next_start
+            ]
+        yield entry
+        day, today = day + datetime.timedelta(days=1), tomorrow
+
+
+def _calendar_job(args):
+    from .ephemeris import open_default_ephemeris
+
+    name, lat, lon, tz_name, start, end, sid_mode = args
+    # The default store only serves its own ayanamsa; for any other this is None and
+    # panchang_calendar calls swisseph under service.sidereal(sid_mode).
+    eph = open_default_ephemeris(sid_mode)
+    return name, list(panchang_calendar(start, end, lat, lon, tz_name, sid_mode, eph=eph))
+
+
+def panchang_calendars(cities, start_date, end_date, max_workers=None, sid_mode=swe.SIDM_LAHIRI):
+    """Calendars for many (name, lat, lon, tz_name) cities in a process pool, in
+    ayanamsa `sid_mode`. Yields (name, days) as each city finishes."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = [(name, lat, lon, tz, start_date, end_date, sid_mode) for name, lat, lon, tz in cities]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        yield from pool.map(_calendar_job, jobs)
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    from .service import AYANAMSAS
+
+    parser = argparse.ArgumentParser(description="Generate daily Panchang calendars as JSON Lines")
+    parser.add_argument("--city", action="append", required=True, metavar="NAME,LAT,LON,TZ",
+                        help='e.g. "Kolkata,22.5726,88.3639,Asia/Kolkata" (repeatable)')
+    parser.add_argument("--start", type=datetime.date.fromisoformat, required=True)
+    parser.add_argument("--end", type=datetime.date.fromisoformat, required=True)
+    parser.add_argument("--out", default=".", help="directory for <city>.jsonl files")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--ayanamsa", choices=list(AYANAMSAS), default="Lahiri")
+    args = parser.parse_args(argv)
+
+    cities = []
+    for spec in args.city:
+        name, lat, lon, tz = spec.rsplit(",", 3)
+        cities.append((name, float(lat), float(lon), tz))
+    os.makedirs(args.out, exist_ok=True)
+    for name, days in panchang_calendars(cities, args.start, args.end, args.workers, AYANAMSAS[args.ayanamsa]):
+        path = os.path.join(args.out, f"{name.replace('/', '_')}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for day in days: f.write(json.dumps(day, ensure_ascii=False) + "\n")
+        print(f"{name}: {len(days)} days -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""Kundali booklet as a PDF (reportlab), with charts drawn as vector paths.
+
+Charts are drawn straight from vedic_core.layout, like the SVG renderer.
+Each distinct chart becomes one PDF form XObject per document, so repeats
+(D1 and the Chalit chart, the same chart on the KP page) are stored once.
+The drawing ops are memoized per (house_planets, asc_sign, style).
+
+A report needs only the 560-byte Chart encoding plus a few profile fields.
+That is what crosses the process boundary:
+
+    pool = ReportPool(max_workers=2)
+    future = pool.submit(chart, name="...", birth="1990-01-01T10:00", place="...")
+    pdf_bytes = future.result()
+
+Bulk mode renders every record of a vedic_core.bulk JSONL file. Workers
+write the PDFs themselves and only paths come back, so memory stays flat:
+
+    python -m vedic_core.pdf bulk charts.jsonl -o reports/ --workers 8
+
+Dasha tables list the Mahadashas and every Antardasha. Below that they
+follow the periods running on the report date (Pratyantardasha, Sookshma,
+Prana), since the full five-level tree has 59,049 rows.
+"""
+import argparse
+import base64
+import datetime
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from html import escape
+
+from .cache import canonical_key
+from .dasha import DASHA_LEVELS, DashaTree, datetime_to_jd, jd_to_datetime
+from .layout import CENTER, EXTENT, LINES, chart_labels, normalize_style
+from .model import DIVISIONAL_CHARTS, Chart
+
+CHART_PT = 165     # chart square in points
+TITLE_PT = 14      # band above each chart for its title
+PLANET_PT = 7
+SIGN_PT = 6.5
+PROFILE_KEYS = [("General", "Gen"), ("Personality", "Pers"), ("Physical Appearance", "Phys"),
+                ("Health", "Health"), ("Career", "Career"), ("Relationships", "Rel")]
+
+
+def _freeze(house_planets):
+    return tuple((h, tuple(house_planets.get(h, ()))) for h in range(1, 13))
+
+
+@lru_cache(maxsize=2048)
+def _chart_ops(frozen, asc_sign, style):
+    """(lines, centre box, labels) in unit coordinates (0-1, y up)."""
+    ext = EXTENT[style]
+    lines = tuple((x0 / ext, y0 / ext, x1 / ext, y1 / ext) for (x0, y0), (x1, y1) in LINES[style])
+    center = tuple(v / ext for v in CENTER[style]) if CENTER[style] else None
+    labels = tuple((x / ext, y / ext, tuple(text.split("\n")), kind)
+                   for x, y, text, kind in chart_labels(dict(frozen), asc_sign, style))
+    return lines, center, labels
+
+
+def draw_chart_pdf(canv, house_planets, asc_sign, style="North", title="Chart", size=CHART_PT):
+    """Draws a chart with its title band at the canvas origin (size x size + TITLE_PT)."""
+    style = normalize_style(style)
+    lines, center, labels = _chart_ops(_freeze(house_planets), int(asc_sign), style)
+    canv.saveState()
+    canv.setFont("Helvetica-Bold", 8)
+    canv.drawCentredString(size / 2, size + 4, title)
+    canv.setLineWidth(0.8)
+    canv.lines([(x0 * size, y0 * size, x1 * size, y1 * size) for x0, y0, x1, y1 in lines])
+    if center:
+        cx, cy, w, h = (v * size for v in center)
+        canv.setFillColorRGB(1, 1, 1)
+        canv.rect(cx + 0.4, cy + 0.4, w - 0.8, h - 0.8, stroke=0, fill=1)
+        canv.setFillColorRGB(0, 0, 0)
+        canv.drawCentredString(cx + w / 2, cy + h / 2 - 3, "Rashi")
+    for x, y, text, kind in labels:
+        if kind == "sign":
+            canv.setFillColorRGB(0.8, 0, 0)
+            canv.setFont("Helvetica", SIGN_PT)
+            canv.drawCentredString(x * size, y * size, text[0])
+            continue
+        canv.setFillColorRGB(0, 0, 0)
+        canv.setFont("Helvetica-Bold", PLANET_PT)
+        lead = PLANET_PT * 1.15
+        top = y * size + (len(text) - 1) * lead / 2 - PLANET_PT * 0.35   # block centred on (x, y)
+        for i, line in enumerate(text):
+            canv.drawCentredString(x * size, top - i * lead, line)
+    canv.restoreState()
+
+
+def _chart_flowable(house_planets, asc_sign, style, title):
+    from reportlab.platypus import Flowable
+
+    class ChartFlowable(Flowable):
+        def wrap(self, avail_w, avail_h):
+            return CHART_PT, CHART_PT + TITLE_PT
+
+        def draw(self):
+            key = repr((_freeze(house_planets), int(asc_sign), normalize_style(style), title))
+            name = "chart" + hashlib.sha1(key.encode()).hexdigest()[:16]
+            if not self.canv.hasForm(name):
+                self.canv.beginForm(name, 0, 0, CHART_PT, CHART_PT + TITLE_PT)
+                draw_chart_pdf(self.canv, house_planets, asc_sign, style, title)
+                self.canv.endForm()
+            self.canv.doForm(name)
+
+    return ChartFlowable()
+
+
+def _table(rows, col_widths=None, header=True):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    t = Table(rows, colWidths=col_widths, repeatRows=1 if header else 0)
+    style = [("FONT", (0, 0), (-1, -1), "Helvetica", 8), ("GRID", (0, 0), (-1, -1), 0.4, colors.grey),
+             ("VALIGN", (0, 0), (-1, -1), "TOP"), ("BOTTOMPADDING", (0, 0), (-1, -1), 2), ("TOPPADDING", (0, 0), (-1, -1), 2)]
+    if header:
+        style += [("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 8), ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8e0f0"))]
+    t.setStyle(TableStyle(style))
+    return t
+
+
+def _side_by_side(cells, col_widths=None):
+    from reportlab.platypus import Table, TableStyle
+
+    t = Table([cells], colWidths=col_widths)
+    t.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP")]))
+    return t
+
+
+def _dict_table(records):
+    keys = list(records[0])
+    return _table([keys] + [[str(r[k]) for k in keys] for r in records])
+
+
+def _pairs(items):
+    return _table([[k, str(v)] for k, v in items], col_widths=[110, 140], header=False)
+
+
+def _dasha_rows(periods, fmt="%d-%b-%Y"):
+    return [[p.lord, p.start.strftime(fmt), p.end.strftime(fmt)] for p in periods]
+
+
+def build_report(out, chart, name="", gender="", birth=None, place="", tz="", style="North", at_jd=None):
+    """Writes the booklet for `chart` to `out` (path or binary file object)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table
+
+    styles = getSampleStyleSheet()
+    h1, h2, body = styles["Title"], styles["Heading2"], styles["BodyText"]
+    s = chart.summary()
+    charts = chart.charts_data()
+    at_jd = at_jd if at_jd is not None else datetime_to_jd(datetime.datetime.now(datetime.timezone.utc))
+    birth = datetime.datetime.fromisoformat(birth) if isinstance(birth, str) else birth
+
+    def chart_grid(items, cols=3):
+        cells = [_chart_flowable(charts[key], chart.first_house_sign(key), style, title) for title, key in items]
+        rows = [cells[i:i + cols] + [""] * (cols - len(cells[i:i + cols])) for i in range(0, len(cells), cols)]
+        return Table(rows, colWidths=[CHART_PT + 10] * cols)
+
+    story = [Paragraph(f"{escape(name, quote=False) or 'Kundali'}", h1)]
+    details = [("Name", name), ("Gender", gender), ("Date", birth.strftime("%d %B %Y %H:%M") if birth else "-"),
+               ("Place", place), ("Timezone", tz), ("Lagna", s["Lagna"]), ("Ayanamsa", s["Ayanamsa"]),
+               ("Mangalik Dosh", s["Mangalik"]), ("Kal Sarpa Dosha", s["Kalsarpa"])]
+    avakahada = [("Varna", s["Varna"]), ("Vashya", s["Vashya"]), ("Yoni", s["Yoni"]), ("Gan", s["Gana"]),
+                 ("Nadi", s["Nadi"]), ("Sign", s["Rashi"]), ("Sign Lord", s["SignLord"]),
+                 ("Nakshatra-Charan", f"{s['Nakshatra']} ({s['Charan']})"), ("Tatva", s["Tatva"]),
+                 ("Paya", s["Paya"]), ("Name Alphabet", s["NameAlpha"])]
+    panchang = [("Tithi", s["Tithi"]), ("Karan", s["Karan"]), ("Yog", s["Yoga"]),
+                ("Sunrise", s["Sunrise"]), ("Sunset", s["Sunset"])]
+    story += [Paragraph("Basic Details", h2), _side_by_side([_pairs(details), _pairs(avakahada)]),
+              Paragraph("Panchang", h2), _pairs(panchang), Paragraph("Vedic Profile", h2)]
+    for label, key in PROFILE_KEYS:
+        story.append(Paragraph(f"<b>{label}:</b> {escape(s[key], quote=False)}", body))
+
+    story += [PageBreak(), Paragraph("Lagna and Navamsa", h2),
+              chart_grid([DIVISIONAL_CHARTS[0], DIVISIONAL_CHARTS[5]], cols=2),
+              Paragraph("Planetary Details & Status", h2), _dict_table(chart.planet_details()),
+              PageBreak(), Paragraph("Shodashvarga & Divisional Charts", h2), chart_grid(DIVISIONAL_CHARTS),
+              PageBreak(), Paragraph("Krishnamurti Paddhati (KP)", h2),
+              _side_by_side([chart_grid([("Bhav Chalit", "Chalit")], cols=1), _dict_table(chart.ruling_planets())]),
+              Paragraph("KP Planets", h2), _dict_table(chart.kp_planets()),
+              Paragraph("KP Cusps", h2), _dict_table(chart.kp_cusps())]
+
+    tree = DashaTree(chart.jd, chart.lons[2])
+    running = tree.at(at_jd, 5) if tree.covers(at_jd) else []
+    story += [PageBreak(), Paragraph("Vimshottari Dasha", h2),
+              Paragraph(f"Running on {jd_to_datetime(at_jd):%d-%b-%Y}: "
+                        + (" / ".join(f"{DASHA_LEVELS[p.level - 1]} {p.lord}" for p in running)
+                           or "none (outside the 120-year cycle)"), body),
+              Spacer(1, 6), _table([["Mahadasha", "Start", "End"]] + _dasha_rows(tree.children()))]
+    ad_tables = [_table([[f"{md.lord} MD", "Start", "End"]] + _dasha_rows(tree.children(md)), col_widths=[62, 54, 54])
+                 for md in tree.children()]
+    story += [Paragraph("Antardasha", h2),
+              *(_side_by_side(ad_tables[i:i + 3]) for i in range(0, 9, 3))]
+    fmts = {3: "%d-%b-%Y", 4: "%d-%b-%Y %H:%M", 5: "%d-%b-%Y %H:%M"}
+    for parent in running[1:4]:
+        level = parent.level + 1
+        story += [Paragraph(f"{DASHA_LEVELS[level - 1]} under {parent.lord} ({DASHA_LEVELS[parent.level - 1]})", h2),
+                  _table([["Lord", "Start", "End"]] + _dasha_rows(tree.children(parent), fmts[level]))]
+
+    doc = SimpleDocTemplate(out, pagesize=A4, leftMargin=28, rightMargin=28, topMargin=28, bottomMargin=28,
+                            title=f"Kundali - {name}", author="TaraVaani")
+    doc.build(story)
+
+
+def report_bytes(chart, **meta):
+    buf = io.BytesIO()
+    build_report(buf, chart, **meta)
+    return buf.getvalue()
+
+
+# --- process pool ---
+def _render_blob(blob, meta):
+    return report_bytes(Chart.from_bytes(blob), **meta)
+
+
+def _render_to_file(blob, meta, path):
+    tmp = path + ".tmp"
+    try:
+        build_report(tmp, Chart.from_bytes(blob), **meta)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except FileNotFoundError: pass
+        raise
+    return path
+
+
+class ReportPool:
+    """Renders reports in worker processes. Identical requests (same chart, fields and
+    date) share one future, and the last `keep` finished reports are kept."""
+
+    def __init__(self, max_workers=2, keep=32):
+        self.max_workers, self.keep = max_workers, keep
+        self._executor = None
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, chart, **meta):
+        from concurrent.futures import ProcessPoolExecutor
+
+        meta.setdefault("at_jd", datetime_to_jd(datetime.datetime.combine(datetime.date.today(), datetime.time())))
+        blob = chart.to_bytes()
+        key = canonical_key("pdf", blob=blob.hex(), **meta)
+        with self._lock:
+            fut = self._futures.get(key)
+            if fut is not None and not (fut.done() and fut.exception() is not None):
+                self._futures.move_to_end(key)
+                return fut
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            fut = self._futures[key] = self._executor.submit(_render_blob, blob, meta)
+            while len(self._futures) > self.keep:
+                self._futures.popitem(last=False)
+            return fut
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._futures.clear()
+
+
+def render_bulk(jsonl_path, out_dir, workers=None, style="North", progress=None):
+    """One PDF per record of a vedic_core.bulk JSONL file, named <id>.pdf. Existing
+    files are skipped, so an interrupted run can simply be restarted. A record that
+    fails to render is counted in "errors" (its id and message in "failed") and the
+    run goes on, like the error rows of vedic_core.bulk."""
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    at_jd = datetime_to_jd(datetime.datetime.combine(datetime.date.today(), datetime.time()))
+    done = skipped = 0
+    failed = {}
+    t0 = time.perf_counter()
+    pending = {}
+
+    def collect(finished):
+        nonlocal done
+        for fut in finished:
+            rid = pending.pop(fut)
+            try:
+                fut.result()
+                done += 1
+            except Exception as e:
+                failed[rid] = f"{type(e).__name__}: {e}"
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(jsonl_path, encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            rec = json.loads(line)
+            if "chart" not in rec: continue
+            rid = str(rec.get("id") if rec.get("id") is not None else n)
+            path = os.path.join(out_dir, "".join(c if c.isalnum() or c in "-_." else "_" for c in rid) + ".pdf")
+            if os.path.exists(path):
+                skipped += 1
+                continue
+            meta = {"name": rec.get("name") or "", "gender": rec.get("gender") or "", "birth": rec.get("birth"),
+                    "place": rec.get("place") or "", "tz": rec.get("tz") or "", "style": style, "at_jd": at_jd}
+            if len(pending) >= workers * 4:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                if progress: progress(done, done / (time.perf_counter() - t0))
+            try: blob = base64.b64decode(rec["chart"], validate=True)
+            except ValueError as e:
+                failed[rid] = f"{type(e).__name__}: {e}"
+                continue
+            pending[pool.submit(_render_to_file, blob, meta, path)] = rid
+        collect(wait(pending).done)
+    seconds = time.perf_counter() - t0
+    return {"reports": done, "skipped": skipped, "errors": len(failed), "failed": failed,
+            "seconds": seconds, "rate": done / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF kundali reports")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bulk", help="one PDF per record of a vedic_core.bulk JSONL file")
+    b.add_argument("jsonl")
+    b.add_argument("-o", "--output", required=True, help="output directory")
+    b.add_argument("--workers", type=int, default=None, help="default: one per core")
+    b.add_argument("--style", choices=["North", "South", "East"], default="North")
+    args = parser.parse_args(argv)
+
+    def progress(done, rate):
+        print(f"\r{done} reports, {rate:.1f} reports/s", end="", file=sys.stderr, flush=True)
+    stats = render_bulk(args.jsonl, args.output, args.workers, args.style, progress)
+    print(f"\n{stats['reports']} reports in {stats['seconds']:.1f} s ({stats['rate']:.1f}/s), "
+          f"{stats['skipped']} already present, {stats['errors']} errors", file=sys.stderr)
+    for rid, message in stats["failed"].items():
+        print(f"  {rid}: {message}", file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Saved birth profiles: a small store interface over pluggable backends.
+
+Profiles are stored in compact form: a few scalar fields plus the Chart's
+560-byte encoding, never the formatted tables. ProfileStore puts a
+read-through LRU in front of the backend and groups writes into batched
+commits (flushed when a batch fills, after `flush_interval` seconds, or on
+flush()/close()). Each store flushes itself at interpreter exit. A failed
+commit keeps its records pending and re-arms the timer. Records holding an
+older Chart encoding are upgraded on load and queued to be written back,
+so each is migrated once.
+
+Backends implement get_many(ids) -> {id: record}, put_many(records),
+list_ids(user_id) and delete(id). Records are plain dicts (see
+encode_profile). MemoryBackend and SQLiteBackend need nothing external;
+FirestoreBackend takes a google.cloud.firestore client.
+"""
+import atexit
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .model import Chart
+
+DEFAULT_PROFILE_DB = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "profiles.sqlite")
+FIRESTORE_BATCH_LIMIT = 500  # operations per Firestore batch commit
+
+
+class Profile(NamedTuple):
+    profile_id: str
+    user_id: str
+    name: str
+    gender: str
+    birth_dt: datetime.datetime  # local wall time
+    place: str
+    lat: float
+    lon: float
+    timezone: str
+    chart: Chart
+    updated: float = 0.0
+
+    @classmethod
+    def new(cls, user_id, name, gender, birth_dt, place, lat, lon, timezone, chart):
+        import uuid
+
+        return cls(uuid.uuid4().hex, user_id, name, gender, birth_dt, place, lat, lon, timezone, chart, time.time())
+
+
+def encode_profile(p):
+    return {"id": p.profile_id, "user_id": p.user_id, "name": p.name, "gender": p.gender,
+            "birth_dt": p.birth_dt.isoformat(), "place": p.place, "lat": p.lat, "lon": p.lon,
+            "timezone": p.timezone, "chart": p.chart.to_bytes(), "updated": p.updated}
+
+
+def decode_profile(r):
+    birth_dt = datetime.datetime.fromisoformat(r["birth_dt"])
+    return Profile(r["id"], r["user_id"], r["name"], r["gender"], birth_dt, r["place"], r["lat"], r["lon"],
+                   r["timezone"], Chart.from_bytes(bytes(r["chart"])).upgraded(birth_dt), r["updated"])
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._records = {}
+        self.commits = 0
+
+    def get_many(self, ids):
+        return {i: self._records[i] for i in ids if i in self._records}
+
+    def put_many(self, records):
+        self.commits += 1
+        for r in records: self._records[r["id"]] = dict(r)
+
+    def list_ids(self, user_id):
+        rows = sorted((r["updated"], i) for i, r in self._records.items() if r["user_id"] == user_id)
+        return [i for _, i in reversed(rows)]
+
+    def delete(self, profile_id):
+        self._records.pop(profile_id, None)
+
+
+class SQLiteBackend:
+    _FIELDS = ("name", "gender", "birth_dt", "place", "lat", "lon", "timezone")
+
+    def __init__(self, path=DEFAULT_PROFILE_DB):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS profiles (id TEXT PRIMARY KEY, user_id TEXT, meta TEXT, "
+                         "chart BLOB, updated REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS profiles_user ON profiles (user_id, updated)")
+
+    def get_many(self, ids):
+        import json
+
+        ids = list(ids)
+        if not ids: return {}
+        with self._lock:
+            rows = self._db.execute(f"SELECT id, user_id, meta, chart, updated FROM profiles WHERE id IN ({','.join('?' * len(ids))})",
+                                    ids).fetchall()
+        return {i: {"id": i, "user_id": u, **json.loads(meta), "chart": chart, "updated": upd} for i, u, meta, chart, upd in rows}
+
+    def put_many(self, records):
+        import json
+
+        rows = [(r["id"], r["user_id"], json.dumps({k: r[k] for k in self._FIELDS}), r["chart"], r["updated"]) for r in records]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?)", rows)
+
+    def list_ids(self, user_id):
+        with self._lock:
+            rows = self._db.execute("SELECT id FROM profiles WHERE user_id = ? ORDER BY updated DESC", (user_id,)).fetchall()
+        return [r[0] for r in rows]
+
+    def delete(self, profile_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+
+
+class FirestoreBackend:
+    def __init__(self, client, collection="profiles"):
+        self.client = client
+        self.collection = client.collection(collection)
+
+    def get_many(self, ids):
+        refs = [self.collection.document(i) for i in ids]
+        return {snap.id: {"id": snap.id, **snap.to_dict()} for snap in self.client.get_all(refs) if snap.exists}
+
+    def put_many(self, records):
+        records = list(records)
+        for start in range(0, len(records), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for r in records[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.set(self.collection.document(r["id"]), {k: v for k, v in r.items() if k != "id"})
+            batch.commit()
+
+    def list_ids(self, user_id):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = self.collection.where(filter=FieldFilter("user_id", "==", user_id))
+        docs = sorted(((d.get("updated") or 0, d.id) for d in query.select(["updated"]).stream()), reverse=True)
+        return [i for _, i in docs]
+
+    def delete(self, profile_id):
+        self.collection.document(profile_id).delete()
+
+
+class ProfileStore:
+    def __init__(self, backend, cache_size=1024, batch_size=50, flush_interval=2.0):
+        self.backend = backend
+        self.cache_size, self.batch_size, self.flush_interval = cache_size, batch_size, flush_interval
+        self._lru = OrderedDict()
+        self._pending = OrderedDict()   # id -> record awaiting commit
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self.hits = self.misses = self.commits = self.migrated = 0
+        atexit.register(self.close)
+
+    def _remember(self, profile):
+        self._lru[profile.profile_id] = profile
+        self._lru.move_to_end(profile.profile_id)
+        while len(self._lru) > self.cache_size: self._lru.popitem(last=False)
+
+    def put(self, profile):
+        profile = profile._replace(updated=time.time())
+        with self._lock:
+            self._remember(profile)
+            self._pending[profile.profile_id] = encode_profile(profile)
+            full = len(self._pending) >= self.batch_size
+            if not full: self._arm_timer()
+        if full: self.flush()
+        return profile
+
+    def _arm_timer(self):
+        # Caller holds self._lock
+        if self._timer is None and self.flush_interval is not None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Commits every pending write as one batch (the backend may split it further)."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                records = list(self._pending.values())
+            if not records: return 0
+            try:
+                self.backend.put_many(records)
+            except Exception:
+                # The records stay pending; try again after another interval.
+                with self._lock: self._arm_timer()
+                raise
+            with self._lock:
+                for r in records:
+                    if self._pending.get(r["id"]) is r: del self._pending[r["id"]]
+                self.commits += 1
+            return len(records)
+
+    def get_many(self, ids):
+        found, missing = {}, []
+        with self._lock:
+            for i in ids:
+                if i in self._lru:
+                    self._lru.move_to_end(i)
+                    found[i] = self._lru[i]
+                    self.hits += 1
+                elif i in self._pending:
+                    found[i] = decode_profile(self._pending[i])
+                    self.hits += 1
+                else:
+                    missing.append(i)
+                    self.misses += 1
+        if missing:
+            records = self.backend.get_many(missing)
+            loaded = {i: decode_profile(r) for i, r in records.items()}
+            # A chart that re-encodes differently was upgraded from an older encoding: write it back
+            upgraded = {i: encode_profile(p) for i, p in loaded.items()}
+            upgraded = {i: r for i, r in upgraded.items() if r["chart"] != bytes(records[i]["chart"])}
+            with self._lock:
+                for p in loaded.values(): self._remember(p)
+                for i, r in upgraded.items(): self._pending.setdefault(i, r)
+                self.migrated += len(upgraded)
+                if upgraded: self._arm_timer()
+            found.update(loaded)
+        return found
+
+    def get(self, profile_id):
+        return self.get_many([profile_id]).get(profile_id)
+
+    def list_ids(self, user_id):
+        """Ids of the user's profiles, most recently saved first (one backend query)."""
+        with self._lock:
+            pending = [r for r in self._pending.values() if r["user_id"] == user_id]
+        ids = [r["id"] for r in sorted(pending, key=lambda r: r["updated"], reverse=True)]
+        seen = set(ids)
+        return ids + [i for i in self.backend.list_ids(user_id) if i not in seen]
+
+    def list(self, user_id, ids=None):
+        """The user's profiles, most recently saved first. Pass `ids` from an earlier
+        list_ids to skip the backend query."""
+        if ids is None: ids = self.list_ids(user_id)
+        profiles = self.get_many(ids)
+        return [profiles[i] for i in ids if i in profiles]
+
+    def delete(self, profile_id):
+        with self._lock:
+            self._lru.pop(profile_id, None)
+            self._pending.pop(profile_id, None)
+        self.backend.delete(profile_id)
+
+    def close(self):
+        atexit.unregister(self.close)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "commits": self.commits,
+                    "migrated": self.migrated, "pending": len(self._pending), "cached": len(self._lru)}
+
+
+def open_default_store(firestore_client=None):
+    """Backend from $VEDIC_PROFILE_BACKEND (memory, sqlite or firestore). Defaults to Firestore
+    when a client is given, otherwise SQLite at $VEDIC_PROFILE_DB."""
+    kind = os.environ.get("VEDIC_PROFILE_BACKEND") or ("firestore" if firestore_client is not None else "sqlite")
+    if kind == "memory": backend = MemoryBackend()
+    elif kind == "firestore": backend = FirestoreBackend(firestore_client)
+    else: backend = SQLiteBackend(os.environ.get("VEDIC_PROFILE_DB", DEFAULT_PROFILE_DB))
+    return ProfileStore(backend)
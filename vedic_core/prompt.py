@@ -0,0 +1,207 @@
+"""Compact, deterministic chart encoding for AI prompts.
+
+serialize_chart renders a Chart, the running dasha chain and upcoming
+transits as short fixed-format lines (2-letter body codes, 3-letter signs,
+degrees to the minute) in priority order, dropping or trimming the least
+important sections until the estimated size fits the token budget.
+The same inputs always give byte-identical text, so it can be cached and
+compared. Compare it against the legacy prompt with
+
+    python -m vedic_core.prompt measure [--backend stub|gemini]
+"""
+import argparse
+import datetime
+import math
+import sys
+import time
+
+from .kp import KP_LORDS, KP_SIGN_LORDS
+from .model import BODIES, NAKSHATRAS, ZODIAC
+
+BODY_CODES = ["As", "Su", "Mo", "Ma", "Me", "Ju", "Ve", "Sa", "Ra", "Ke"]
+SIGN_CODES = [z[:3] for z in ZODIAC]
+_LORD_CODE = {name: BODY_CODES[BODIES.index(name)] for name in KP_LORDS}
+_STATUS_CODES = {"Own Sign": "own", "Exalted": "exa", "Debilitated": "deb", "Friendly": "fri", "Enemy": "ene", "Neutral": "neu"}
+DEFAULT_BUDGET = 700
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for this kind of text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _dms(deg):
+    d = deg % 30
+    return f"{int(d):02d}°{int(d % 1 * 60):02d}'"
+
+
+def _date(dt):
+    return dt.strftime("%Y-%m-%d")
+
+
+def _positions(chart):
+    from .chart import get_planet_status
+
+    lines = ["POS body sign deg house nak-pada star/sub dignity [R=retrograde C=combust]"]
+    for b in range(len(BODIES)):
+        _, star, sub = chart.kp_lords(b)
+        status = _STATUS_CODES.get(get_planet_status(BODIES[b], ZODIAC[chart.sign(b)]), "-")
+        flags = ("R" if chart.is_retrograde(b) and b < 8 else "") + ("C" if chart.is_combust(b) else "")
+        lines.append(f"{BODY_CODES[b]} {SIGN_CODES[chart.sign(b)]} {_dms(chart.lons[b])} H{chart.house(b)} "
+                     f"{NAKSHATRAS[chart.nakshatra(b)]}-{chart.pada(b)} {_LORD_CODE[star]}/{_LORD_CODE[sub]} {status}"
+                     + (f" {flags}" if flags else ""))
+    return "\n".join(lines)
+
+
+def _houses(chart):
+    occupants = {h: [] for h in range(1, 13)}
+    for b in range(1, len(BODIES)):
+        occupants[chart.house(b)].append(BODY_CODES[b])
+    parts = []
+    for h in range(1, 13):
+        sign = (chart.sign(0) + h - 1) % 12
+        lord = BODIES.index(KP_LORDS[KP_SIGN_LORDS[sign]])
+        parts.append(f"H{h} {SIGN_CODES[sign]} {BODY_CODES[lord]}@H{chart.house(lord)}"
+                     + (f" [{' '.join(occupants[h])}]" if occupants[h] else ""))
+    return "HOUSES sign lord@house [occupants]\n" + "; ".join(parts)
+
+
+def _ayanamsa_name(chart):
+    from .service import AYANAMSAS, ayanamsa_of
+
+    sid_mode = ayanamsa_of(chart.jd, chart.ayanamsa)
+    return next((name for name, mode in AYANAMSAS.items() if mode == sid_mode), "unknown")
+
+
+def _core(chart):
+    s = chart.summary()
+    return (f"CHART Lagna {s['Lagna']} | Moon {s['Rashi']} {s['Nakshatra']}-{s['Charan']} | "
+            f"Tithi {s['Tithi']} | Yoga {s['Yoga']} | Karana {s['Karan']} | Ayanamsa {s['Ayanamsa']} {_ayanamsa_name(chart)}\n"
+            f"DOSHA Mangalik {s['Mangalik']} | Kalsarpa {s['Kalsarpa']}")
+
+
+def _dasha(chain):
+    from .dasha import DASHA_LEVELS
+
+    if not chain: return ""
+    abbrev = {"Mahadasha": "MD", "Antardasha": "AD", "Pratyantardasha": "PD"}
+    return "DASHA " + " > ".join(
+        f"{abbrev.get(DASHA_LEVELS[p.level - 1], DASHA_LEVELS[p.level - 1])} {p.lord} {_date(p.start)}..{_date(p.end)}"
+        for p in chain)
+
+
+def _transit(event):
+    from .dasha import jd_to_datetime
+
+    when, body = _date(jd_to_datetime(event.jd)), BODY_CODES[BODIES.index(event.body)]
+    if event.kind == "station_retro": return f"{when} {body} R"
+    if event.kind == "station_direct": return f"{when} {body} D"
+    if event.kind == "conjunction": return f"{when} {body} conj natal {event.value}"
+    value = event.value if isinstance(event.value, str) else "-".join(map(str, event.value))
+    return f"{when} {body}{' (R)' if event.retrograde else ''}>{value[:3] if event.kind == 'sign' else value}"
+
+
+def _nakshatra_profile(chart):
+    s = chart.summary()
+    return (f"PROFILE Gana {s['Gana']} | Yoni {s['Yoni']} | Nadi {s['Nadi']} | Varna {s['Varna']} | "
+            f"Vashya {s['Vashya']} | Tatva {s['Tatva']} | Paya {s['Paya']}")
+
+
+def serialize_chart(chart, dasha_chain=(), transits=(), budget=DEFAULT_BUDGET):
+    """Dense text encoding of a chart for a prompt, within `budget` estimated tokens.
+
+    Sections in priority order: core facts, running dasha (MD > AD > PD), positions,
+    houses with lords, upcoming transits (trimmed from the far end to fit), then the
+    nakshatra profile. Core facts and dasha are always included."""
+    required = [_core(chart), _dasha(dasha_chain)]
+    optional = [_positions(chart), _houses(chart)]
+    sections = [s for s in required if s]
+    used = estimate_tokens("\n".join(sections))
+    for section in optional:
+        cost = estimate_tokens(section) + 1
+        if used + cost > budget: break
+        sections.append(section)
+        used += cost
+    else:
+        items = [_transit(e) for e in transits]
+        while items:
+            section = "TRANSITS " + "; ".join(items)
+            if used + estimate_tokens(section) + 1 <= budget: break
+            items.pop()
+        if items:
+            sections.append(section)
+            used += estimate_tokens(section) + 1
+        profile = _nakshatra_profile(chart)
+        if used + estimate_tokens(profile) + 1 <= budget:
+            sections.append(profile)
+    return "\n".join(sections)
+
+
+def legacy_context(chart, dasha_chain=(), transits=()):
+    """The chart part of the prompt as the app built it before serialize_chart."""
+    from .dasha import DASHA_LEVELS
+    from .transits import describe_event
+
+    return (f"Chart Summary: {chart.summary()}.\n"
+            f"Planetary Positions: {str(chart.planet_details())}.\n"
+            f"Upcoming Transits (next 12 months): {'; '.join(describe_event(e) for e in transits)}.\n"
+            f"Current Dasha: {' > '.join(f'{p.lord} {DASHA_LEVELS[p.level - 1]}' for p in dasha_chain)}.")
+
+
+def _time_to_first_token(backend, prompt):
+    t0 = time.perf_counter()
+    stream = backend.stream(prompt)
+    next(stream, None)
+    ttft = time.perf_counter() - t0
+    for _ in stream: pass
+    return ttft
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prompt size and latency tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("measure", help="legacy vs compact prompt for a sample chart")
+    m.add_argument("--date", default="1990-05-05T11:00", help="local birth time (ISO)")
+    m.add_argument("--lat", type=float, default=22.5726)
+    m.add_argument("--lon", type=float, default=88.3639)
+    m.add_argument("--tz", default="Asia/Kolkata")
+    m.add_argument("--budget", type=int, default=DEFAULT_BUDGET)
+    m.add_argument("--backend", choices=["none", "stub", "gemini"], default="none")
+    m.add_argument("--api-key", help="for --backend gemini")
+    args = parser.parse_args(argv)
+
+    import swisseph as swe
+
+    from .ai import GeminiBackend, StubBackend, topic_prompt
+    from .dasha import DashaTree, datetime_to_jd
+    from .model import Chart
+    from .timezones import julday_utc, local_to_utc
+    from .transits import transit_events
+
+    birth = datetime.datetime.fromisoformat(args.date)
+    jd = julday_utc(local_to_utc(birth, args.tz))
+    chart = Chart.from_ephemeris(jd, args.lat, args.lon, birth, sid_mode=swe.SIDM_LAHIRI)
+    now = datetime_to_jd(datetime.datetime.now(datetime.timezone.utc))
+    tree = DashaTree(jd, chart.lons[2])
+    chain = tree.at(now, 3) if tree.covers(now) else []
+    natal = {k: chart.lons[BODIES.index(k)] for k in ("Ascendant", "Moon", "Sun")}
+    transits = transit_events(now, now + 365, bodies=["Mars", "Jupiter", "Saturn", "Rahu", "Ketu"],
+                              kinds=("sign", "station", "conjunction"), natal_points=natal)
+
+    t0 = time.perf_counter()
+    compact = serialize_chart(chart, chain, transits, args.budget)
+    build_ms = (time.perf_counter() - t0) * 1e3
+    prompts = {"legacy": legacy_context(chart, chain, transits), "compact": compact}
+    backend = {"none": None, "stub": StubBackend(), "gemini": GeminiBackend(args.api_key) if args.backend == "gemini" else None}[args.backend]
+    for name, text in prompts.items():
+        line = f"{name:8s} {len(text):6d} chars  ~{estimate_tokens(text):5d} tokens"
+        if backend is not None:
+            line += f"  time to first token {_time_to_first_token(backend, topic_prompt(text, 'Career')) * 1e3:7.1f} ms"
+        print(line)
+    print(f"compact build {build_ms:.2f} ms (budget {args.budget} tokens)\n")
+    print(compact)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
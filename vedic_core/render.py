@@ -0,0 +1,47 @@
+"""Matplotlib rendering of North, South and East Indian charts.
+
+Kept as the optional raster backend (PNG export); the UI draws with the SVG
+renderer in vedic_core.svg, which shares its geometry via vedic_core.layout.
+"""
+import io
+
+from .layout import CENTER, LINES, chart_labels, normalize_style
+from .timing import timed
+
+
+@timed("render.draw_chart")
+def draw_chart(house_planets, asc_sign, style="North", title="Chart"):
+    # A bare Figure is not tracked by pyplot, so it is garbage collected once
+    # the caller drops it instead of accumulating across reruns.
+    from matplotlib.figure import Figure
+    import matplotlib.patches as patches
+
+    style = normalize_style(style)
+    fig = Figure(figsize=(3, 3))
+    ax = fig.subplots()
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title(title, fontsize=8, fontweight='bold', pad=2)
+
+    for (x0, y0), (x1, y1) in LINES[style]:
+        ax.plot([x0, x1], [y0, y1], 'k-', lw=1)
+
+    if CENTER[style]:
+        cx, cy, w, h = CENTER[style]
+        ax.add_patch(patches.Rectangle((cx, cy), w, h, color='white', zorder=10))
+        ax.text(cx + w / 2, cy + h / 2, "Rashi", ha='center', va='center', fontsize=8, fontweight='bold', zorder=11)
+
+    for x, y, text, kind in chart_labels(house_planets, asc_sign, style):
+        if kind == "sign":
+            ax.text(x, y, text, fontsize=6, color='red', ha='center')
+        else:
+            ax.text(x, y, text, fontsize=6, fontweight='bold', ha='center', va='center', zorder=12)
+    return fig
+
+
+def render_chart_png(house_planets, asc_sign, style="North", title="Chart", dpi=150):
+    """PNG bytes of draw_chart, for downloads and exports."""
+    fig = draw_chart(house_planets, asc_sign, style, title)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
@@ -0,0 +1,291 @@
+"""Thread-safe swisseph access and a process pool for chart requests.
+
+swisseph keeps the sidereal mode in global state, and Streamlit serves
+every session on its own thread. Builds compiled with thread-local storage
+(the default, and the one we ship with) keep that state per thread. There a
+set_sid_mode in one session never reaches the thread that renders the next
+request, and a fresh thread quietly computes in swisseph's default
+(Fagan/Bradley). Builds without TLS share the state, and there the danger is
+one thread's set_sid_mode landing between another thread's set_sid_mode and
+its calc_ut. Both cases are covered by running anything that depends on the
+mode inside `sidereal(mode)`. That scope holds SWE_LOCK (re-entrant) for the
+whole sequence and sets the mode on entry, which costs well under a
+microsecond. A nested scope restores the outer scope's mode when it exits.
+
+The lock makes threads take turns; it does not add cores. EphemerisService
+sends ChartRequests (time, place, ayanamsa, house system) to worker
+processes. Each worker is single-threaded and sets the mode per request.
+Submissions beyond `max_pending` wait for a slot, so a burst queues
+instead of piling onto the pool.
+
+    python -m vedic_core.service stress --threads 16 --requests 2000 --workers 4
+"""
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import swisseph as swe
+
+# Star-based modes (SIDM_TRUE_CITRA etc.) are left out: in Moshier mode swisseph fails
+# the sidereal true node for them.
+AYANAMSAS = {
+    "Lahiri": swe.SIDM_LAHIRI, "Raman": swe.SIDM_RAMAN, "Krishnamurti": swe.SIDM_KRISHNAMURTI,
+    "Yukteshwar": swe.SIDM_YUKTESHWAR, "Fagan/Bradley": swe.SIDM_FAGAN_BRADLEY,
+}
+HOUSE_SYSTEMS = {"Placidus": "P", "Koch": "K", "Porphyry": "O", "Equal": "E", "Whole Sign": "W"}
+
+SWE_LOCK = threading.RLock()
+_mode = None   # mode of the innermost open sidereal() scope
+
+
+def ayanamsa_id(ayanamsa):
+    """swisseph SIDM_* id for a name in AYANAMSAS or an id; ValueError otherwise."""
+    if isinstance(ayanamsa, str):
+        try: return AYANAMSAS[ayanamsa]
+        except KeyError: raise ValueError(f"unknown ayanamsa {ayanamsa!r}; expected one of {list(AYANAMSAS)}") from None
+    if int(ayanamsa) not in AYANAMSAS.values():
+        raise ValueError(f"unsupported ayanamsa id {ayanamsa!r}")
+    return int(ayanamsa)
+
+
+def house_system_code(house_system):
+    """One-letter swisseph house code for a name in HOUSE_SYSTEMS or a code; ValueError otherwise."""
+    if isinstance(house_system, bytes): house_system = house_system.decode()
+    code = HOUSE_SYSTEMS.get(house_system, house_system)
+    if code not in HOUSE_SYSTEMS.values():
+        raise ValueError(f"unknown house system {house_system!r}; expected one of {list(HOUSE_SYSTEMS)}")
+    return code
+
+
+@contextmanager
+def sidereal(sid_mode=None):
+    """Holds SWE_LOCK with swisseph in `sid_mode` (None keeps the current mode)."""
+    global _mode
+    with SWE_LOCK:
+        outer = _mode
+        if sid_mode is not None:
+            swe.set_sid_mode(sid_mode)
+            _mode = sid_mode
+        try:
+            yield
+        finally:
+            if outer is not None and outer != _mode: swe.set_sid_mode(outer)
+            _mode = outer
+
+
+def ayanamsa_of(jd, value):
+    """The AYANAMSAS id whose ayanamsa at `jd` is `value` (e.g. a Chart's), or None.
+    Matches within 0.01°, so both true (with nutation) and mean values are recognised."""
+    best, best_gap = None, 0.01
+    for sid_mode in AYANAMSAS.values():
+        with sidereal(sid_mode):
+            gap = abs(swe.get_ayanamsa_ex_ut(jd, 0)[1] - value)
+        if gap < best_gap: best, best_gap = sid_mode, gap
+    return best
+
+
+# birth_dt is the naive local datetime, as Chart.from_ephemeris takes it. A plain namedtuple
+# rather than typing.NamedTuple: typing alone would cost this module its import budget.
+ChartRequest = namedtuple("ChartRequest", "jd lat lon birth_dt ayanamsa house_system",
+                          defaults=(swe.SIDM_LAHIRI, "P"))
+
+
+def compute_chart(request):
+    """The Chart for a request, computed in this process under the swisseph lock."""
+    from .model import Chart
+
+    return Chart.from_ephemeris(request.jd, request.lat, request.lon, request.birth_dt,
+                                sid_mode=ayanamsa_id(request.ayanamsa),
+                                house_system=house_system_code(request.house_system))
+
+
+def _compute_blob(request):
+    return compute_chart(request).to_bytes()
+
+
+class EphemerisService:
+    """Chart requests on a process pool (created on first use), at most `max_pending`
+    in flight. max_workers=0 computes in the calling thread instead, still under the lock."""
+
+    def __init__(self, max_workers=None, max_pending=256):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.submitted = self.completed = self.queued = self.in_flight = self.peak_in_flight = 0
+
+    def _pool(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def submit(self, request, timeout=None):
+        """Future of the Chart's bytes. Waits for a slot when max_pending requests are in
+        flight; raises TimeoutError if none frees up within `timeout` seconds."""
+        from concurrent.futures import Future
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock: self.queued += 1
+            if not self._slots.acquire(timeout=timeout):
+                raise TimeoutError(f"{self.max_pending} chart requests already in flight")
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if self.max_workers == 0:
+            fut = Future()
+            try: fut.set_result(_compute_blob(request))
+            except Exception as e: fut.set_exception(e)
+        else:
+            try: fut = self._pool().submit(_compute_blob, request)
+            except BaseException:
+                self._release(None)
+                raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def _release(self, _fut):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def chart(self, request, timeout=None):
+        """The Chart for a request, blocking until it is computed."""
+        from .model import Chart
+
+        return Chart.from_bytes(self.submit(request, timeout).result())
+
+    def map(self, requests):
+        """Charts for many requests, in order, keeping at most max_pending in flight."""
+        from collections import deque
+
+        from .model import Chart
+
+        pending = deque()
+        for request in requests:
+            if len(pending) >= self.max_pending:
+                yield Chart.from_bytes(pending.popleft().result())
+            pending.append(self.submit(request))
+        while pending:
+            yield Chart.from_bytes(pending.popleft().result())
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.max_workers, "submitted": self.submitted, "completed": self.completed,
+                    "in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight, "queued": self.queued}
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def default_service():
+    """Process-wide service; $VEDIC_EPHEMERIS_WORKERS sets the pool size (0 = in-thread)."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            workers = os.environ.get("VEDIC_EPHEMERIS_WORKERS")
+            _default_service = EphemerisService(None if workers is None else int(workers))
+        return _default_service
+
+
+# --- stress test ---
+def _random_requests(n, seed):
+    import datetime
+    import random
+
+    rng = random.Random(seed)
+    modes, houses = list(AYANAMSAS.values()), list(HOUSE_SYSTEMS.values())
+    out = []
+    for _ in range(n):
+        dt = datetime.datetime(1920, 1, 1) + datetime.timedelta(minutes=rng.randrange(100 * 525960))
+        jd = swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60)
+        out.append(ChartRequest(jd, rng.uniform(-60, 65), rng.uniform(-180, 180), dt,
+                                rng.choice(modes), rng.choice(houses)))
+    return out
+
+
+def stress(threads=16, requests=2000, workers=None, seed=0, max_pending=64, progress=None):
+    """Many threads submit requests with mixed ayanamsas and house systems, half through
+    the process pool and half computed in-thread under the lock. Meanwhile a
+    saboteur thread keeps calling swe.set_sid_mode inside sidereal(). Every result
+    is compared with a reference computed serially beforehand on the calling thread.
+    On a TLS build this catches any path that misses a sidereal() scope, since the
+    pool threads start in swisseph's default mode. Returns a report dict;
+    "mismatches" must be 0."""
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+
+    reqs = _random_requests(requests, seed)
+    refs = [_compute_blob(r) for r in reqs]
+    service = EphemerisService(workers, max_pending)
+    local = EphemerisService(0, max_pending)
+    stop = threading.Event()
+
+    def saboteur():
+        modes = list(AYANAMSAS.values())
+        while not stop.is_set():
+            with sidereal(random.choice(modes)):
+                swe.calc_ut(2451545.0, swe.MOON, swe.FLG_SIDEREAL)
+            time.sleep(0)
+
+    def one(i):
+        blob = (service if i % 2 else local).submit(reqs[i]).result()
+        return i, blob == refs[i]
+
+    mismatches = []
+    t0 = time.perf_counter()
+    noise = threading.Thread(target=saboteur, daemon=True)
+    noise.start()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for n, (i, ok) in enumerate(pool.map(one, range(len(reqs))), 1):
+                if not ok: mismatches.append(i)
+                if progress and n % 200 == 0: progress(n)
+    finally:
+        stop.set()
+        noise.join()
+        service.close()
+    seconds = time.perf_counter() - t0
+    return {"requests": len(reqs), "threads": threads, "seconds": seconds, "rate": len(reqs) / seconds,
+            "mismatches": len(mismatches), "first_mismatches": mismatches[:10],
+            "pool": service.stats(), "in_thread": local.stats()}
+
+
+def main(argv=None):
+    import argparse  # CLI only; model imports this module on every worker start
+
+    parser = argparse.ArgumentParser(description="Ephemeris service tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("stress", help="concurrent mixed-ayanamsa requests checked against serial results")
+    s.add_argument("--threads", type=int, default=16)
+    s.add_argument("--requests", type=int, default=2000)
+    s.add_argument("--workers", type=int, default=None, help="pool processes (default: one per core)")
+    s.add_argument("--max-pending", type=int, default=64)
+    s.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = stress(args.threads, args.requests, args.workers, args.seed, args.max_pending,
+                    progress=lambda n: print(f"\r{n} done", end="", file=sys.stderr, flush=True))
+    print(f"\n{report['requests']} requests on {report['threads']} threads in {report['seconds']:.1f} s "
+          f"({report['rate']:.0f}/s); mismatches: {report['mismatches']}")
+    print(f"pool {report['pool']}\nin-thread {report['in_thread']}")
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
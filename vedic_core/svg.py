@@ -0,0 +1,82 @@
+"""Template-based SVG rendering of North, South and East Indian charts.
+
+Produces the same layout as render.draw_chart (both read vedic_core.layout)
+as a self-contained <svg> string, with no plotting library involved. Output
+is memoized on (house_planets, asc_sign, style, title).
+"""
+from functools import lru_cache
+from html import escape
+
+from .layout import CENTER, EXTENT, LINES, chart_labels, normalize_style
+from .timing import stage
+
+SIZE = 300        # drawing area in px (square)
+TITLE_H = 22      # band above the chart for the title
+PAD = 6
+FONT = "DejaVu Sans, Arial, sans-serif"
+PLANET_PT = 9
+SIGN_PT = 9
+LINE_H = 1.15     # line height in ems for multi-line labels
+
+
+def _freeze(house_planets):
+    return tuple((h, tuple(house_planets.get(h, ()))) for h in range(1, 13))
+
+
+def render_chart_svg(house_planets, asc_sign, style="North", title="Chart"):
+    """SVG markup for a chart; accepts the same arguments as draw_chart."""
+    with stage("render.svg"):
+        return _render(_freeze(house_planets), int(asc_sign), normalize_style(style), str(title))
+
+
+@lru_cache(maxsize=2048)
+def _render(frozen, asc_sign, style, title):
+    house_planets = dict(frozen)
+    scale = SIZE / EXTENT[style]
+    width, height = SIZE + 2 * PAD, SIZE + 2 * PAD + TITLE_H
+
+    def px(x, y):
+        return PAD + x * scale, PAD + TITLE_H + (EXTENT[style] - y) * scale
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'font-family="{FONT}" style="width:100%;height:auto;background:white">',
+        f'<text x="{width / 2:g}" y="{PAD + TITLE_H / 2 + 4:g}" font-size="11" font-weight="bold" '
+        f'text-anchor="middle">{escape(title)}</text>',
+        '<g stroke="black" stroke-width="1" stroke-linecap="square">',
+    ]
+    for p0, p1 in LINES[style]:
+        (x0, y0), (x1, y1) = px(*p0), px(*p1)
+        out.append(f'<line x1="{x0:.1f}" y1="{y0:.1f}" x2="{x1:.1f}" y2="{y1:.1f}"/>')
+    out.append('</g>')
+
+    if CENTER[style]:
+        cx, cy, w, h = CENTER[style]
+        x0, y0 = px(cx, cy + h)
+        out.append(f'<rect x="{x0 + 0.5:.1f}" y="{y0 + 0.5:.1f}" width="{w * scale - 1:.1f}" '
+                   f'height="{h * scale - 1:.1f}" fill="white"/>')
+        x, y = px(cx + w / 2, cy + h / 2)
+        out.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="11" font-weight="bold" '
+                   f'text-anchor="middle" dominant-baseline="central">Rashi</text>')
+
+    for x, y, text, kind in chart_labels(house_planets, asc_sign, style):
+        sx, sy = px(x, y)
+        if kind == "sign":
+            # matplotlib's default va='baseline' puts the baseline at (x, y)
+            out.append(f'<text x="{sx:.1f}" y="{sy:.1f}" font-size="{SIGN_PT}" fill="red" '
+                       f'text-anchor="middle">{escape(text)}</text>')
+            continue
+        lines = text.split("\n")
+        # Vertically centre the block on (x, y) like va='center'
+        first_dy = -(len(lines) - 1) * LINE_H / 2
+        spans = "".join(
+            f'<tspan x="{sx:.1f}" dy="{(first_dy if i == 0 else LINE_H):.3f}em">{escape(line)}</tspan>'
+            for i, line in enumerate(lines))
+        out.append(f'<text y="{sy:.1f}" font-size="{PLANET_PT}" font-weight="bold" '
+                   f'text-anchor="middle" dominant-baseline="central">{spans}</text>')
+    out.append('</svg>')
+    return "".join(out)
+
+
+def cache_info():
+    return _render.cache_info()
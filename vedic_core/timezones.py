@@ -0,0 +1,216 @@
+"""Offline time zone resolution and historical local-time -> UT conversion.
+
+Coordinates are mapped to an IANA zone through a spatial index built from
+the timezone-boundary-builder GeoJSON release:
+
+    python -m vedic_core.timezones build combined.json -o timezones.npz
+    python -m vedic_core.timezones lookup 22.57 88.36 "1940-05-01 10:30"
+
+The index is a 1-degree grid of candidate zones (from polygon bounding
+boxes) plus each zone's polygon edges bucketed into latitude bands, so a
+point-in-polygon test only looks at the handful of edges its horizontal ray
+can cross. Offsets and DST come from the tz database via zoneinfo, which
+carries the historical rules (e.g. India's pre-1947 local times and
+wartime +06:30).
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import swisseph as swe
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "vedic_core", "timezones.npz")
+
+CELL_DEG = 1.0
+BAND_DEG = 0.25
+_N_BANDS = int(180 / BAND_DEG)
+_N_LAT, _N_LON = int(180 / CELL_DEG), int(360 / CELL_DEG)
+
+
+def nautical_zone(lon):
+    """Etc/GMT zone for open sea (note the POSIX sign inversion: Etc/GMT-5 is UTC+5)."""
+    hours = int(round(lon / 15))
+    return "Etc/GMT" if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+
+def _band(lat):
+    return min(max(int((lat + 90) / BAND_DEG), 0), _N_BANDS - 1)
+
+
+class TimezoneIndex:
+    def __init__(self, names, edges, edge_idx, zb_ptr, cell_ptr, cell_zones):
+        self.names = list(names)
+        self.edges = edges            # float64 (E, 4): x0, y0, x1, y1
+        self.edge_idx = edge_idx      # int32, edges grouped by (zone, band)
+        self.zb_ptr = zb_ptr          # int32 (Z * bands + 1) offsets into edge_idx
+        self.cell_ptr = cell_ptr      # int32 (cells + 1) offsets into cell_zones
+        self.cell_zones = cell_zones  # int16 candidate zones per grid cell
+        self._lookup = lru_cache(maxsize=65536)(self._lookup_uncached)
+
+    @classmethod
+    def from_geojson(cls, path):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        names, edge_chunks, edge_zone, cell_sets = [], [], [], {}
+        for feature in features:
+            geom = feature["geometry"]
+            polys = [geom["coordinates"]] if geom["type"] == "Polygon" else geom["coordinates"]
+            z = len(names)
+            names.append(feature["properties"]["tzid"])
+            for poly in polys:
+                outer = np.asarray(poly[0], dtype=float)
+                lon0, lat0 = outer.min(axis=0)
+                lon1, lat1 = outer.max(axis=0)
+                for i in range(int((lat0 + 90) // CELL_DEG), min(int((lat1 + 90) // CELL_DEG), _N_LAT - 1) + 1):
+                    for j in range(int((lon0 + 180) // CELL_DEG), min(int((lon1 + 180) // CELL_DEG), _N_LON - 1) + 1):
+                        cell_sets.setdefault(i * _N_LON + j, set()).add(z)
+                for ring in poly:
+                    r = np.asarray(ring, dtype=float)
+                    edge_chunks.append(np.hstack([r[:-1], r[1:]]))
+                    edge_zone.append(np.full(len(r) - 1, z, dtype=np.int32))
+        edges = np.vstack(edge_chunks)
+        zones = np.concatenate(edge_zone)
+
+        # Bucket each edge into every latitude band its y-range touches.
+        b0 = np.clip(((np.minimum(edges[:, 1], edges[:, 3]) + 90) / BAND_DEG).astype(int), 0, _N_BANDS - 1)
+        b1 = np.clip(((np.maximum(edges[:, 1], edges[:, 3]) + 90) / BAND_DEG).astype(int), 0, _N_BANDS - 1)
+        counts = b1 - b0 + 1
+        rep = np.repeat(np.arange(len(edges)), counts)
+        bands = np.repeat(b0, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        keys = zones[rep].astype(np.int64) * _N_BANDS + bands
+        order = np.argsort(keys, kind="stable")
+        edge_idx = rep[order].astype(np.int32)
+        zb_ptr = np.searchsorted(keys[order], np.arange(len(names) * _N_BANDS + 1)).astype(np.int32)
+
+        cell_ptr = np.zeros(_N_LAT * _N_LON + 1, dtype=np.int32)
+        cell_zones = []
+        for c in range(_N_LAT * _N_LON):
+            zs = sorted(cell_sets.get(c, ()))
+            cell_zones.extend(zs)
+            cell_ptr[c + 1] = len(cell_zones)
+        return cls(names, edges, edge_idx, zb_ptr, cell_ptr, np.asarray(cell_zones, dtype=np.int16))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, names=np.asarray(self.names), edges=self.edges, edge_idx=self.edge_idx,
+                            zb_ptr=self.zb_ptr, cell_ptr=self.cell_ptr, cell_zones=self.cell_zones)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls([str(n) for n in z["names"]], z["edges"], z["edge_idx"], z["zb_ptr"],
+                       z["cell_ptr"], z["cell_zones"])
+
+    def _contains(self, zone, lat, lon):
+        k = zone * _N_BANDS + _band(lat)
+        idx = self.edge_idx[self.zb_ptr[k]:self.zb_ptr[k + 1]]
+        if len(idx) == 0: return False
+        x0, y0, x1, y1 = self.edges[idx].T
+        straddle = (y0 > lat) != (y1 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x0 + (lat - y0) * (x1 - x0) / (y1 - y0)
+        return bool(np.count_nonzero(straddle & (lon < x_cross)) % 2)
+
+    def _lookup_uncached(self, lat, lon):
+        i = min(max(int((lat + 90) // CELL_DEG), 0), _N_LAT - 1)
+        j = min(max(int((lon + 180) // CELL_DEG), 0), _N_LON - 1)
+        c = i * _N_LON + j
+        for z in self.cell_zones[self.cell_ptr[c]:self.cell_ptr[c + 1]]:
+            if self._contains(int(z), lat, lon):
+                return self.names[z]
+        return None
+
+    def timezone_at(self, lat, lon):
+        """IANA zone containing (lat, lon), or None over open sea."""
+        return self._lookup(round(float(lat), 5), round(float(lon), 5))
+
+
+@lru_cache(maxsize=None)
+def _zone(name):
+    return ZoneInfo(name)
+
+
+def local_to_utc(local_dt, tz_name, fold=0):
+    """Naive local wall time -> naive UTC, applying the zone's historical offset
+    and DST. `fold` picks the earlier (0) or later (1) of repeated times."""
+    aware = local_dt.replace(tzinfo=_zone(tz_name), fold=fold)
+    return aware.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def utc_offset(local_dt, tz_name, fold=0):
+    return local_dt.replace(tzinfo=_zone(tz_name), fold=fold).utcoffset()
+
+
+def julday_utc(utc_dt):
+    return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
+                      utc_dt.hour + utc_dt.minute / 60.0 + (utc_dt.second + utc_dt.microsecond / 1e6) / 3600.0)
+
+
+class TimezoneResolver:
+    """Chooses the zone for a birth place: the polygon index when available,
+    then a zone hint from the geocoder/gazetteer, then a nautical zone."""
+
+    def __init__(self, index=None):
+        self.index = index
+
+    def timezone_at(self, lat, lon, hint=None):
+        if self.index is not None:
+            tz = self.index.timezone_at(lat, lon)
+            if tz: return tz
+        return hint or nautical_zone(lon)
+
+    def birth_jd(self, local_dt, lat, lon, hint=None):
+        """(jd_ut, utc_dt, tz_name) for a local birth time at a place."""
+        tz = self.timezone_at(lat, lon, hint)
+        utc_dt = local_to_utc(local_dt, tz)
+        return julday_utc(utc_dt), utc_dt, tz
+
+    def birth_jd_many(self, local_dts, lats, lons, hints=None):
+        """Batch birth_jd for bulk imports: returns (jd array, list of tz names)."""
+        hints = hints if hints is not None else [None] * len(local_dts)
+        tzs = [self.timezone_at(la, lo, h) for la, lo, h in zip(lats, lons, hints)]
+        jds = np.fromiter((julday_utc(local_to_utc(dt, tz)) for dt, tz in zip(local_dts, tzs)),
+                          dtype=float, count=len(tzs))
+        return jds, tzs
+
+
+def open_default_resolver():
+    """Resolver over $VEDIC_TZ_INDEX (or ~/.cache/vedic_core/timezones.npz) when present."""
+    path = os.environ.get("VEDIC_TZ_INDEX", DEFAULT_INDEX_PATH)
+    return TimezoneResolver(TimezoneIndex.load(path) if os.path.exists(path) else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline time zone tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="build an index from timezone-boundary-builder GeoJSON")
+    b.add_argument("geojson")
+    b.add_argument("-o", "--output", default=os.environ.get("VEDIC_TZ_INDEX", DEFAULT_INDEX_PATH))
+    l = sub.add_parser("lookup", help="resolve a point (and optionally a local time)")
+    l.add_argument("lat", type=float)
+    l.add_argument("lon", type=float)
+    l.add_argument("local_time", nargs="?", help='e.g. "1940-05-01 10:30"')
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        index = TimezoneIndex.from_geojson(args.geojson)
+        index.save(args.output)
+        print(f"indexed {len(index.names)} zones, {len(index.edges)} edges -> {args.output}")
+        return 0
+    resolver = open_default_resolver()
+    tz = resolver.timezone_at(args.lat, args.lon)
+    print(tz)
+    if args.local_time:
+        local = datetime.datetime.fromisoformat(args.local_time)
+        jd, utc_dt, _ = resolver.birth_jd(local, args.lat, args.lon)
+        print(f"UTC {utc_dt.isoformat()}  offset {utc_offset(local, tz)}  JD {jd:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
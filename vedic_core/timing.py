@@ -0,0 +1,171 @@
+"""Opt-in per-stage timing with latency histograms.
+
+Code marks its stages with `stage(name)` (a context manager) or `@timed(name)`.
+While timing is off, which is the default, both return a shared no-op, so
+the hooks cost a function call and nothing else. Timing is turned on with
+VEDIC_TIMING=1 or `enable()`. Each observation then goes into a histogram
+per stage, with fixed buckets (Prometheus style) plus count, sum and max.
+
+    VEDIC_TIMING=1 VEDIC_TIMING_FILE=/tmp/stages.prom streamlit run app.py
+
+With VEDIC_TIMING_FILE set, the registry is written at exit: as Prometheus
+text if the name ends in .prom or .txt, otherwise as JSON. `to_json()` and
+`to_prometheus()` give the same data on demand.
+"""
+import atexit
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Upper bounds in seconds; the last bucket (+Inf) is implicit.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Counts per bucket plus count, sum and max; not locked (the registry locks)."""
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count, self.sum, self.max = 0, 0.0, 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max: self.max = seconds
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket that holds the q-th observation."""
+        if not self.count: return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def snapshot(self):
+        cumulative, total = {}, 0
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            total += n
+            cumulative["+Inf" if bound == float("inf") else repr(bound)] = total
+        return {
+            "count": self.count, "sum": self.sum, "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99),
+            "max": self.max, "buckets": cumulative,
+        }
+
+
+class TimingRegistry:
+    """Thread-safe map of stage name -> LatencyHistogram."""
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self._hists = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None: hist = self._hists[name] = LatencyHistogram(self.bounds)
+            hist.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._hists.items())}
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+
+    def to_json(self, indent=None):
+        import json  # only when dumping; keeps the hooks' import cheap for svg/model
+
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, metric="vedic_stage_seconds"):
+        lines = [f"# HELP {metric} Wall-clock time per vedic_core stage.", f"# TYPE {metric} histogram"]
+        for name, snap in self.snapshot().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for le, n in snap["buckets"].items():
+                lines.append(f'{metric}_bucket{{stage="{label}",le="{le}"}} {n}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {snap["sum"]!r}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {snap["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Writes Prometheus text (.prom/.txt) or JSON, replacing the file atomically."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json(indent=2)
+        with open(path + ".tmp", "w", encoding="utf-8") as f: f.write(text)
+        os.replace(path + ".tmp", path)
+
+
+REGISTRY = TimingRegistry()
+_enabled = os.environ.get("VEDIC_TIMING", "") not in ("", "0")
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+class _Stage:
+    __slots__ = ("name", "registry", "t0")
+
+    def __init__(self, name, registry):
+        self.name, self.registry = name, registry
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name, registry=None):
+    """Context manager that records its wall-clock time under `name` while timing is on."""
+    if not _enabled: return _NO_STAGE
+    return _Stage(name, registry or REGISTRY)
+
+
+def timed(name):
+    """Decorator form of stage(); the enabled check happens per call."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled: return fn(*args, **kwargs)
+            with _Stage(name, REGISTRY):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def observe(name, seconds):
+    """Records an externally measured duration (e.g. time to first streamed chunk)."""
+    if _enabled: REGISTRY.observe(name, seconds)
+
+
+if os.environ.get("VEDIC_TIMING_FILE"):
+    atexit.register(lambda: REGISTRY.dump(os.environ["VEDIC_TIMING_FILE"]))
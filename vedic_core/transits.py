@@ -0,0 +1,218 @@
+"""Transit event search: exact times of ingresses, stations and natal contacts.
+
+Instead of sampling the ephemeris on a fixed grid, each body is advanced in
+steps sized from how far it is from the nearest boundary and how fast it can
+possibly move (or, for stations, how fast its speed can change), so no event
+can be stepped over. Once a step brackets an event, the exact time is found
+with a bracketed Newton iteration (the ephemeris supplies the derivative) or,
+for stations, a Brent-style false-position/bisection hybrid.
+
+The ephemeris is any callable (body, jd) -> (sidereal_longitude, speed); the
+default calls swisseph through swiss_eph, which takes the swisseph lock per
+call so other threads can use other ayanamsas in between.
+"""
+from bisect import bisect_right
+from typing import NamedTuple
+
+import swisseph as swe
+
+from .kp import KP_LORDS, kp_table
+
+GRAHAS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+ZODIAC = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+NAKSHATRAS = ["Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"]
+
+_PIDS = {"Sun": 0, "Moon": 1, "Mars": 4, "Mercury": 2, "Jupiter": 5, "Venus": 3, "Saturn": 6, "Rahu": 11, "Ketu": 11}
+# Upper bounds on |speed| (deg/day) and |acceleration| (deg/day^2) over 1900-2100, with margin.
+MAX_SPEED = {"Sun": 1.05, "Moon": 15.6, "Mars": 0.82, "Mercury": 2.25, "Jupiter": 0.25, "Venus": 1.3, "Saturn": 0.14, "Rahu": 0.27, "Ketu": 0.27}
+MAX_ACCEL = {"Mars": 0.03, "Mercury": 0.21, "Jupiter": 0.085, "Venus": 0.045, "Saturn": 0.115}
+DIRECT_ONLY = {"Sun", "Moon"}
+# Smallest step (days) taken when hovering near a boundary or a station.
+MIN_STEP = {"Moon": 0.01, "Sun": 0.05, "Mercury": 0.1, "Venus": 0.1, "Mars": 0.2}
+STATION_BODIES = ["Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+TIME_TOL = 1e-6  # days (~0.09 s)
+
+
+class TransitEvent(NamedTuple):
+    jd: float
+    body: str
+    kind: str        # sign | nakshatra | pada | kp_sub | kp_sub_sub | conjunction | station_retro | station_direct
+    value: object    # entered sign / nakshatra / (nakshatra, pada) / sub lord / natal point name
+    lon: float
+    retrograde: bool
+
+
+def swiss_lon_speed(body, jd):
+    """Raw swisseph lookup in the calling thread's current sidereal mode; call it inside
+    service.sidereal(), or use swiss_eph(sid_mode)."""
+    pos = swe.calc_ut(jd, _PIDS[body], swe.FLG_SIDEREAL | swe.FLG_SPEED)[0]
+    lon = (pos[0] + 180) % 360 if body == "Ketu" else pos[0]
+    return lon, pos[3]
+
+
+def swiss_eph(sid_mode=swe.SIDM_LAHIRI):
+    """swiss_lon_speed in `sid_mode`, safe to interleave with other threads' swisseph use."""
+    from .service import sidereal
+
+    def eph(body, jd):
+        with sidereal(sid_mode): return swiss_lon_speed(body, jd)
+    return eph
+
+
+def _wrap180(x):
+    return (x + 180) % 360 - 180
+
+
+def _refine_crossing(eph, body, target, t0, t1, f0, f1):
+    """Time in [t0, t1] where wrap180(lon - target) changes sign; Newton steps kept inside the bracket."""
+    t = t0 - f0 * (t1 - t0) / (f1 - f0)
+    for _ in range(50):
+        lon, v = eph(body, t)
+        f = _wrap180(lon - target)
+        if (f < 0) == (f0 < 0): t0, f0 = t, f
+        else: t1, f1 = t, f
+        if t1 - t0 < TIME_TOL: break
+        t_new = t - f / v if v else None
+        if t_new is None or not (t0 < t_new < t1): t_new = 0.5 * (t0 + t1)
+        if abs(t_new - t) < TIME_TOL: return t_new
+        t = t_new
+    return 0.5 * (t0 + t1)
+
+
+def find_crossings(body, jd0, jd1, boundaries, eph=None, sid_mode=swe.SIDM_LAHIRI):
+    """Yields (jd, boundary_index, direction) each time `body` crosses one of the sorted
+    `boundaries` (degrees in [0, 360)); direction is +1 moving forward, -1 retrograde.
+    Without `eph`, swisseph is used in `sid_mode`."""
+    if eph is None: eph = swiss_eph(sid_mode)
+    n = len(boundaries)
+    if n == 1:
+        # A lone boundary never changes the segment index; pair it with its opposite point.
+        b0 = boundaries[0]
+        pair = sorted([b0, (b0 + 180) % 360])
+        for jd, b, step in find_crossings(body, jd0, jd1, pair, eph):
+            if pair[b] == b0: yield jd, 0, step
+        return
+    vmax, hmin = MAX_SPEED[body], MIN_STEP.get(body, 0.5)
+    direct_only = body in DIRECT_ONLY
+
+    def seg(lon): return (bisect_right(boundaries, lon) - 1) % n
+
+    t = jd0
+    lon, v = eph(body, t)
+    k = seg(lon)
+    while t < jd1:
+        d_fwd = (boundaries[(k + 1) % n] - lon) % 360 or 360
+        d_back = (lon - boundaries[k]) % 360
+        if direct_only and v > 0:
+            dt = d_fwd / v            # Newton prediction; overshoot is handled below
+        else:
+            dt = min(d_fwd, d_back) / vmax   # cannot reach any boundary before then
+        t_new = min(t + max(dt, hmin), jd1)
+        lon_new, v_new = eph(body, t_new)
+        k_new = seg(lon_new)
+        if k_new != k:
+            step = 1 if _wrap180(lon_new - lon) > 0 else -1
+            crossed, j = [], k
+            while j != k_new:
+                b = (j + 1) % n if step > 0 else j
+                crossed.append(b)
+                j = (j + step) % n
+            for b in crossed:
+                target = boundaries[b]
+                f0, f1 = _wrap180(lon - target), _wrap180(lon_new - target)
+                if (f0 < 0) == (f1 < 0): continue
+                yield _refine_crossing(eph, body, target, t, t_new, f0, f1), b, step
+        t, lon, v, k = t_new, lon_new, v_new, k_new
+
+
+def _refine_station(eph, body, t0, t1, v0, v1):
+    """Zero of speed in [t0, t1] via Illinois false position with a bisection fallback."""
+    side = 0
+    for _ in range(60):
+        t = t1 - v1 * (t1 - t0) / (v1 - v0)
+        if not (t0 < t < t1): t = 0.5 * (t0 + t1)
+        v = eph(body, t)[1]
+        if (v < 0) == (v1 < 0):
+            t1, v1 = t, v
+            if side == -1: v0 *= 0.5
+            side = -1
+        else:
+            t0, v0 = t, v
+            if side == 1: v1 *= 0.5
+            side = 1
+        if t1 - t0 < TIME_TOL or v == 0: break
+    return t
+
+
+def find_stations(body, jd0, jd1, eph=None, sid_mode=swe.SIDM_LAHIRI):
+    """Yields (jd, kind) for retrograde/direct stations of a planet in [jd0, jd1].
+    Without `eph`, swisseph is used in `sid_mode`."""
+    if eph is None: eph = swiss_eph(sid_mode)
+    amax, hmin = MAX_ACCEL[body], MIN_STEP.get(body, 0.5)
+    t = jd0
+    v = eph(body, t)[1]
+    while t < jd1:
+        t_new = min(t + max(abs(v) / amax, hmin), jd1)
+        v_new = eph(body, t_new)[1]
+        if (v < 0) != (v_new < 0):
+            yield _refine_station(eph, body, t, t_new, v, v_new), ("station_retro" if v > 0 else "station_direct")
+        t, v = t_new, v_new
+
+
+def _uniform(divisions):
+    return [i * 360 / divisions for i in range(divisions)]
+
+
+def transit_events(jd0, jd1, bodies=GRAHAS, kinds=("sign", "nakshatra", "station"),
+                   natal_points=None, eph=None, sid_mode=swe.SIDM_LAHIRI):
+    """All requested events in [jd0, jd1], sorted by time.
+
+    kinds: any of "sign", "nakshatra", "pada", "kp_sub", "kp_sub_sub", "station", and
+    "conjunction" (needs natal_points, e.g. get_planet_positions' raw_bodies).
+
+    Cost is set by the ephemeris: about five ephemeris calls per event, and many
+    more for slow planets lingering near a station. A 100-year scan of all nine
+    grahas for the default kinds finds about 70,000 events. That takes about 5-6 s
+    with the Chebyshev store (roughly 10 us per call) and about 45 s with swisseph.
+    It is not sub-second. The Moon's ingresses make up three quarters of the
+    events, so long ranges should leave the Moon out or narrow `kinds`. A year of
+    slow-planet events, as the app asks for, takes about 0.2 s.
+    """
+    if eph is None: eph = swiss_eph(sid_mode)
+    kp_levels = {kind: kp_table(kind[3:]) for kind in ("kp_sub", "kp_sub_sub") if kind in kinds}
+    grids = {
+        "sign": (_uniform(12), lambda b, s: ZODIAC[b if s > 0 else (b - 1) % 12]),
+        "nakshatra": (_uniform(27), lambda b, s: NAKSHATRAS[b if s > 0 else (b - 1) % 27]),
+        "pada": (_uniform(108), lambda b, s: (lambda p: (NAKSHATRAS[p // 4], p % 4 + 1))(b if s > 0 else (b - 1) % 108)),
+    }
+    for kind, (starts, rows) in kp_levels.items():
+        grids[kind] = (starts, lambda b, s, rows=rows: KP_LORDS[rows[b if s > 0 else (b - 1) % len(rows)][-1]])
+    if "conjunction" in kinds and natal_points:
+        names = sorted(natal_points, key=natal_points.get)
+        grids["conjunction"] = ([natal_points[p] % 360 for p in names], lambda b, s: names[b])
+
+    events = []
+    for body in bodies:
+        for kind, (boundaries, label) in grids.items():
+            if kind not in kinds: continue
+            for jd, b, step in find_crossings(body, jd0, jd1, boundaries, eph):
+                events.append(TransitEvent(jd, body, kind, label(b, step), boundaries[b], step < 0))
+        if "station" in kinds and body in STATION_BODIES:
+            for jd, kind in find_stations(body, jd0, jd1, eph):
+                events.append(TransitEvent(jd, body, kind, None, eph(body, jd)[0], kind == "station_retro"))
+    events.sort(key=lambda e: (e.jd, e.kind, e.body))
+    return events
+
+
+def describe_event(event):
+    """One-line human description, e.g. "Saturn enters Pisces (29-03-2025)"."""
+    y, m, d, _ = swe.revjul(event.jd)
+    when = f"{d:02d}-{m:02d}-{y}"
+    if event.kind == "station_retro": return f"{event.body} stations retrograde ({when})"
+    if event.kind == "station_direct": return f"{event.body} stations direct ({when})"
+    if event.kind == "conjunction": return f"{event.body} conjoins natal {event.value} ({when})"
+    if event.kind == "pada": return f"{event.body} enters {event.value[0]} pada {event.value[1]} ({when})"
+    if event.kind == "kp_sub": return f"{event.body} enters {event.value} sub ({when})"
+    if event.kind == "kp_sub_sub": return f"{event.body} enters {event.value} sub-sub ({when})"
+    retro = " (R)" if event.retrograde else ""
+    return f"{event.body}{retro} enters {event.value} ({when})"
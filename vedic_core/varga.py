@@ -0,0 +1,106 @@
+"""Divisional (varga) chart sign calculations.
+
+Every varga is a table built once at import: the start longitude of each of
+its divisions around the zodiac (12 x n, unequal for the Trimsamsa) and the
+sign each division maps to under the Parashari rules. A lookup is a bisect
+for one longitude, or one searchsorted over all vargas for an array.
+"""
+from bisect import bisect_right
+
+VARGA_LIST = [1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60]
+
+# Trimsamsa: (degrees into sign, sign) for odd and even signs (sign indices 0 = Aries)
+_TRIMSAMSA_ODD = [(0, 0), (5, 10), (10, 8), (18, 2), (25, 6)]    # Mars, Saturn, Jupiter, Mercury, Venus
+_TRIMSAMSA_EVEN = [(0, 1), (5, 5), (12, 11), (20, 9), (25, 7)]   # Venus, Mercury, Jupiter, Saturn, Mars
+
+
+def _by_modality(movable, fixed, dual):
+    return lambda s: (movable, fixed, dual)[s % 3]
+
+
+def _by_element(fire, earth, air, water):
+    return lambda s: (fire, earth, air, water)[s % 4]
+
+
+def _by_parity(odd, even):
+    return lambda s: odd(s) if s % 2 == 0 else even(s)
+
+
+# First sign of each varga's count as a function of the natal sign index; divisions then run forward.
+_FIRST_SIGN = {
+    1: lambda s: s,
+    3: lambda s: s,                                               # Drekkana: s, 5th, 9th (k * 4 below)
+    4: lambda s: s,                                               # Chaturthamsa: s, 4th, 7th, 10th (k * 3 below)
+    7: _by_parity(lambda s: s, lambda s: s + 6),                  # Saptamsa
+    9: _by_element(0, 9, 6, 3),                                   # Navamsa: Aries, Capricorn, Libra, Cancer
+    10: _by_parity(lambda s: s, lambda s: s + 8),                 # Dasamsa
+    12: lambda s: s,                                              # Dwadasamsa
+    16: _by_modality(0, 4, 8),                                    # Shodasamsa: Aries, Leo, Sagittarius
+    20: _by_modality(0, 8, 4),                                    # Vimsamsa: Aries, Sagittarius, Leo
+    24: _by_parity(lambda s: 4, lambda s: 3),                     # Chaturvimsamsa: Leo, Cancer
+    27: _by_element(0, 3, 6, 9),                                  # Saptavimsamsa: Aries, Cancer, Libra, Capricorn
+    40: _by_parity(lambda s: 0, lambda s: 6),                     # Khavedamsa: Aries, Libra
+    45: _by_modality(0, 4, 8),                                    # Akshavedamsa: Aries, Leo, Sagittarius
+    60: lambda s: s,                                              # Shashtiamsa
+}
+_STRIDE = {3: 4, 4: 3}
+
+
+def _divisions(v, s):
+    """[(degrees into sign, varga sign index)] for the divisions of natal sign s in varga v."""
+    if v == 2:  # Hora: odd signs Sun then Moon, even signs Moon then Sun
+        return [(0, 4), (15, 3)] if s % 2 == 0 else [(0, 3), (15, 4)]
+    if v == 30:
+        return _TRIMSAMSA_ODD if s % 2 == 0 else _TRIMSAMSA_EVEN
+    first, stride = _FIRST_SIGN[v](s), _STRIDE.get(v, 1)
+    return [(30 * k / v, (first + k * stride) % 12) for k in range(v)]
+
+
+def _build(v):
+    starts, signs, table = [], [], []
+    for s in range(12):
+        row = []
+        for offset, sign in _divisions(v, s):
+            starts.append(30 * s + offset)
+            signs.append(sign + 1)
+            row.append(sign + 1)
+        table.append(row)
+    return starts, signs, table
+
+
+# VARGA_TABLES[v] = (division start longitudes, varga sign 1-12 per division,
+#                    table[natal sign 0-11][division index] -> varga sign 1-12)
+VARGA_TABLES = {v: _build(v) for v in VARGA_LIST}
+_arrays = None
+
+
+def calculate_varga_sign(deg, varga_num):
+    """Calculates Varga Sign for 19 Charts"""
+    starts, signs, _ = VARGA_TABLES[varga_num]
+    return signs[bisect_right(starts, deg % 360) - 1]
+
+
+def varga_signs(deg, vargas=VARGA_LIST):
+    """Varga signs (1-12) of one longitude for each of `vargas`, as a list."""
+    deg %= 360
+    return [VARGA_TABLES[v][1][bisect_right(VARGA_TABLES[v][0], deg) - 1] for v in vargas]
+
+
+def varga_signs_array(deg):
+    """All 16 vargas for an array of longitudes in one searchsorted: int8 array of
+    shape deg.shape + (len(VARGA_LIST),), varga axis in VARGA_LIST order."""
+    import numpy as np
+
+    global _arrays
+    if _arrays is None:
+        # Lay the varga tables end to end, each shifted by 360 * its position.
+        starts = np.concatenate([np.asarray(VARGA_TABLES[v][0]) + 360 * i for i, v in enumerate(VARGA_LIST)])
+        signs = np.concatenate([np.asarray(VARGA_TABLES[v][1], dtype=np.int8) for v in VARGA_LIST])
+        _arrays = starts, signs, 360.0 * np.arange(len(VARGA_LIST))
+    starts, signs, offsets = _arrays
+    deg = np.asarray(deg, dtype=float) % 360
+    return signs[np.searchsorted(starts, deg[..., None] + offsets, side="right") - 1]
+
+
+def get_navamsa_pos(deg):
+    return calculate_varga_sign(deg, 9)